@@ -1,49 +1,52 @@
 from typing import Callable
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
 
 from app.core.config import settings
 from app.db.session import get_session, SessionManager
+from app.models.rol import ADMIN_ROL_ID, PHYSIO_ROL_ID
 from app.models.user import User
 from app.schemas.token import TokenData
+from app.services.principal_cache import Principal
 from app.services.user_service import UserService
 
-# Rol de Administrador en la tabla roles (seed.sql)
-ADMIN_ROL_ID = 3
-# Rol de Fisioterapeuta/Entrenador (scope clínico)
-PHYSIO_ROL_ID = 2
-
 
 # Configuración de OAuth2
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_PREFIX}/auth/login"
 )
 
-async def get_current_user(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="No se pudieron validar las credenciales",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_token_claims(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    session_manager: SessionManager = Depends(get_session)
-) -> User:
+) -> TokenData:
     """
-    Valida el token JWT y retorna el usuario actual.
+    Decodifica y verifica el token JWT una sola vez por petición.
+
+    FastAPI cachea el resultado de una dependencia dentro de la misma petición, así
+    que get_current_user, get_current_principal y las comprobaciones de rol comparten
+    estos claims en lugar de repetir la verificación HMAC.
+    El id del usuario queda en request.state.user_id (lo usa LogRequestsMiddleware).
 
     Args:
+        request: Petición actual
         token: Token JWT del header Authorization
-        session_manager: Gestor de sesiones de base de datos
     Returns:
-        Usuario autenticado
+        Claims del token (user_id, id_rol)
     Raises:
-        HTTPException: Si el token es inválido o el usuario no existe
+        HTTPException 401: Si el token es inválido
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudieron validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
     try:
-        # Decodificar el token JWT
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
@@ -52,28 +55,79 @@ async def get_current_user(
 
         user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-        
-        user_id_int = int(user_id)
+            raise _credentials_exception()
+
         id_rol_from_token = payload.get("id_rol")  # Claim de rol añadido en auth_service
-        token_data = TokenData(user_id=user_id_int, id_rol=id_rol_from_token)
+        token_data = TokenData(user_id=int(user_id), id_rol=id_rol_from_token)
+    except (JWTError, ValueError, ValidationError) as exc:
+        raise _credentials_exception() from exc
+
+    request.state.user_id = token_data.user_id
+    return token_data
+
+
+async def get_current_user(
+    token_data: TokenData = Depends(get_token_claims),
+    session_manager: SessionManager = Depends(get_session)
+) -> User:
+    """
+    Valida el token JWT y retorna el usuario actual.
+
+    Args:
+        token_data: Claims del token JWT (decodificado una vez por petición)
+        session_manager: Gestor de sesiones de base de datos
+    Returns:
+        Usuario autenticado
+    Raises:
+        HTTPException: Si el token es inválido o el usuario no existe
+    """
+    user = await UserService.get_user_by_id(
+        session_manager.pg_session,
+        token_data.user_id
+    )
+
+    if user is None:
+        raise _credentials_exception()
 
-        user = await UserService.get_user_by_id(
-            session_manager.pg_session,
-            token_data.user_id
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Usuario inactivo"
         )
-        
-        if user is None:
-            raise credentials_exception
-        
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Usuario inactivo"
-            )
-        return user
-    except (JWTError, ValueError, ValidationError) as exc:
-        raise credentials_exception from exc
+    return user
+
+async def get_current_principal(
+    token_data: TokenData = Depends(get_token_claims),
+    session_manager: SessionManager = Depends(get_session)
+) -> Principal:
+    """
+    Valida el token JWT y retorna solo la identidad del usuario actual.
+
+    Para endpoints que únicamente necesitan id_usuario / id_rol: evita cargar el
+    User ORM (y sus JOINs con rol y perfil médico) y sirve la identidad desde la
+    caché de principals mientras no expire.
+
+    Args:
+        token_data: Claims del token JWT (decodificado una vez por petición)
+        session_manager: Gestor de sesiones de base de datos
+    Returns:
+        Principal del usuario autenticado
+    Raises:
+        HTTPException: Si el token es inválido, el usuario no existe o está inactivo
+    """
+    principal = await UserService.get_principal(
+        session_manager.pg_session,
+        token_data.user_id
+    )
+    if principal is None:
+        raise _credentials_exception()
+
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Usuario inactivo"
+        )
+    return principal
 
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
@@ -123,33 +177,23 @@ async def get_current_active_user(
 #     return current_user
 # ---------------------------------------------------------------------------
 
-# Nueva dependencia basada en id_rol del JWT (sin consulta extra a la DB)
+# Nueva dependencia basada en id_rol (los claims ya decodificados por get_token_claims)
 async def check_admin_role(
-    token: str = Depends(oauth2_scheme),
     current_user: User = Depends(get_current_user)
 ) -> User:
     """
     Verifica que el usuario tenga el rol de Administrador (id_rol == 3).
 
-    Lee el claim 'id_rol' del JWT para evitar una consulta extra a la DB.
-    También valida contra el id_rol real del usuario en DB como segunda capa.
+    El token ya fue verificado una vez por get_token_claims (vía get_current_user);
+    aquí se valida contra el id_rol real del usuario en DB.
 
     Args:
-        token: Token JWT del header Authorization
         current_user: Usuario autenticado obtenido de get_current_user
     Returns:
         Usuario administrador
     Raises:
         HTTPException 403: Si el usuario no tiene rol de administrador
     """
-    # Primera capa: leer id_rol del JWT claim (rápido, sin DB)
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        id_rol_token = payload.get("id_rol")
-    except JWTError:
-        id_rol_token = None
-
-    # Segunda capa: comparar con el id_rol real del usuario en DB
     # Usamos el valor de la DB como fuente de verdad final.
     if current_user.id_rol != ADMIN_ROL_ID:
         raise HTTPException(
@@ -169,31 +213,22 @@ async def require_admin(
 
 
 async def check_physio_role(
-    token: str = Depends(oauth2_scheme),
     current_user: User = Depends(get_current_user)
 ) -> User:
     """
     Verifica que el usuario tenga rol de Fisioterapeuta (id_rol == 2)
     O de Administrador (id_rol == 3), ya que el Admin puede hacer todo lo del Fisio.
 
-    Usa doble capa de validación:
-      1. Claim 'id_rol' del JWT (rápido, sin DB extra)
-      2. id_rol real del usuario en DB (fuente de verdad)
+    El token ya fue verificado una vez por get_token_claims (vía get_current_user);
+    aquí se valida contra el id_rol real del usuario en DB.
 
     Args:
-        token: Token JWT del header Authorization
         current_user: Usuario autenticado obtenido de get_current_user
     Returns:
         Usuario Fisioterapeuta o Administrador
     Raises:
         HTTPException 403: Si el usuario no tiene rol clínico (Rol 2 o 3)
     """
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        id_rol_token = payload.get("id_rol")
-    except JWTError:
-        id_rol_token = None
-
     # Fuente de verdad: id_rol real en DB
     if current_user.id_rol not in (PHYSIO_ROL_ID, ADMIN_ROL_ID):
         raise HTTPException(
@@ -201,3 +236,37 @@ async def check_physio_role(
             detail="Se requiere rol de Fisioterapeuta (2) o Administrador (3) para esta operación"
         )
     return current_user
+
+
+# ---------------------------------------------------------------------------
+# Vía rápida solo con claims: para endpoints que no necesitan el User ORM.
+# 1. Claim 'id_rol' del JWT (rechazo inmediato, sin DB)
+# 2. id_rol del principal cacheado (fuente de verdad, SELECT sin JOINs)
+# ---------------------------------------------------------------------------
+def _require_roles(allowed_roles: tuple, detail: str) -> Callable:
+    async def _check(
+        token_data: TokenData = Depends(get_token_claims),
+        session_manager: SessionManager = Depends(get_session)
+    ) -> Principal:
+        if token_data.id_rol not in allowed_roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+        principal = await get_current_principal(token_data, session_manager)
+        if principal.id_rol not in allowed_roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+        return principal
+
+    return _check
+
+
+# Administrador (Rol 3)
+check_admin_claims = _require_roles(
+    (ADMIN_ROL_ID,),
+    "Se requiere rol de Administrador para esta operación",
+)
+
+# Fisioterapeuta (Rol 2) o Administrador (Rol 3)
+check_physio_claims = _require_roles(
+    (PHYSIO_ROL_ID, ADMIN_ROL_ID),
+    "Se requiere rol de Fisioterapeuta (2) o Administrador (3) para esta operación",
+)
@@ -1,19 +1,43 @@
 """
 Router de administración — endpoints exclusivos para usuarios con id_rol=3.
-Todos los endpoints de este módulo están protegidos por check_admin_role.
+Todos los endpoints de este módulo están protegidos por check_admin_role
+(o check_admin_claims cuando no necesitan el User ORM).
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+import asyncio
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Literal, Optional
 
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.postgresql import postgresql
 from app.db.session import get_session, SessionManager
 from app.models.user import User
 from app.schemas.user import AdminCreate, UserResponse
-from app.api.deps import check_admin_role
+from app.api.deps import check_admin_claims, check_admin_role
 from app.services.user_service import UserService
 from app.services.audit_service import AuditService
+from app.services.export_service import EXPORT_MEDIA_TYPES, PHYSIO_EVENT_FIELDS, ExportService
+from app.services.ml_service import ml_service
+from app.services.physio_audit_service import COLLECTION_NAME as PHYSIO_EVENTS_COLLECTION
+from app.services.principal_cache import Principal
+from app.utils.pagination import set_next_cursor_header
 
 router = APIRouter()
 
+ExportFormat = Literal["ndjson", "csv"]
+
+
+def _export_response(nombre: str, chunks: AsyncIterator[str], fmt: ExportFormat) -> StreamingResponse:
+    """Envuelve un generador de ExportService en una descarga con nombre de archivo."""
+    filename = f"{nombre}-{date.today().isoformat()}.{fmt}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 
 @router.post(
     "/create-admin",
@@ -71,9 +95,11 @@ async def create_admin(
     summary="Listar todos los usuarios (solo Admin)"
 )
 async def list_all_users(
-    skip: int = 0,
-    limit: int = 100,
-    current_admin: User = Depends(check_admin_role),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    current_admin: Principal = Depends(check_admin_claims),
     session_manager: SessionManager = Depends(get_session)
 ):
     """
@@ -82,17 +108,210 @@ async def list_all_users(
     **Requiere**: token de un usuario con id_rol=3 en el JWT.
 
     Args:
-        skip: Número de registros a saltar (paginación)
+        response: Respuesta (header X-Next-Cursor con la página siguiente)
+        skip: Número de registros a saltar (compatibilidad; preferir cursor)
         limit: Máximo de registros a retornar
+        cursor: Cursor de la página anterior (X-Next-Cursor)
         current_admin: Administrador autenticado
         session_manager: Gestor de sesiones de base de datos
 
     Returns:
         Lista de usuarios
     """
-    users = await UserService.get_all_users(
+    page = await UserService.get_all_users(
         session_manager.pg_session,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+    )
+    set_next_cursor_header(response, page)
+    return page.items
+
+
+@router.get(
+    "/ml/model",
+    summary="Versión activa del modelo CART y registro de versiones"
+)
+async def get_ml_model_status(
+    current_admin: Principal = Depends(check_admin_claims),
+):
+    """
+    Retorna la versión del modelo CART que está sirviendo este worker
+    y el manifiesto del registro (versiones disponibles con sus métricas).
+
+    **Requiere**: token de un usuario con id_rol=3 en el JWT.
+    """
+    return {
+        "active_version": ml_service.active_version,
+        "ready": ml_service.is_ready,
+        "registry": ml_service.registry.read_manifest(),
+    }
+
+
+@router.get(
+    "/metrics",
+    summary="Métricas de rendimiento del worker"
+)
+async def get_metrics(
+    current_admin: Principal = Depends(check_admin_claims),
+):
+    """
+    Retorna los contadores e histogramas en proceso de este worker
+    (p. ej. espera en cola y duración del hashing bcrypt, rechazos por saturación).
+
+    **Requiere**: token de un usuario con id_rol=3 en el JWT.
+    """
+    return metrics.snapshot()
+
+
+@router.get(
+    "/metrics/db-pool",
+    summary="Estado y telemetría del pool de conexiones PostgreSQL"
+)
+async def get_db_pool_metrics(
+    current_admin: Principal = Depends(check_admin_claims),
+):
+    """
+    Retorna la configuración del pool de este worker, las conexiones en uso,
+    libres y en overflow, el histograma de espera por conexión, los timeouts
+    y cuántas peticiones con SessionManager no llegaron a usar una conexión.
+
+    **Requiere**: token de un usuario con id_rol=3 en el JWT.
+    """
+    return postgresql.pool_status()
+
+
+@router.post(
+    "/ml/model/{version}/activate",
+    summary="Activar una versión del modelo CART sin reiniciar"
+)
+async def activate_ml_model(
+    version: str,
+    current_admin: Principal = Depends(check_admin_claims),
+    session_manager: SessionManager = Depends(get_session)
+):
+    """
+    Marca una versión del registro como activa y la carga en caliente en este worker.
+    El resto de workers la detectan al sondear el manifiesto (ML_REGISTRY_POLL_SECONDS).
+
+    **Requiere**: token de un usuario con id_rol=3 en el JWT.
+
+    Raises:
+        HTTPException 404: Si la versión no existe en el registro
+        HTTPException 409: Si la versión no supera el calentamiento (el registro
+                           vuelve a la versión activa anterior)
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        activated = await loop.run_in_executor(ml_service.executor, ml_service.activate_version, version)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    if not activated:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"La versión {version} no superó el calentamiento; "
+                f"se mantiene la versión {ml_service.active_version}"
+            ),
+        )
+
+    await AuditService.log_action(
+        session=session_manager.pg_session,
+        id_admin=current_admin.id_usuario,
+        accion="ML_MODEL_ACTIVATED",
+        entidad_afectada=f"ml_model:{version}",
+        descripcion=f"Admin {current_admin.correo} activó la versión {version} del modelo CART"
+    )
+    await session_manager.pg_session.commit()
+
+    return {"active_version": ml_service.active_version}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# EXPORTACIONES (streaming NDJSON / CSV, memoria constante)
+# ──────────────────────────────────────────────────────────────────────────────
+
+@router.get(
+    "/export/users",
+    summary="Exportar todos los usuarios (NDJSON / CSV)"
+)
+async def export_users(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    current_admin: Principal = Depends(check_admin_claims),
+):
+    """
+    Descarga todos los usuarios en streaming, sin credenciales ni perfil médico.
+
+    **Requiere**: token de un usuario con id_rol=3 en el JWT.
+    """
+    return _export_response(
+        "usuarios", ExportService.stream_query(ExportService.users_query(), export_format), export_format
+    )
+
+
+@router.get(
+    "/export/progress",
+    summary="Exportar todo el historial de progreso (NDJSON / CSV)"
+)
+async def export_progress(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    current_admin: Principal = Depends(check_admin_claims),
+):
+    """
+    Descarga todas las filas de historial_progreso en streaming.
+
+    **Requiere**: token de un usuario con id_rol=3 en el JWT.
+    """
+    return _export_response(
+        "historial_progreso", ExportService.stream_query(ExportService.progress_query(), export_format), export_format
+    )
+
+
+@router.get(
+    "/export/audit",
+    summary="Exportar la auditoría de administradores (NDJSON / CSV)"
+)
+async def export_audit(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    current_admin: Principal = Depends(check_admin_claims),
+):
+    """
+    Descarga todos los registros de auditoria_admin en streaming.
+
+    **Requiere**: token de un usuario con id_rol=3 en el JWT.
+    """
+    return _export_response(
+        "auditoria_admin", ExportService.stream_query(ExportService.audit_query(), export_format), export_format
+    )
+
+
+@router.get(
+    "/export/physio-events",
+    summary="Exportar los eventos clínicos de MongoDB (NDJSON / CSV)"
+)
+async def export_physio_events(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    current_admin: Principal = Depends(check_admin_claims),
+    session_manager: SessionManager = Depends(get_session),
+):
+    """
+    Descarga todos los documentos de physio_events en streaming
+    (en CSV, con actor y entidad aplanados y metadata como JSON).
+
+    **Requiere**: token de un usuario con id_rol=3 en el JWT.
+
+    Raises:
+        HTTPException 503: Si MongoDB no está disponible
+    """
+    if not session_manager.has_mongo():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="MongoDB no está disponible",
+        )
+    collection = session_manager.mongo[PHYSIO_EVENTS_COLLECTION]
+    return _export_response(
+        "physio_events",
+        ExportService.stream_collection(collection, export_format, PHYSIO_EVENT_FIELDS),
+        export_format,
     )
-    return users
@@ -30,7 +30,7 @@ async def get_exercises(
     WHERE e.activo = TRUE
     """)
 
-    result = await session_manager.pg_session.execute(query)
+    result = await session_manager.pg_read_session.execute(query)
     rows = result.mappings().all()
 
     return rows
\ No newline at end of file
@@ -10,19 +10,25 @@ Endpoints:
   PATCH  /physio/exercises/{id}/verify  → Validar ejercicio individual
   GET    /physio/exercises              → Listar todos los ejercicios (incl. inactivos)
 """
-from fastapi import APIRouter, Depends, HTTPException, Body, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response, status
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
 
-from app.api.deps import check_physio_role, get_session
+from app.api.deps import check_physio_claims, check_physio_role, get_session
+from app.core.config import settings
 from app.db.session import SessionManager
 from app.models.ejercicio import Ejercicio
 from app.models.user import User
 from app.schemas.ejercicio import EjercicioOut
 from app.schemas.rutina import RutinaPublicOut, RutinaCreateIn
+from app.services.catalog_read_service import CatalogReadService
 from app.services.recommendation_service import RecommendationService
 from app.services.audit_service import AuditService
 from app.services.physio_audit_service import PhysioAuditService
+from app.services.exercise_catalog import exercise_catalog
+from app.services.principal_cache import Principal
+from app.services.recommendation_cache import recommendation_cache
+from app.utils.pagination import set_next_cursor_header
 
 router = APIRouter()
 
@@ -37,19 +43,24 @@ router = APIRouter()
     summary="Listar todos los ejercicios (activos e inactivos)",
 )
 async def list_all_exercises(
-    skip: int = 0,
-    limit: int = 100,
-    current_physio: User = Depends(check_physio_role),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    current_physio: Principal = Depends(check_physio_claims),
     session_manager: SessionManager = Depends(get_session),
 ) -> List[EjercicioOut]:
     """
-    Devuelve todos los ejercicios sin filtro de activo.
+    Devuelve todos los ejercicios sin filtro de activo, ordenados por id.
     Permite al Fisio ver ejercicios desactivados para poder reactivarlos o verificarlos.
+    La página siguiente se pide con el cursor del header X-Next-Cursor.
+    Ruta rápida sin ORM ni validación Pydantic por fila (CatalogReadService).
     """
-    result = await session_manager.pg_session.execute(
-        select(Ejercicio).offset(skip).limit(limit)
+    page = await CatalogReadService.list_exercises(
+        session_manager.pg_session, limit, cursor=cursor, skip=skip,
     )
-    return list(result.scalars().all())
+    response = ORJSONResponse(page.items)
+    set_next_cursor_header(response, page)
+    return response
 
 
 @router.post(
@@ -103,7 +114,6 @@ async def create_exercise(
     # MongoDB — log clínico enriquecido
     try:
         await PhysioAuditService.log_from_user(
-            mongo_db=session_manager.mongo,
             action=PhysioAuditService.EXERCISE_CREATED,
             actor=current_physio,
             entity_type="ejercicios",
@@ -113,6 +123,10 @@ async def create_exercise(
     except Exception:
         pass  # MongoDB no debe bloquear la operación principal
     await db.commit()
+    # El catálogo cambió: se recarga en el próximo acceso y las rutinas ML cacheadas
+    # dejan de ser válidas (un fallo de la recarga no afecta a la escritura confirmada)
+    exercise_catalog.invalidate()
+    recommendation_cache.clear()
     await db.refresh(nuevo)
     return nuevo
 
@@ -153,7 +167,6 @@ async def verify_exercise(
     # MongoDB — log clínico
     try:
         await PhysioAuditService.log_from_user(
-            mongo_db=session_manager.mongo,
             action=PhysioAuditService.EXERCISE_VERIFIED,
             actor=current_physio,
             entity_type="ejercicios",
@@ -163,6 +176,8 @@ async def verify_exercise(
     except Exception:
         pass
     await db.commit()
+    exercise_catalog.invalidate()
+    recommendation_cache.clear()
     await db.refresh(ejercicio)
     return ejercicio
 
@@ -177,22 +192,27 @@ async def verify_exercise(
     summary="Rutinas ML pendientes de verificación",
 )
 async def get_pending_routines(
-    skip: int = 0,
-    limit: int = 20,
-    current_physio: User = Depends(check_physio_role),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    current_physio: Principal = Depends(check_physio_claims),
     session_manager: SessionManager = Depends(get_session),
 ) -> List[RutinaPublicOut]:
     """
     Lista todas las rutinas generadas por el algoritmo CART
     que aún NO han sido verificadas por un Fisioterapeuta.
     Ordenadas por fecha de creación descendente.
+    La página siguiente se pide con el cursor del header X-Next-Cursor.
     """
-    rutinas = await RecommendationService.get_pending_verification_routines(
+    page = await RecommendationService.get_pending_verification_routines(
         db=session_manager.pg_session,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
-    return rutinas
+    set_next_cursor_header(response, page)
+    return page.items
 
 
 @router.post(
@@ -232,7 +252,6 @@ async def create_physio_routine(
     # MongoDB — log clínico con metadata de la rutina
     try:
         await PhysioAuditService.log_from_user(
-            mongo_db=session_manager.mongo,
             action=PhysioAuditService.ROUTINE_CREATED_MANUAL,
             actor=current_physio,
             entity_type="rutinas",
@@ -292,7 +311,6 @@ async def verify_routine(
     # MongoDB — log clínico con timestamp de verificación
     try:
         await PhysioAuditService.log_from_user(
-            mongo_db=session_manager.mongo,
             action=PhysioAuditService.ROUTINE_ML_VERIFIED,
             actor=current_physio,
             entity_type="rutinas",
@@ -19,7 +19,7 @@ async def get_progress_by_user(
     """
     Obtiene el historial de progreso de un usuario específico
     """
-    result = await session_manager.pg_session.execute(
+    result = await session_manager.pg_read_session.execute(
         select(HistorialProgreso)
         .where(HistorialProgreso.id_usuario == id_usuario)
         .order_by(HistorialProgreso.fecha)
@@ -6,11 +6,11 @@ Toda la lógica de negocio (CART, filtros, badges) vive en:
 """
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.api.deps import get_current_user, ADMIN_ROL_ID
+from app.api.deps import get_current_principal, ADMIN_ROL_ID
 from app.db.session import SessionManager, get_session
-from app.models.user import User
 from app.schemas.rutina import RutinaMLOut
-from app.services.ml_service import ml_service
+from app.services.ml_service import InferenceQueueFullError, ml_service
+from app.services.principal_cache import Principal
 from app.services.recommendation_service import RecommendationService
 from app.services.user_service import UserService
 
@@ -31,7 +31,7 @@ router = APIRouter()
 async def get_personalized_routine(
     id_usuario: int,
     session_manager: SessionManager = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> RutinaMLOut:
     # 🔐 Solo el propio usuario o un Admin/Fisio puede solicitar la rutina de otro
     if current_user.id_usuario != id_usuario and current_user.id_rol not in (2, ADMIN_ROL_ID):
@@ -41,8 +41,16 @@ async def get_personalized_routine(
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    return await RecommendationService.generate_ml_routine(
-        db=session_manager.pg_session,
-        user=user,
-        ml_svc=ml_service,
-    )
\ No newline at end of file
+    try:
+        return await RecommendationService.generate_ml_routine(
+            db=session_manager.pg_session,
+            user=user,
+            ml_svc=ml_service,
+        )
+    except InferenceQueueFullError:
+        # Carga de recomendaciones saturada: se rechaza rápido en lugar de encolar sin límite
+        raise HTTPException(
+            status_code=503,
+            detail="Servicio de recomendaciones saturado, intenta de nuevo en unos segundos",
+            headers={"Retry-After": "1"},
+        )
\ No newline at end of file
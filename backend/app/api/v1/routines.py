@@ -1,14 +1,18 @@
 """
 Router público para la exploración del catálogo general de rutinas.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import select, text
-from typing import List
+from typing import List, Optional
 
 from app.api.deps import get_session
+from app.core.config import settings
 from app.db.session import SessionManager
 from app.models.rutina import Rutina
 from app.schemas.rutina import RutinaPublicOut, EjercicioEnRutinaOut
+from app.services.catalog_read_service import CatalogReadService
+from app.utils.pagination import set_next_cursor_header
 
 router = APIRouter()
 
@@ -19,21 +23,24 @@ router = APIRouter()
 )
 async def get_all_routines(
     session_manager: SessionManager = Depends(get_session),
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    cursor: Optional[str] = None,
 ) -> List[RutinaPublicOut]:
     """
     Devuelve todas las rutinas registradas en el sistema (generadas por ML, validadas, manuales, etc).
     Ordenadas por fecha de creación descendente.
+    La página siguiente se pide con el cursor del header X-Next-Cursor.
+
+    Ruta rápida: columnas + badge en SQL serializados con orjson (CatalogReadService);
+    el JSON coincide con RutinaPublicOut.
     """
-    db = session_manager.pg_session
-    result = await db.execute(
-        select(Rutina)
-        .order_by(Rutina.fecha_creacion.desc(), Rutina.id_rutina.desc())
-        .offset(skip)
-        .limit(limit)
+    page = await CatalogReadService.list_routines(
+        session_manager.pg_read_session, limit, cursor=cursor, skip=skip,
     )
-    return list(result.scalars().all())
+    response = ORJSONResponse(page.items)
+    set_next_cursor_header(response, page)
+    return response
 
 
 @router.get(
@@ -49,7 +56,7 @@ async def get_routine_exercises(
     Obtiene la lista de ejercicios que componen una rutina, incluyendo
     sus metadatos, ordenados por la columna 'orden' de la tabla intermedia.
     """
-    db = session_manager.pg_session
+    db = session_manager.pg_read_session
     
     # Verificamos si la rutina existe
     rutina = await db.scalar(select(Rutina).where(Rutina.id_rutina == id_rutina))
@@ -1,11 +1,14 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
+from app.core.config import settings
 from app.db.session import get_session, SessionManager
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate, UserChangePassword
-from app.api.deps import get_current_user, require_admin
+from app.api.deps import check_admin_claims, get_current_user, require_admin
 from app.services.user_service import UserService
+from app.services.principal_cache import Principal
+from app.utils.pagination import set_next_cursor_header
 
 router = APIRouter()
 
@@ -135,35 +138,41 @@ async def delete_my_account(
 
 @router.get("/", response_model=List[UserResponse])
 async def get_all_users(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(require_admin),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(check_admin_claims),
     session_manager: SessionManager = Depends(get_session)
 ):
     """
     Obtener todos los usuarios (solo admin)
     
     Args:
-        skip: Número de registros a saltar
+        response: Respuesta (header X-Next-Cursor con la página siguiente)
+        skip: Número de registros a saltar (compatibilidad; preferir cursor)
         limit: Número máximo de registros a retornar
+        cursor: Cursor de la página anterior (X-Next-Cursor)
         current_user: Usuario administrador
         session_manager: Gestor de sesiones de base de datos
     
     Returns:
         Lista de usuarios
     """
-    users = await UserService.get_all_users(
+    page = await UserService.get_all_users(
         session_manager.pg_session,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
     )
-    return users
+    set_next_cursor_header(response, page)
+    return page.items
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: int,
-    current_user: User = Depends(require_admin),
+    current_user: Principal = Depends(check_admin_claims),
     session_manager: SessionManager = Depends(get_session)
 ):
     """
@@ -9,6 +9,7 @@ from .logging import logger
 # Funciones de seguridad
 from .security import (
     verify_password,
+    verify_and_update_password,
     get_password_hash,
     create_access_token,
     decode_access_token
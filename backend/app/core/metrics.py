@@ -0,0 +1,122 @@
+"""
+Métricas en proceso (por worker): contadores e histogramas simples.
+
+No depende de ningún exportador externo; el endpoint GET /admin/metrics
+expone metrics.snapshot() como JSON. Los valores de tiempo se registran en segundos.
+
+Uso:
+    from app.core.metrics import metrics
+
+    metrics.counter("password_hash_rejected_total").inc()
+    metrics.histogram("password_hash_seconds").observe(0.21)
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict, Sequence, Tuple
+
+# Límites (segundos) por defecto de los histogramas: de 1 ms a 10 s
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Counter:
+    """Contador monótono, seguro entre hilos."""
+
+    def __init__(self) -> None:
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self) -> int:
+        return self._value
+
+
+class Histogram:
+    """Histograma acumulado por buckets (count, sum, max), seguro entre hilos."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # último bucket = +Inf
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, n in zip(self.buckets + (float("inf"),), self._counts):
+                cumulative += n
+                buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            return {
+                "count": self._count,
+                "sum": round(self._sum, 6),
+                "avg": round(self._sum / self._count, 6) if self._count else 0.0,
+                "max": round(self._max, 6),
+                "buckets": buckets,
+            }
+
+
+class MetricsRegistry:
+    """Registro de métricas por nombre (se crean en el primer uso)."""
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        metric = self._counters.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._counters.setdefault(name, Counter())
+        return metric
+
+    def histogram(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = self._histograms.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._histograms.setdefault(name, Histogram(buckets))
+        return metric
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {
+            "counters": {name: c.snapshot() for name, c in sorted(self._counters.items())},
+            "histograms": {name: h.snapshot() for name, h in sorted(self._histograms.items())},
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Instancia global (por worker)
+metrics = MetricsRegistry()
@@ -1,14 +1,29 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from cryptography.fernet import Fernet
+import asyncio
 import base64
-import anyio
+import hashlib
+import time
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.utils.ttl_cache import TTLCache
 
-# Contexto para hashing de passwords
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Contexto para hashing de passwords.
+# min_rounds = max_rounds = BCRYPT_ROUNDS: cualquier hash con otro coste se marca
+# como obsoleto y verify_and_update lo regenera en el siguiente login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 def get_encryption_key():
     """Deriva una key válida para Fernet desde la SECRET_KEY"""
@@ -40,22 +55,196 @@ def decrypt_value(value: str) -> Optional[str]:
         return value
 
 
+# ─── Campos médicos cifrados (listas JSONB, un token Fernet por elemento) ─────
+
+class DecryptionCache:
+    """
+    LRU acotada de valores descifrados: sha256(texto cifrado) → texto plano.
+
+    Cada token Fernet es único (IV aleatorio), así que un mismo texto cifrado siempre
+    descifra igual y la entrada no expira: solo deja de servir cuando el valor se
+    reemplaza (UserService.update_user llama a evict con los valores anteriores).
+    La TTLCache de debajo es segura entre hilos: los endpoints síncronos
+    (p. ej. GET /users/me) validan MedicalProfileResponse en el threadpool de Starlette.
+    """
+
+    def __init__(self, max_entries: int):
+        self._entries: TTLCache[bytes, str] = TTLCache(max_entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(value: str) -> bytes:
+        return hashlib.sha256(value.encode()).digest()
+
+    def get(self, value: str) -> Optional[str]:
+        return self._entries.get(self._key(value))
+
+    def set(self, value: str, plain: str) -> None:
+        self._entries.set(self._key(value), plain)
+
+    def evict(self, values: Iterable[str]) -> None:
+        for value in values:
+            if isinstance(value, str):
+                self._entries.invalidate(self._key(value))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Instancia global (por worker)
+decryption_cache = DecryptionCache(max_entries=settings.DECRYPT_CACHE_MAX_ENTRIES)
+
+
+def encrypt_values(values: Optional[Iterable[str]]) -> List[str]:
+    """Encripta cada elemento de una lista (p. ej. lesiones del perfil médico)"""
+    return [encrypt_value(v) for v in values or []]
+
+
+def decrypt_batch(values: Iterable[str]) -> Dict[str, str]:
+    """
+    Descifra un conjunto de valores con una sola pasada: deduplica, sirve los
+    aciertos desde decryption_cache y descifra con Fernet solo los fallos.
+
+    Pensado para listados (p. ej. GET /admin/users): calentar la caché con todos los
+    campos de la página evita cientos de descifrados sueltos al serializar.
+
+    Returns:
+        Mapa texto cifrado → texto plano
+    """
+    resultado: Dict[str, str] = {}
+    for value in values:
+        if not isinstance(value, str) or value in resultado:
+            continue
+        plain = decryption_cache.get(value)
+        if plain is None:
+            plain = decrypt_value(value)
+            decryption_cache.set(value, plain)
+        resultado[value] = plain
+    return resultado
+
+
+def decrypt_values(values) -> List[str]:
+    """
+    Descifra los elementos de un campo médico (lista JSONB) usando decryption_cache.
+    Los valores no cifrados (datos anteriores al cifrado) se devuelven tal cual.
+    """
+    if not values:
+        return []
+    if isinstance(values, str):
+        values = [values]
+    plain = decrypt_batch(values)
+    return [plain.get(v, v) for v in values]
+
+
+class PasswordHasherBusyError(Exception):
+    """El pool de hashing está saturado; la petición se rechaza (503) en lugar de encolarse."""
+
+
+class PasswordHasherPool:
+    """
+    Pool dedicado y acotado para bcrypt.
+
+    bcrypt libera el GIL mientras calcula el hash, así que un ThreadPoolExecutor
+    propio basta para paralelizarlo sin competir con el limitador de hilos por
+    defecto de AnyIO (el que usan los endpoints síncronos y run_in_threadpool).
+
+    Control de admisión: como máximo `max_pending` operaciones (en ejecución + en
+    cola); por encima se lanza PasswordHasherBusyError de inmediato.
+
+    Métricas:
+      - password_hash_queue_seconds: espera en cola hasta que un hilo toma la tarea
+      - password_hash_seconds:       duración del cálculo bcrypt
+      - password_hash_rejected_total: peticiones rechazadas por saturación
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._queue_wait = metrics.histogram("password_hash_queue_seconds")
+        self._hash_time = metrics.histogram("password_hash_seconds")
+        self._rejected = metrics.counter("password_hash_rejected_total")
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Se crea al primer uso y de nuevo tras shutdown() (varios lifespans por proceso)."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _timed(self, enqueued_at: float, fn: Callable[..., T], *args) -> T:
+        started_at = time.perf_counter()
+        self._queue_wait.observe(started_at - enqueued_at)
+        try:
+            return fn(*args)
+        finally:
+            self._hash_time.observe(time.perf_counter() - started_at)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """
+        Ejecuta fn(*args) en el pool de hashing.
+
+        Raises:
+            PasswordHasherBusyError: Si ya hay max_pending operaciones en vuelo
+        """
+        if self._pending >= self.max_pending:
+            self._rejected.inc()
+            raise PasswordHasherBusyError("Pool de hashing de contraseñas saturado")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, self._timed, time.perf_counter(), fn, *args
+            )
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Instancia global (por worker)
+password_hasher = PasswordHasherPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar si una contraseña coincide con el hash.
-    Ejecuta bcrypt en un hilo separado para no bloquear el event loop.
+    Ejecuta bcrypt en el pool dedicado para no bloquear el event loop.
     """
-    return await anyio.to_thread.run_sync(
-        lambda: pwd_context.verify(plain_password, hashed_password)
-    )
+    return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verificar una contraseña y, si el hash usa otro coste, generar uno nuevo.
+    Ejecuta bcrypt en el pool dedicado para no bloquear el event loop.
+
+    Returns:
+        (válida, nuevo_hash); nuevo_hash es None si el hash actual sigue vigente
+    """
+    return await password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 async def get_password_hash(password: str) -> str:
     """Hashear una contraseña.
-    Ejecuta bcrypt en un hilo separado para no bloquear el event loop.
+    Ejecuta bcrypt en el pool dedicado para no bloquear el event loop.
     """
-    return await anyio.to_thread.run_sync(
-        lambda: pwd_context.hash(password)
-    )
+    return await password_hasher.run(pwd_context.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
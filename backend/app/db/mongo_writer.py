@@ -0,0 +1,224 @@
+"""Escritor asíncrono por lotes para colecciones MongoDB de solo inserción (logs, eventos)"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from .mongodb import mongodb
+from ..core.config import settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Código de error de MongoDB para clave duplicada (_id ya insertado)
+DUPLICATE_KEY_ERROR = 11000
+
+
+class BufferedMongoWriter:
+    """
+    Cola acotada en proceso + tarea de fondo que la vacía con insert_many.
+
+    submit() no espera a MongoDB: encola el documento y retorna de inmediato.
+    La tarea de fondo agrupa documentos hasta `batch_size` o hasta que pasan
+    `flush_interval` segundos desde el primero del lote, lo que ocurra antes.
+    Si la cola está llena el documento se descarta y se cuenta (nunca bloquea la petición).
+
+    Un lote que falla se reintenta hasta `max_retries` veces (espera creciente);
+    después se descarta y se cuenta como fallido.
+
+    Métricas de entrega (prefijo mongo_writer_<colección>):
+      - _submitted_total: documentos aceptados en la cola
+      - _written_total / _dropped_total (cola llena) / _failed_total (tras reintentos)
+      - _retries_total: reintentos de insert_many
+      - _batch_seconds: duración de cada insert_many
+    En todo momento: submitted = written + failed + en cola (+ lote en curso).
+
+    La cola se crea de nuevo en cada start() (una asyncio.Queue queda ligada al
+    event loop que la espera), así que las instancias globales sirven a varios
+    lifespans en el mismo proceso (tests, recarga del servidor).
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+        max_retries: int = 0,
+        retry_backoff: float = 0.5,
+    ):
+        self.collection_name = collection_name
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._collecting: List[Dict[str, Any]] = []
+
+        prefix = f"mongo_writer_{collection_name}"
+        self._submitted = metrics.counter(f"{prefix}_submitted_total")
+        self._retries = metrics.counter(f"{prefix}_retries_total")
+        self._written = metrics.counter(f"{prefix}_written_total")
+        self._dropped = metrics.counter(f"{prefix}_dropped_total")
+        self._failed = metrics.counter(f"{prefix}_failed_total")
+        self._batch_time = metrics.histogram(f"{prefix}_batch_seconds")
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped.value
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de entrega de este escritor"""
+        return {
+            "submitted": self._submitted.value,
+            "written": self._written.value,
+            "dropped": self._dropped.value,
+            "failed": self._failed.value,
+            "retries": self._retries.value,
+            "queued": self.queue_size,
+        }
+
+    def submit(self, document: Dict[str, Any]) -> bool:
+        """Encola un documento; retorna False si la cola está llena y se descartó"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        try:
+            self._queue.put_nowait(document)
+            self._submitted.inc()
+            return True
+        except asyncio.QueueFull:
+            self._dropped.inc()
+            return False
+
+    def start(self) -> None:
+        """
+        Arranca la tarea de fondo (llamar desde el lifespan) con una cola nueva,
+        ligada al event loop actual; los documentos que quedaran encolados pasan a ella.
+        """
+        if self._task is not None and not self._task.done():
+            return
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        while self._queue is not None and not self._queue.empty():
+            queue.put_nowait(self._queue.get_nowait())
+        self._queue = queue
+        self._task = asyncio.create_task(self._run(), name=f"mongo-writer-{self.collection_name}")
+        self._task.add_done_callback(self._log_task_exit)
+
+    def _log_task_exit(self, task: asyncio.Task) -> None:
+        """Sin este aviso, una tarea caída dejaría de escribir sin dejar rastro"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"La tarea de escritura en Mongo ({self.collection_name}) terminó con error: "
+                f"{task.exception()!r}; {self.queue_size} documentos en cola"
+            )
+
+    async def stop(self) -> None:
+        """Detiene la tarea de fondo y escribe todo lo pendiente (llamar en el apagado)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Lote que se estaba escribiendo al cancelar: se deja terminar (no se duplica)
+        if self._inflight is not None:
+            await self._inflight
+            self._inflight = None
+        # Lote a medio reunir: aún no se escribió
+        if self._collecting:
+            batch, self._collecting = self._collecting, []
+            await self._write(batch)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Vacía la cola completa en lotes de batch_size"""
+        while self._queue is not None and not self._queue.empty():
+            batch = [self._queue.get_nowait() for _ in range(min(self.batch_size, self._queue.qsize()))]
+            await self._write(batch)
+
+    async def _collect(self, batch: List[Dict[str, Any]]) -> None:
+        """Reúne en `batch` hasta batch_size documentos o hasta flush_interval tras el primero"""
+        batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        while True:
+            await self._collect(self._collecting)
+            batch, self._collecting = self._collecting, []
+            # shield: si se cancela la tarea, la escritura en curso termina y stop() la espera
+            self._inflight = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        for attempt in range(self.max_retries + 1):
+            started_at = time.perf_counter()
+            try:
+                collection = await mongodb.get_collection(self.collection_name)
+                await collection.insert_many(batch, ordered=False)
+                self._written.inc(len(batch))
+                return
+            except asyncio.CancelledError:
+                raise
+            except BulkWriteError as e:
+                # insert_many asigna _id a cada documento antes de enviarlo: en un reintento,
+                # los ya insertados fallan por clave duplicada y cuentan como escritos
+                pendientes = sorted({
+                    err["index"] for err in e.details.get("writeErrors", [])
+                    if err.get("code") != DUPLICATE_KEY_ERROR
+                })
+                self._written.inc(len(batch) - len(pendientes))
+                if not pendientes:
+                    return
+                batch = [batch[i] for i in pendientes]
+                error = e
+            except Exception as e:
+                error = e
+            finally:
+                self._batch_time.observe(time.perf_counter() - started_at)
+
+            if attempt < self.max_retries:
+                self._retries.inc()
+                await asyncio.sleep(self.retry_backoff * (attempt + 1))
+
+        self._failed.inc(len(batch))
+        logger.error(f"Fallo al escribir {len(batch)} documentos en Mongo ({self.collection_name}): {error}")
+
+
+# Instancia global para los logs de acceso (colección analytics)
+analytics_writer = BufferedMongoWriter(
+    "analytics",
+    max_queue=settings.ANALYTICS_QUEUE_MAX,
+    batch_size=settings.ANALYTICS_BATCH_SIZE,
+    flush_interval=settings.ANALYTICS_FLUSH_INTERVAL_SECONDS,
+)
+
+# Instancia global para la auditoría clínica (colección physio_events): con reintentos
+physio_events_writer = BufferedMongoWriter(
+    "physio_events",
+    max_queue=settings.PHYSIO_AUDIT_QUEUE_MAX,
+    batch_size=settings.PHYSIO_AUDIT_BATCH_SIZE,
+    flush_interval=settings.PHYSIO_AUDIT_FLUSH_INTERVAL_SECONDS,
+    max_retries=settings.PHYSIO_AUDIT_MAX_RETRIES,
+)
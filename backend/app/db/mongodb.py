@@ -1,12 +1,47 @@
 """Gestor de conexión MongoDB asíncrono usando Motor - Singleton"""
-from typing import Optional
+from typing import Dict, List, Optional
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pymongo.errors import ConnectionFailure, OperationFailure
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Códigos de MongoDB cuando ya existe un índice con las mismas claves y otras opciones
+INDEX_OPTIONS_CONFLICT = 85
+INDEX_KEY_SPECS_CONFLICT = 86
+
+
+def declared_indexes() -> Dict[str, List[IndexModel]]:
+    """
+    Índices por colección, alineados con las consultas reales.
+
+      - analytics:     logs de acceso por usuario (LogRequestsMiddleware) + retención TTL
+      - physio_events: PhysioAuditService.get_events_by_actor / get_events_by_entity
+      - progress:      progreso por usuario y fecha
+    """
+    return {
+        "analytics": [
+            IndexModel([("userId", ASCENDING), ("timestamp", DESCENDING)], name="userId_1_timestamp_-1"),
+            IndexModel(
+                [("timestamp", ASCENDING)],
+                name="timestamp_ttl",
+                expireAfterSeconds=settings.ANALYTICS_RETENTION_DAYS * 24 * 3600,
+            ),
+        ],
+        "physio_events": [
+            IndexModel([("actor.id", ASCENDING), ("timestamp", DESCENDING)], name="actor_id_timestamp"),
+            IndexModel(
+                [("entity.type", ASCENDING), ("entity.id", ASCENDING), ("timestamp", DESCENDING)],
+                name="entity_timestamp",
+            ),
+        ],
+        "progress": [
+            IndexModel([("userId", ASCENDING), ("date", DESCENDING)], name="userId_1_date_-1"),
+        ],
+    }
+
 class MongoDBManager:
     _instance = None
     _client: Optional[AsyncIOMotorClient] = None
@@ -53,20 +88,30 @@ class MongoDBManager:
         return self.db[collection_name]
 
     async def create_indexes(self):
-        """Crea los índices necesarios en las colecciones"""
-        try:
-            # Índices para la colección de analytics
-            analytics = self.db.analytics
-            await analytics.create_index([("userId", 1), ("timestamp", -1)])
-            
-            # Índices para la colección de progreso
-            progress = self.db.progress
-            await progress.create_index([("userId", 1), ("date", -1)])
-            
-            logger.info("Índices creados exitosamente")
-        except OperationFailure as e:
-            logger.error(f"Error al crear índices: {e}")
-            raise
+        """
+        Crea los índices declarados en declared_indexes() (idempotente, se llama en el lifespan).
+
+        Si un índice ya existe con otras opciones (p. ej. cambió ANALYTICS_RETENTION_DAYS),
+        el TTL se actualiza con collMod en lugar de fallar.
+        """
+        for collection_name, indexes in declared_indexes().items():
+            collection = self.db[collection_name]
+            for index in indexes:
+                try:
+                    await collection.create_indexes([index])
+                except OperationFailure as e:
+                    ttl = index.document.get("expireAfterSeconds")
+                    if e.code in (INDEX_OPTIONS_CONFLICT, INDEX_KEY_SPECS_CONFLICT) and ttl is not None:
+                        await self.db.command({
+                            "collMod": collection_name,
+                            "index": {"keyPattern": dict(index.document["key"]), "expireAfterSeconds": ttl},
+                        })
+                        logger.info(f"TTL actualizado en {collection_name}.{index.document['name']}: {ttl}s")
+                    else:
+                        logger.error(f"Error al crear índice {index.document['name']} en {collection_name}: {e}")
+                        raise
+
+        logger.info("Índices creados exitosamente")
 
     async def health_check(self) -> bool:
         """Verifica el estado de la conexión"""
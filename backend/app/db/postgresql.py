@@ -1,12 +1,18 @@
 """Gestor de conexión PostgreSQL asíncrono usando SQLAlchemy - Singleton"""
 
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, Tuple
+import itertools
 import logging
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import MetaData
+import time
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy import MetaData, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -22,37 +28,152 @@ convention = {
 metadata = MetaData(naming_convention=convention)
 Base = declarative_base(metadata=metadata)
 
+# QueuePool._do_get se llama a sí mismo en algunos caminos: solo se mide la llamada externa
+_checkout_depth: ContextVar[int] = ContextVar("pg_pool_checkout_depth", default=0)
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_connection_used(session, transaction, connection):
+    """Marca la sesión al abrir su primera transacción (ya tiene conexión del pool)."""
+    session.info["connection_used"] = True
+
+
+def session_used_connection(session: AsyncSession) -> bool:
+    """True si la sesión llegó a tomar una conexión del pool."""
+    return session.info.get("connection_used", False)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    Pool asyncpg con telemetría de checkout:
+      - db_pool_checkout_seconds: espera hasta obtener conexión (incluye abrir una nueva)
+      - db_pool_timeouts_total:   checkouts que agotaron DB_POOL_TIMEOUT
+    """
+
+    def _do_get(self):
+        depth = _checkout_depth.get()
+        token = _checkout_depth.set(depth + 1)
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if depth == 0:
+                metrics.counter("db_pool_timeouts_total").inc()
+            raise
+        finally:
+            _checkout_depth.reset(token)
+            if depth == 0:
+                metrics.histogram("db_pool_checkout_seconds").observe(time.perf_counter() - started_at)
+
+
 class PostgreSQLManager:
+    """
+    Motor primario (lecturas y escrituras) y N réplicas de solo lectura
+    (POSTGRES_REPLICA_HOSTS). Las réplicas solo se usan a través de
+    SessionManager.pg_read_session; todo lo demás queda fijado al primario.
+    """
     _instance = None
     _engine = None
     _async_session_factory = None
+    _replicas: Tuple[Tuple[AsyncEngine, sessionmaker], ...] = ()
+    _replica_cursor = itertools.count()
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
+    @staticmethod
+    def _create_engine(url: str) -> AsyncEngine:
+        """Crea un motor con la configuración de pool común a primario y réplicas"""
+        return create_async_engine(
+            url,
+            echo=settings.DB_ECHO_LOG,
+            poolclass=InstrumentedAsyncPool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args={
+                # Caché de sentencias preparadas de asyncpg (por conexión)
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                # Caché de sentencias preparadas del adaptador asyncpg de SQLAlchemy
+                "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            },
+        )
+
+    @staticmethod
+    def _create_session_factory(engine: AsyncEngine) -> sessionmaker:
+        return sessionmaker(
+            engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+
     def initialize(self):
-        """Inicializa el motor de base de datos y la fábrica de sesiones"""
+        """Inicializa el motor primario, los de las réplicas y sus fábricas de sesiones"""
         try:
             if not self._engine:
-                self._engine = create_async_engine(
-                    settings.ASYNC_DATABASE_URL,
-                    echo=settings.DB_ECHO_LOG,
-                    pool_size=settings.DB_POOL_SIZE,
-                    max_overflow=settings.DB_MAX_OVERFLOW
-                )
+                self._engine = self._create_engine(settings.ASYNC_DATABASE_URL)
+                self._async_session_factory = self._create_session_factory(self._engine)
 
-                self._async_session_factory = sessionmaker(
-                    self._engine,
-                    class_=AsyncSession,
-                    expire_on_commit=False
+                replicas = []
+                for url in settings.ASYNC_REPLICA_DATABASE_URLS:
+                    engine = self._create_engine(url)
+                    replicas.append((engine, self._create_session_factory(engine)))
+                self._replicas = tuple(replicas)
+                logger.info(
+                    f"Motor PostgreSQL inicializado exitosamente "
+                    f"({len(self._replicas)} réplicas, enrutado {settings.DB_REPLICA_ROUTING})"
                 )
-                logger.info("Motor PostgreSQL inicializado exitosamente")
         except Exception as e:
             logger.error(f"Error al inicializar PostgreSQL: {e}")
             raise
-    
+
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self._replicas)
+
+    def _pick_replica(self) -> Tuple[AsyncEngine, sessionmaker]:
+        """
+        Elige la réplica para una sesión de lectura.
+          - round_robin:        en turno rotatorio
+          - least_connections:  la de menos conexiones en uso en este worker
+                                (empates resueltos en turno rotatorio)
+        """
+        replicas = self._replicas
+        start = next(self._replica_cursor) % len(replicas)
+        if settings.DB_REPLICA_ROUTING == "least_connections":
+            rotated = replicas[start:] + replicas[:start]
+            return min(rotated, key=lambda replica: replica[0].pool.checkedout())
+        return replicas[start]
+
+    def create_session(self) -> AsyncSession:
+        """
+        Crea una sesión sobre el primario. La conexión se toma del pool en la
+        primera consulta; el caller es responsable de cerrarla.
+
+        Raises:
+            RuntimeError: Si PostgreSQL no está inicializado
+        """
+        if not self._async_session_factory:
+            raise RuntimeError("PostgreSQL no está inicializado")
+        return self._async_session_factory()
+
+    def create_read_session(self) -> AsyncSession:
+        """
+        Crea una sesión de solo lectura sobre una réplica. La conexión se toma del
+        pool en la primera consulta; el caller es responsable de cerrarla.
+
+        Raises:
+            RuntimeError: Si no hay réplicas configuradas
+        """
+        if not self._replicas:
+            raise RuntimeError("No hay réplicas de PostgreSQL configuradas")
+        _, session_factory = self._pick_replica()
+        return session_factory()
+
     @asynccontextmanager
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         """
@@ -75,6 +196,25 @@ class PostgreSQLManager:
             finally:
                 await session.close()
 
+    @asynccontextmanager
+    async def get_read_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Como get_session, pero sobre una réplica (el primario si no hay réplicas).
+        Para lecturas fuera del ciclo de una petición, p. ej. exportaciones en streaming.
+        """
+        if not self._replicas:
+            async with self.get_session() as session:
+                yield session
+            return
+
+        async with self.create_read_session() as session:
+            try:
+                yield session
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Error en la sesión de réplica PostgreSQL: {e}")
+                raise
+
     async def health_check(self) -> bool:
         """Verifica el estado de la conexión"""
         try:
@@ -85,8 +225,49 @@ class PostgreSQLManager:
             logger.error(f"Error en health check de PostgreSQL: {e}")
             return False
 
+    def pool_status(self) -> Dict[str, Any]:
+        """
+        Estado del pool de conexiones de este worker (para GET /admin/metrics/db-pool).
+
+        Returns:
+            Configuración del pool, conexiones en uso / libres / overflow (primario
+            y réplicas), y la telemetría de checkout (histograma de espera y timeouts)
+        """
+        status: Dict[str, Any] = {
+            "initialized": self._engine is not None,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+        if self._engine is not None:
+            pool = self._engine.pool
+            status.update({
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        status["replicas"] = [
+            {
+                "checked_out": engine.pool.checkedout(),
+                "checked_in": engine.pool.checkedin(),
+                "overflow": max(engine.pool.overflow(), 0),
+            }
+            for engine, _ in self._replicas
+        ]
+        status["replica_routing"] = settings.DB_REPLICA_ROUTING
+        status["requests"] = metrics.counter("db_session_requests_total").value
+        status["requests_without_connection"] = metrics.counter("db_session_requests_unused_total").value
+        status["checkout_seconds"] = metrics.histogram("db_pool_checkout_seconds").snapshot()
+        status["timeouts"] = metrics.counter("db_pool_timeouts_total").value
+        return status
+
     async def close(self):
-        """Cierra todas las conexiones"""
+        """Cierra todas las conexiones (primario y réplicas)"""
+        for engine, _ in self._replicas:
+            await engine.dispose()
+        self._replicas = ()
         if self._engine:
             await self._engine.dispose()
             self._engine = None
@@ -1,20 +1,28 @@
 '''Gestor de sesiones para bases de datos PostgreSQL y MongoDB.'''
 from typing import AsyncGenerator, Optional
+import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from pymongo.database import Database
-from .postgresql import postgresql
+from app.core.metrics import metrics
+from .postgresql import postgresql, session_used_connection
 from .mongodb import mongodb
 
+logger = logging.getLogger(__name__)
+
 class SessionManager:
     """
     Gestor de sesiones que proporciona acceso a las bases de datos
     PostgreSQL y MongoDB.
     MongoDB se inicializa solo cuando se accede por primera vez.
-    PostgreSQL debe ser establecido explícitamente mediante set_pg_session. 
+    PostgreSQL también: la sesión del primario se crea al acceder a pg_session
+    (o se inyecta con set_pg_session) y la de lectura al acceder a pg_read_session.
+    Las peticiones que no consultan PostgreSQL no ocupan ninguna conexión del pool.
     """
     
     def __init__(self):
         self._pg_session: Optional[AsyncSession] = None
+        self._owns_pg_session: bool = False
+        self._pg_read_session: Optional[AsyncSession] = None
         self._mongo_db: Optional[Database] = None
         self._mongo_initialized: bool = False
 
@@ -41,19 +49,64 @@ class SessionManager:
     @property
     def pg_session(self) -> AsyncSession:
         """
-        Acceso a la sesión de PostgreSQL.
+        Acceso lazy a la sesión de PostgreSQL (primario).
+        Se crea en el primer acceso y se cierra en close_pg_sessions.
         Returns:
             AsyncSession: Sesión activa de PostgreSQL
         Raises:
-            RuntimeError: Si la sesión no ha sido inicializada
+            RuntimeError: Si PostgreSQL no está inicializado
         """
-        if not self._pg_session:
-            raise RuntimeError(
-                "Sesión PostgreSQL no inicializada."
-                "Debe llamarse set_pg_session primero."
-            )
+        if self._pg_session is None:
+            self._pg_session = postgresql.create_session()
+            self._owns_pg_session = True
         return self._pg_session
 
+    @property
+    def pg_read_session(self) -> AsyncSession:
+        """
+        Sesión de solo lectura para consultas que toleran el retraso de replicación
+        (catálogos, historiales). Se enruta a una réplica según DB_REPLICA_ROUTING;
+        sin réplicas configuradas es la misma sesión del primario.
+        Las escrituras, y las lecturas que deben ver una escritura propia, usan pg_session.
+        Returns:
+            AsyncSession: Sesión de una réplica (o del primario)
+        """
+        if not postgresql.has_replicas:
+            return self.pg_session
+        if self._pg_read_session is None:
+            self._pg_read_session = postgresql.create_read_session()
+        return self._pg_read_session
+
+    def used_pg_connection(self) -> bool:
+        """
+        Verifica si alguna sesión PostgreSQL del manager llegó a tomar una conexión.
+        Returns:
+            bool: True si se ejecutó al menos una consulta
+        """
+        return any(
+            session is not None and session_used_connection(session)
+            for session in (self._pg_session, self._pg_read_session)
+        )
+
+    async def rollback_pg_sessions(self) -> None:
+        """Revierte la transacción en curso de las sesiones creadas por el manager."""
+        for session in (self._pg_session if self._owns_pg_session else None, self._pg_read_session):
+            if session is not None:
+                await session.rollback()
+
+    async def close_pg_sessions(self) -> None:
+        """
+        Cierra las sesiones PostgreSQL creadas por el manager, devolviendo sus
+        conexiones al pool. Una sesión inyectada con set_pg_session la cierra su dueño.
+        """
+        read_session, self._pg_read_session = self._pg_read_session, None
+        if read_session is not None:
+            await read_session.close()
+        pg_session, self._pg_session = self._pg_session, None
+        if pg_session is not None and self._owns_pg_session:
+            await pg_session.close()
+        self._owns_pg_session = False
+
     async def set_pg_session(self, session: AsyncSession) -> None:
         """
         Establece la sesión PostgreSQL.
@@ -61,6 +114,7 @@ class SessionManager:
             session: Sesión de PostgreSQL a establecer
         """
         self._pg_session = session
+        self._owns_pg_session = False
 
     def has_mongo(self) -> bool:
         """
@@ -72,7 +126,7 @@ class SessionManager:
     
     def has_pg_session(self) -> bool:
         """
-        Verifica si la sesión PostgreSQL está inicializada.
+        Verifica si la sesión PostgreSQL ya fue creada (sin crearla).
         Returns:
             bool: True si la sesión está activa
         """
@@ -81,11 +135,11 @@ class SessionManager:
     async def close(self) -> None:
         """
         Limpia las referencias de las sesiones.
-        Nota: PostgreSQL se cierra automáticamente por su contex manager.
+        Nota: las sesiones PostgreSQL creadas por el manager se cierran aquí.
         Mongo usa un pool de conexiones manejado globalmente.
         """
-        # Limpia referencias de PostgreSQL
-        self._pg_session = None
+        # Cierra las sesiones PostgreSQL propias y limpia sus referencias
+        await self.close_pg_sessions()
         # Limpia referencias de MongoDB
         self._mongo_initialized = False
         self._mongo_db = None
@@ -93,8 +147,9 @@ class SessionManager:
 async def get_session_manager() -> AsyncGenerator[SessionManager, None]:
     """
     Generador de dependencias para SessionManager.
-    Inicializa PostgreSQL automáticamente.
-    MongoDB se inicializa solo cuando se accede.
+    PostgreSQL y MongoDB se inicializan solo cuando se accede; al terminar la
+    petición se cierran las sesiones PostgreSQL abiertas. Las peticiones que no
+    tomaron ninguna conexión se cuentan en db_session_requests_unused_total.
     
     Yields:
         SessionManager: Instancia del gestor de sesiones
@@ -114,17 +169,19 @@ async def get_session_manager() -> AsyncGenerator[SessionManager, None]:
         ```
     """
     manager = SessionManager()
-    # Usar el generador de PostgreSQL como context manager
-    async with postgresql.get_session() as pg_sesion:
-        await manager.set_pg_session(pg_sesion)
-        try:
-            yield manager
-        finally:
-            # El context manager de PostgreSQL se encarga del cleanup
-            # Solo limpiamos las referencias del manager
-            manager._pg_session = None
-            manager._mongo_initialized = False
-            manager._mongo_db = None
+    metrics.counter("db_session_requests_total").inc()
+    try:
+        yield manager
+    except Exception as e:
+        await manager.rollback_pg_sessions()
+        logger.error(f"Error en la sesión de PostgreSQL: {e}")
+        raise
+    finally:
+        if not manager.used_pg_connection():
+            metrics.counter("db_session_requests_unused_total").inc()
+        await manager.close_pg_sessions()
+        manager._mongo_initialized = False
+        manager._mongo_db = None
 
 # Para uso con FastAPI Depends
 get_session = get_session_manager
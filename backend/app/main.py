@@ -1,4 +1,5 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -7,6 +8,9 @@ from app.core.logging import logger
 from app.api.v1 import auth, users, exercises, progress, admin, recommendations, physio
 from app.db.postgresql import postgresql
 from app.db.mongodb import mongodb
+from app.db.mongo_writer import analytics_writer, physio_events_writer
+from app.core.security import password_hasher
+from app.services.ml_service import ml_service
 from app.middleware import setup_cors, setup_error_handlers
 
 
@@ -28,14 +32,42 @@ async def lifespan(application: FastAPI):
     try:
         await mongodb.connect()
         logger.info("Conexión MongoDB inicializada correctamente.")
+        await mongodb.create_indexes()
     except Exception as e:
         logger.error(f"Error al inicializar MongoDB: {e}")
 
+    # Logs de acceso: cola en memoria vaciada por lotes (insert_many) en segundo plano
+    analytics_writer.start()
+    # Auditoría clínica del Fisio: mismo esquema, con reintentos
+    physio_events_writer.start()
+
+    # Cargar y calentar el modelo CART antes de aceptar tráfico (/health refleja el estado)
+    if ml_service.warm_up():
+        logger.info("Modelo CART cargado y calentado correctamente.")
+    else:
+        logger.error("Modelo CART no disponible: el worker no se reporta como listo en /health.")
+
+    # Recarga en caliente de nuevas versiones del registro de modelos
+    registry_watcher = None
+    if settings.ML_REGISTRY_POLL_SECONDS > 0:
+        registry_watcher = asyncio.create_task(
+            ml_service.watch_registry(settings.ML_REGISTRY_POLL_SECONDS),
+            name="ml-registry-watcher",
+        )
+
     yield  # Aquí corre la app
 
     # Cierre de conexiones al apagar
+    if registry_watcher:
+        registry_watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await registry_watcher
+    await analytics_writer.stop()  # Escribe los logs pendientes antes de cerrar Mongo
+    await physio_events_writer.stop()
     await mongodb.disconnect()
     await postgresql.close()
+    ml_service.shutdown()
+    password_hasher.shutdown()
     logger.info("Cerrando la aplicación y conexiones...")
 
 
@@ -133,12 +165,21 @@ def create_app() -> FastAPI:
 
     @application.get("/health")
     def health_check():
-        """Health check endpoints"""
-        return {
-            "status": "healthy",
+        """
+        Health check endpoints.
+        Responde 503 mientras el modelo CART no esté cargado y calentado,
+        para que el balanceador solo envíe tráfico a workers listos.
+        """
+        content = {
+            "status": "healthy" if ml_service.is_ready else "starting",
             "version": settings.VERSION,
-            "environment": settings.ENVIRONMENT
+            "environment": settings.ENVIRONMENT,
+            "ml_model_ready": ml_service.is_ready,
+            "ml_model_version": ml_service.active_version,
         }
+        if not ml_service.is_ready:
+            return JSONResponse(status_code=503, content=content)
+        return content
 
     return application
 
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 def setup_cors(app: FastAPI) -> None:
     """
@@ -14,4 +15,6 @@ def setup_cors(app: FastAPI) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # El frontend lee el cursor de la página siguiente de los listados
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
@@ -2,11 +2,28 @@ from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.security import PasswordHasherBusyError
+from app.utils.pagination import InvalidCursorError
 
 
 def setup_error_handlers(app: FastAPI) -> None:
     """Configura manejadores globales de errores"""
+
+    @app.exception_handler(PasswordHasherBusyError)
+    async def password_hasher_busy_handler(_request, exc):
+        """Pool de bcrypt saturado (p. ej. ráfaga de logins): rechazo rápido con 503"""
+        logger.warning(f"Hashing de contraseñas saturado: {exc}")
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Servicio de autenticación saturado, intenta de nuevo en unos segundos"},
+            headers={"Retry-After": "1"},
+        )
     
+    @app.exception_handler(InvalidCursorError)
+    async def invalid_cursor_handler(_request, exc):
+        """Cursor de paginación manipulado o de otro listado: error del cliente"""
+        return JSONResponse(status_code=400, content={"detail": str(exc)})
+
     @app.exception_handler(Exception)
     async def global_exception_handler(_request, exc):
         """Manejador global de excepciones"""
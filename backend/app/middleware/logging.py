@@ -1,66 +1,80 @@
 import time
-import json
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from app.core.logging import logger
-from app.db.mongodb import mongodb
 from datetime import datetime
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logging import logger
+from app.db.mongo_writer import analytics_writer
+
+# Ignorar health checks y documentación para no saturar logs
+SKIP_PATHS = frozenset({"/", "/health", "/docs", "/redoc", "/openapi.json"})
+
+
+class LogRequestsMiddleware:
+    """
+    Middleware ASGI puro de logs de acceso.
+
+    Lee el status del mensaje http.response.start y mide el tiempo hasta que la
+    aplicación termina de enviar la respuesta. El log solo se encola:
+    analytics_writer lo escribe por lotes en segundo plano.
+
+    userId sale de scope["state"]["user_id"], que fija get_token_claims al validar
+    el JWT (None en peticiones anónimas).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        # Dict de estado compartido con la petición (request.state) para leer el userId al final
+        scope.setdefault("state", {})
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-class LogRequestsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
         # Procesar la petición
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_status)
         except Exception as e:
             # Si hay un error no manejado, lo registramos y re-lanzamos
-            process_time = (time.time() - start_time) * 1000
-            await self._log_request(request, 500, process_time, error=str(e))
-            raise e
+            process_time = (time.perf_counter() - start_time) * 1000
+            self._log_request(scope, 500, process_time, error=str(e))
+            raise
 
         # Calcular tiempo de procesamiento
-        process_time = (time.time() - start_time) * 1000
-        
-        # Registrar petición en background (fire and forget para no bloquear)
-        # Nota: En FastAPI/Starlette, para tareas background reales se recomienda BackgroundTasks,
-        # pero dentro de un middleware 'dispatch' tenemos que hacerlo aquí o usar una cola.
-        # Dado que motor es async, podemos hacerlo await sin bloquear el event loop principal demasiado.
-        try:
-            await self._log_request(request, response.status_code, process_time)
-        except Exception as e:
-            logger.error(f"Error escribiendo log de acceso en MongoDB: {e}")
-
-        return response
-
-    async def _log_request(self, request: Request, status_code: int, process_time_ms: float, error: str = None):
-        """Escribe el log en la colección de analytics de MongoDB"""
-        
-        # Ignorar health checks para no saturar logs
-        if request.url.path in ["/", "/health", "/docs", "/redoc", "/openapi.json"]:
-            return
+        process_time = (time.perf_counter() - start_time) * 1000
+        self._log_request(scope, status_code, process_time)
 
+    @staticmethod
+    def _log_request(scope: Scope, status_code: int, process_time_ms: float, error: Optional[str] = None) -> None:
+        """Encola el log para la colección de analytics de MongoDB (sin esperar a Mongo)"""
         try:
+            client = scope.get("client")
             log_entry = {
                 "timestamp": datetime.utcnow(),
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": str(request.query_params),
-                "client_host": request.client.host if request.client else None,
-                "user_agent": request.headers.get("user-agent"),
+                "userId": scope["state"].get("user_id"),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query_params": scope.get("query_string", b"").decode("latin-1"),
+                "client_host": client[0] if client else None,
+                "user_agent": Headers(scope=scope).get("user-agent"),
                 "status_code": status_code,
                 "process_time_ms": round(process_time_ms, 2),
                 "error": error
             }
+            analytics_writer.submit(log_entry)
 
-            # Intentar obtener el usuario si está autenticado (depende de cómo se maneje auth en middlewares previos)
-            # En este punto el request state podría no tener el user si el auth middleware corre después o de otra forma.
-            # Intento básico de leer header Authorization si fuera necesario, pero por ahora lo dejamos simple.
-            
-            analytics_collection = await mongodb.get_collection("analytics")
-            await analytics_collection.insert_one(log_entry)
-            
         except Exception as e:
-            # Fallback a logger de archivo si falla mongo
-            logger.error(f"Fallo al guardar log en Mongo: {e}")
+            # Fallback a logger de archivo si falla el encolado
+            logger.error(f"Fallo al encolar log para Mongo: {e}")
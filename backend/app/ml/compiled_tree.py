@@ -0,0 +1,156 @@
+"""
+Representación compilada del pipeline CART (OneHotEncoder + DecisionTreeClassifier).
+
+El árbol entrenado se exporta a arrays planos de NumPy (.npz) junto con el mapeo
+one-hot de las columnas categóricas. En inferencia solo se necesita NumPy:
+ni pandas ni scikit-learn se importan en los workers de la API.
+
+Layout del vector de características (mismo orden que el ColumnTransformer):
+    [one-hot nivel_fisico..., one-hot objetivo_principal..., edad, tiene_lesion]
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Marca de hoja en sklearn.tree._tree (TREE_LEAF / TREE_UNDEFINED)
+_LEAF = -1
+
+
+def export_compiled_model(pipeline, compiled_path: str) -> None:
+    """
+    Compila un Pipeline entrenado a arrays planos y lo guarda en formato .npz.
+
+    Args:
+        pipeline:      Pipeline con pasos 'preprocessor' (ColumnTransformer) y 'classifier'
+        compiled_path: Ruta de salida del artefacto compilado
+    """
+    preprocessor = pipeline.named_steps["preprocessor"]
+    classifier = pipeline.named_steps["classifier"]
+    tree = classifier.tree_
+
+    onehot_columns: List[str] = []
+    passthrough_columns: List[str] = []
+    categories: Dict[str, np.ndarray] = {}
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "cat":
+            for column, cats in zip(columns, transformer.categories_):
+                onehot_columns.append(column)
+                categories[f"categories__{column}"] = np.asarray(cats, dtype=str)
+        elif name == "remainder" and transformer != "drop":
+            passthrough_columns.extend(
+                preprocessor.feature_names_in_[c] if isinstance(c, (int, np.integer)) else c
+                for c in columns
+            )
+
+    np.savez(
+        compiled_path,
+        feature=tree.feature.astype(np.int32),
+        threshold=tree.threshold.astype(np.float64),
+        children_left=tree.children_left.astype(np.int32),
+        children_right=tree.children_right.astype(np.int32),
+        leaf_class=tree.value[:, 0, :].argmax(axis=1).astype(np.int32),
+        max_depth=np.int32(tree.max_depth),
+        classes=np.asarray(classifier.classes_, dtype=str),
+        onehot_columns=np.asarray(onehot_columns, dtype=str),
+        passthrough_columns=np.asarray(passthrough_columns, dtype=str),
+        **categories,
+    )
+
+
+class CompiledCartModel:
+    """
+    Árbol de decisión compilado. Se construye desde el .npz generado por
+    export_compiled_model y predice sin pandas ni scikit-learn.
+    """
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.leaf_class = arrays["leaf_class"]
+        self.max_depth = int(arrays["max_depth"])
+        self.classes: List[str] = arrays["classes"].tolist()
+
+        self.onehot_columns: List[str] = arrays["onehot_columns"].tolist()
+        self.passthrough_columns: List[str] = arrays["passthrough_columns"].tolist()
+
+        # Offset de cada valor categórico dentro del vector de características
+        self.onehot_offsets: Dict[str, Dict[str, int]] = {}
+        offset = 0
+        for column in self.onehot_columns:
+            cats = arrays[f"categories__{column}"].tolist()
+            self.onehot_offsets[column] = {cat: offset + i for i, cat in enumerate(cats)}
+            offset += len(cats)
+        self.passthrough_offsets = {
+            column: offset + i for i, column in enumerate(self.passthrough_columns)
+        }
+        self.n_features = offset + len(self.passthrough_columns)
+
+        # (columna, categoría) de cada índice del vector; categoría None = passthrough
+        self._feature_spec: List[Tuple[str, Optional[str]]] = [None] * self.n_features
+        for column, offsets in self.onehot_offsets.items():
+            for category, index in offsets.items():
+                self._feature_spec[index] = (column, category)
+        for column, index in self.passthrough_offsets.items():
+            self._feature_spec[index] = (column, None)
+
+        # Copias en listas Python para el recorrido escalar (más rápido que indexar NumPy)
+        self._feature = self.feature.tolist()
+        self._threshold = self.threshold.tolist()
+        self._left = self.children_left.tolist()
+        self._right = self.children_right.tolist()
+        self._leaf_class = self.leaf_class.tolist()
+
+    @classmethod
+    def load(cls, compiled_path: str) -> "CompiledCartModel":
+        with np.load(compiled_path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def _feature_value(self, profile: Mapping[str, Any], index: int) -> float:
+        """Valor de la característica `index` del vector transformado para un perfil."""
+        column, category = self._feature_spec[index]
+        if category is None:
+            return float(profile[column])
+        # handle_unknown='ignore' → categoría desconocida = todo ceros
+        return 1.0 if profile[column] == category else 0.0
+
+    def predict_one(self, profile: Mapping[str, Any]) -> str:
+        """Recorre el árbol en Python puro para un único perfil."""
+        node = 0
+        while self._left[node] != _LEAF:
+            if self._feature_value(profile, self._feature[node]) <= self._threshold[node]:
+                node = self._left[node]
+            else:
+                node = self._right[node]
+        return self.classes[self._leaf_class[node]]
+
+    def transform(self, profiles: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Construye la matriz de características (n_perfiles x n_features) en float32."""
+        X = np.zeros((len(profiles), self.n_features), dtype=np.float32)
+        for row, profile in enumerate(profiles):
+            for column, offsets in self.onehot_offsets.items():
+                offset = offsets.get(profile[column])
+                if offset is not None:
+                    X[row, offset] = 1.0
+            for column, offset in self.passthrough_offsets.items():
+                X[row, offset] = profile[column]
+        return X
+
+    def predict(self, profiles: Sequence[Mapping[str, Any]]) -> List[str]:
+        """Recorrido vectorizado: un paso de NumPy por nivel del árbol para todo el lote."""
+        if len(profiles) == 1:
+            return [self.predict_one(profiles[0])]
+
+        X = self.transform(profiles)
+        rows = np.arange(len(profiles))
+        node = np.zeros(len(profiles), dtype=np.intp)
+        for _ in range(self.max_depth):
+            is_leaf = self.children_left[node] == _LEAF
+            feature = np.where(is_leaf, 0, self.feature[node])
+            go_left = X[rows, feature] <= self.threshold[node]
+            next_node = np.where(go_left, self.children_left[node], self.children_right[node])
+            node = np.where(is_leaf, node, next_node)
+        return [self.classes[i] for i in self.leaf_class[node]]
@@ -0,0 +1,96 @@
+"""
+Tabla de consulta precomputada para el clasificador de rutas CART.
+
+El dominio de entrada es acotado (edad 0..80 según UserBase, 4 niveles físicos,
+4 objetivos y tiene_lesion binario ≈ 2.6k combinaciones), así que train.py
+enumera el dominio completo y guarda la ruta de cada combinación en un array
+uint8 de forma (edades, niveles, objetivos, 2).
+
+En la API la inferencia se reduce a un índice O(1); los valores fuera de dominio
+devuelven None y el caller recurre al árbol compilado.
+"""
+from __future__ import annotations
+
+import itertools
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# Rango de edad validado por UserBase (Field ge=0, le=80)
+EDAD_MIN = 0
+EDAD_MAX = 80
+
+
+def export_lookup_table(
+    predict_batch: Callable[[List[Dict[str, Any]]], Sequence[str]],
+    classes: Sequence[str],
+    niveles: Sequence[str],
+    objetivos: Sequence[str],
+    lookup_path: str,
+) -> None:
+    """
+    Enumera todo el dominio de entrada y guarda la ruta predicha para cada combinación.
+
+    Args:
+        predict_batch: Función que predice las rutas de una lista de perfiles
+        classes:       Rutas posibles (orden de las clases del clasificador)
+        niveles:       Valores conocidos de nivel_fisico
+        objetivos:     Valores conocidos de objetivo_principal
+        lookup_path:   Ruta de salida del artefacto (.npz)
+    """
+    edades = range(EDAD_MIN, EDAD_MAX + 1)
+    profiles = [
+        {"edad": edad, "nivel_fisico": nivel, "objetivo_principal": objetivo, "tiene_lesion": lesion}
+        for edad, nivel, objetivo, lesion in itertools.product(edades, niveles, objetivos, (0, 1))
+    ]
+    class_index = {ruta: i for i, ruta in enumerate(classes)}
+    rutas = predict_batch(profiles)
+
+    table = np.fromiter((class_index[r] for r in rutas), dtype=np.uint8, count=len(profiles))
+    np.savez(
+        lookup_path,
+        table=table.reshape(len(edades), len(niveles), len(objetivos), 2),
+        classes=np.asarray(classes, dtype=str),
+        niveles=np.asarray(niveles, dtype=str),
+        objetivos=np.asarray(objetivos, dtype=str),
+        edad_min=np.int32(EDAD_MIN),
+    )
+
+
+class RoutineLookupTable:
+    """Consulta O(1) de la ruta CART para perfiles dentro del dominio enumerado."""
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        table = arrays["table"]
+        self.shape = table.shape
+        self.edad_min = int(arrays["edad_min"])
+        self.edad_max = self.edad_min + self.shape[0] - 1
+        self.classes: List[str] = arrays["classes"].tolist()
+        self._niveles = {nivel: i for i, nivel in enumerate(arrays["niveles"].tolist())}
+        self._objetivos = {obj: i for i, obj in enumerate(arrays["objetivos"].tolist())}
+        # Tabla aplanada con las rutas ya resueltas: un solo índice por consulta
+        self._flat: List[str] = [self.classes[i] for i in table.ravel().tolist()]
+
+    @classmethod
+    def load(cls, lookup_path: str) -> "RoutineLookupTable":
+        with np.load(lookup_path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def lookup(self, edad: int, nivel_fisico: str, objetivo_principal: str, tiene_lesion: int) -> Optional[str]:
+        """
+        Returns:
+            La ruta precomputada, o None si el perfil cae fuera del dominio de la tabla
+        """
+        nivel = self._niveles.get(nivel_fisico)
+        objetivo = self._objetivos.get(objetivo_principal)
+        if (
+            nivel is None
+            or objetivo is None
+            or tiene_lesion not in (0, 1)
+            or not isinstance(edad, int)
+            or not self.edad_min <= edad <= self.edad_max
+        ):
+            return None
+        _, n_niveles, n_objetivos, _ = self.shape
+        index = (((edad - self.edad_min) * n_niveles + nivel) * n_objetivos + objetivo) * 2 + int(tiene_lesion)
+        return self._flat[index]
@@ -0,0 +1,119 @@
+"""
+Registro de modelos CART versionado en disco.
+
+Estructura:
+    <root>/manifest.json
+    <root>/v1/cart_routine_model.pkl          (pipeline sklearn, solo para auditoría/reentreno)
+    <root>/v1/cart_routine_model.npz          (árbol compilado que carga MLService)
+    <root>/v1/cart_routine_model_lookup.npz   (tabla de consulta precomputada)
+    <root>/v2/...
+
+manifest.json:
+{
+    "active": "v2",
+    "versions": {
+        "v1": {"created_at": "...", "metrics": {...}},
+        "v2": {"created_at": "...", "metrics": {...}}
+    }
+}
+
+El manifiesto se reescribe de forma atómica (archivo temporal + os.replace), de modo
+que los workers que lo sondean nunca leen un estado a medio escribir.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+MANIFEST_NAME = "manifest.json"
+MODEL_FILE = "cart_routine_model.pkl"
+COMPILED_FILE = "cart_routine_model.npz"
+LOOKUP_FILE = "cart_routine_model_lookup.npz"
+
+# Directorio por defecto: app/ml/registry/
+DEFAULT_REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "registry")
+
+
+class ModelRegistry:
+    """Acceso al manifiesto y a los artefactos de cada versión del modelo CART."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or DEFAULT_REGISTRY_DIR
+        self.manifest_path = os.path.join(self.root, MANIFEST_NAME)
+
+    def read_manifest(self) -> Dict[str, Any]:
+        """Retorna el manifiesto, o uno vacío si el registro aún no existe."""
+        if not os.path.exists(self.manifest_path):
+            return {"active": None, "versions": {}}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".manifest-", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def active_version(self) -> Optional[str]:
+        return self.read_manifest().get("active")
+
+    def version_dir(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+    def artifact_paths(self, version: str) -> Dict[str, str]:
+        """Rutas de los artefactos de una versión (model, compiled, lookup)."""
+        base = self.version_dir(version)
+        return {
+            "model": os.path.join(base, MODEL_FILE),
+            "compiled": os.path.join(base, COMPILED_FILE),
+            "lookup": os.path.join(base, LOOKUP_FILE),
+        }
+
+    def next_version(self) -> str:
+        """Nombre de la siguiente versión libre (v1, v2, ...)."""
+        numbers = [
+            int(name[1:]) for name in self.read_manifest()["versions"]
+            if name.startswith("v") and name[1:].isdigit()
+        ]
+        return f"v{max(numbers, default=0) + 1}"
+
+    def register(self, version: str, metrics: Dict[str, Any], activate: bool = True) -> None:
+        """
+        Añade una versión ya escrita en disco al manifiesto.
+
+        Args:
+            version:  Nombre de la versión (directorio con los artefactos)
+            metrics:  Métricas de entrenamiento reportadas por train_and_save_model
+            activate: Si True, la versión pasa a ser la activa
+        """
+        manifest = self.read_manifest()
+        manifest["versions"][version] = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "metrics": metrics,
+        }
+        if activate:
+            manifest["active"] = version
+        self._write_manifest(manifest)
+
+    def activate(self, version: str) -> None:
+        """
+        Marca una versión existente como activa.
+
+        Raises:
+            ValueError: Si la versión no está registrada
+        """
+        manifest = self.read_manifest()
+        if version not in manifest["versions"]:
+            raise ValueError(f"Versión de modelo {version} no registrada")
+        manifest["active"] = version
+        self._write_manifest(manifest)
+
+    def deactivate(self) -> None:
+        """Deja el registro sin versión activa (se usan los artefactos incluidos en app/ml/)."""
+        manifest = self.read_manifest()
+        manifest["active"] = None
+        self._write_manifest(manifest)
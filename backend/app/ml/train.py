@@ -7,8 +7,13 @@ from sklearn.pipeline import Pipeline
 from sklearn.metrics import classification_report
 import joblib
 import os
+from typing import Optional
 
-def train_and_save_model(data_path: str, model_path: str):
+from app.ml.compiled_tree import export_compiled_model
+from app.ml.lookup_table import export_lookup_table
+from app.ml.registry import ModelRegistry
+
+def train_and_save_model(data_path: str, model_path: str, compiled_path: Optional[str] = None, lookup_path: Optional[str] = None):
     print(f"Cargando conjunto de datos desde {data_path}...")
     df = pd.read_csv(data_path)
     
@@ -46,18 +51,69 @@ def train_and_save_model(data_path: str, model_path: str):
     print(f"Exactitud del modelo en el test set: {acc:.2f}")
     y_pred = pipeline.predict(X_test)
     print(classification_report(y_test, y_pred))
+    report = classification_report(y_test, y_pred, output_dict=True)
     
     # Exportar serialización en Joblib (.pkl)
     os.makedirs(os.path.dirname(model_path), exist_ok=True)
     joblib.dump(pipeline, model_path)
     print(f"Modelo CART guardado con éxito en: {model_path}")
 
+    # Exportar el árbol compilado (arrays NumPy) que carga MLService en la API
+    compiled_path = compiled_path or os.path.splitext(model_path)[0] + ".npz"
+    export_compiled_model(pipeline, compiled_path)
+    print(f"Árbol CART compilado guardado en: {compiled_path}")
+
+    # Enumerar el dominio completo (edad x nivel x objetivo x lesión) en una tabla de consulta
+    lookup_path = lookup_path or os.path.splitext(model_path)[0] + "_lookup.npz"
+    niveles, objetivos = pipeline.named_steps['preprocessor'].named_transformers_['cat'].categories_
+    export_lookup_table(
+        predict_batch=lambda profiles: pipeline.predict(pd.DataFrame(profiles)),
+        classes=list(pipeline.classes_),
+        niveles=list(niveles),
+        objetivos=list(objetivos),
+        lookup_path=lookup_path,
+    )
+    print(f"Tabla de consulta CART guardada en: {lookup_path}")
+
+    # Métricas que se guardan en el manifiesto del registro de modelos
+    return {
+        "accuracy": round(acc, 4),
+        "macro_f1": round(report["macro avg"]["f1-score"], 4),
+        "n_train": len(X_train),
+        "n_test": len(X_test),
+        "per_class_f1": {
+            ruta: round(report[ruta]["f1-score"], 4) for ruta in pipeline.classes_
+        },
+    }
+
+
+def train_and_register(data_path: str, registry: Optional[ModelRegistry] = None, activate: bool = True) -> str:
+    """
+    Entrena una nueva versión dentro del registro de modelos y la registra con sus métricas.
+    Los workers en ejecución detectan el cambio de versión activa y la cargan en caliente.
+
+    Returns:
+        Nombre de la versión creada (v1, v2, ...)
+    """
+    registry = registry or ModelRegistry()
+    version = registry.next_version()
+    paths = registry.artifact_paths(version)
+    metrics = train_and_save_model(
+        data_path,
+        paths["model"],
+        compiled_path=paths["compiled"],
+        lookup_path=paths["lookup"],
+    )
+    registry.register(version, metrics, activate=activate)
+    print(f"Versión {version} registrada{' y activada' if activate else ''} en {registry.root}")
+    return version
+
 if __name__ == "__main__":
+    # Ejecutar desde backend/: python -m app.ml.train
     current_dir = os.path.dirname(os.path.abspath(__file__))
     data_file = os.path.join(current_dir, "dataset_entrenamiento.csv")
-    model_file = os.path.join(current_dir, "cart_routine_model.pkl")
     
     if not os.path.exists(data_file):
         print(f"No se encontró {data_file}. Ejecuta data_generator.py primero.")
     else:
-        train_and_save_model(data_file, model_file)
+        train_and_register(data_file)
@@ -2,6 +2,11 @@ from sqlalchemy import Column, Integer, String, Text
 from sqlalchemy.orm import relationship
 from app.db.postgresql import Base
 
+# IDs de los roles sembrados en seed.sql
+PHYSIO_ROL_ID = 2  # Fisioterapeuta/Entrenador (scope clínico)
+ADMIN_ROL_ID = 3   # Administrador
+
+
 class Rol(Base):
     __tablename__ = "roles"
 
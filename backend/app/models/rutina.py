@@ -20,7 +20,7 @@ class Rutina(Base):
         nullable=True,
         comment="ID del usuario que creó la rutina (Rol 2 = Fisio, Rol 3 = Admin, None = ML auto)"
     )
-    fecha_creacion = Column(Date, server_default=text("CURRENT_DATE"))
+    fecha_creacion = Column(Date, nullable=False, server_default=text("CURRENT_DATE"))
 
     # ── Flags de ML y verificación clínica ──────────────────────────────────
     is_machine_learning_generated = Column(
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 from typing import Optional
 
+from app.core.security import decrypt_values
+
 # Base Schema
 class MedicalProfileBase(BaseModel):
     condiciones_fisicas: Optional[list[str]] = Field(default=[], description="Condiciones físicas del usuario")
@@ -21,3 +23,9 @@ class MedicalProfileResponse(MedicalProfileBase):
     id_usuario: int = Field(..., description="ID del usuario asociado")
 
     model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("condiciones_fisicas", "lesiones", "limitaciones", mode="before")
+    @classmethod
+    def decrypt_fields(cls, v):
+        """Los campos se guardan cifrados elemento a elemento (ver UserService.update_user)"""
+        return decrypt_values(v)
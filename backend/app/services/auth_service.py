@@ -1,11 +1,13 @@
 from datetime import timedelta
 from typing import Optional
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.core.config import settings
+from app.core.logging import logger
 from app.core.security import (
-    verify_password,
+    verify_and_update_password,
     create_access_token
 )
 from app.models.user import User
@@ -29,6 +31,9 @@ class AuthService:
         """
         Autentica un usuario por correo y contraseña.
 
+        Si el hash almacenado usa un coste bcrypt distinto de BCRYPT_ROUNDS,
+        se regenera con la contraseña recibida y se persiste (migración transparente).
+
         Args:
             session: Sesión de base de datos
             correo: Correo del usuario
@@ -41,11 +46,25 @@ class AuthService:
 
         if not user:
             return None
-        if not await verify_password(contrasena, user.contrasena_hash):
+        valid, new_hash = await verify_and_update_password(contrasena, user.contrasena_hash)
+        if not valid:
             return None
         if not user.is_active:
             return None
 
+        if new_hash:
+            try:
+                await session.execute(
+                    update(User)
+                    .where(User.id_usuario == user.id_usuario)
+                    .values(contrasena_hash=new_hash)
+                )
+                await session.commit()
+            except Exception as e:
+                # El login no debe fallar por no poder migrar el hash; se reintenta en el próximo
+                await session.rollback()
+                logger.warning(f"No se pudo actualizar el hash de la contraseña del usuario {user.id_usuario}: {e}")
+
         return user
 
     @staticmethod
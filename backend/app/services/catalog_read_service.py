@@ -0,0 +1,120 @@
+"""
+Ruta rápida de lectura para los listados del catálogo (GET /routines/, GET /physio/exercises).
+
+El camino habitual carga entidades ORM completas y FastAPI las vuelve a validar una a
+una con RutinaPublicOut / EjercicioOut (from_attributes + el model_validator del badge).
+Aquí se seleccionan solo las columnas del schema de salida, el verification_badge se
+calcula en SQL con un CASE y las filas salen como dict hacia ORJSONResponse, sin
+entidades ORM ni modelos Pydantic intermedios.
+
+El JSON resultante es el mismo que produce el schema (mismas claves y valores); el
+schema sigue siendo el response_model del endpoint para la documentación OpenAPI.
+Medición del ahorro por fila: python -m benchmarks.read_paths
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, case, false, func, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ejercicio import Ejercicio
+from app.models.rutina import Rutina
+from app.schemas.rutina import VerificationBadge
+from app.utils.pagination import Page, paginate_rows
+
+# Flags nulos en BD = False (los schemas los declaran bool con default False)
+_rutina_is_ml = func.coalesce(Rutina.is_machine_learning_generated, false())
+_rutina_is_verified = func.coalesce(Rutina.is_verified_by_physio, false())
+
+# Mismas reglas que RutinaPublicOut.compute_badge
+verification_badge = case(
+    (and_(_rutina_is_verified, _rutina_is_ml), VerificationBadge.ML_VERIFIED),
+    (_rutina_is_verified, VerificationBadge.PHYSIO_VERIFIED),
+    else_=VerificationBadge.ML_GENERATED,
+)
+
+# Columnas de RutinaPublicOut, en su orden
+ROUTINE_COLUMNS = (
+    Rutina.id_rutina,
+    Rutina.nombre_rutina,
+    Rutina.descripcion,
+    Rutina.nivel,
+    Rutina.duracion_estimada,
+    Rutina.categoria,
+    Rutina.creado_por,
+    Rutina.fecha_creacion,
+    _rutina_is_ml.label("is_machine_learning_generated"),
+    _rutina_is_verified.label("is_verified_by_physio"),
+    Rutina.verified_by,
+    Rutina.verified_at,
+    verification_badge.label("verification_badge"),
+)
+
+# Columnas de EjercicioOut, en su orden (videoUrl no se carga en este listado)
+EXERCISE_COLUMNS = (
+    Ejercicio.id_ejercicio,
+    Ejercicio.nombre_ejercicio,
+    Ejercicio.descripcion,
+    Ejercicio.repeticiones,
+    Ejercicio.tiempo,
+    Ejercicio.categoria,
+    Ejercicio.advertencias,
+    Ejercicio.enfoque,
+    Ejercicio.nivel_dificultad,
+    Ejercicio.contraindicaciones,
+    null().label("videoUrl"),
+    func.coalesce(Ejercicio.is_verified_by_physio, false()).label("is_verified_by_physio"),
+)
+
+
+class CatalogReadService:
+    """Listados del catálogo como filas planas, listas para serializar con orjson."""
+
+    @staticmethod
+    async def list_routines(
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+    ) -> Page[Dict[str, Any]]:
+        """
+        Página de rutinas con la forma de RutinaPublicOut, por fecha de creación
+        descendente (keyset sobre fecha_creacion, id_rutina).
+
+        Args:
+            db:     Sesión de PostgreSQL (de lectura)
+            limit:  Tamaño de página
+            cursor: Cursor de la página anterior (None = primera página)
+            skip:   Filas a saltar (compatibilidad; preferir cursor)
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
+        """
+        return await paginate_rows(
+            db, select(*ROUTINE_COLUMNS), [Rutina.fecha_creacion, Rutina.id_rutina], limit,
+            cursor=cursor, skip=skip, descending=True,
+        )
+
+    @staticmethod
+    async def list_exercises(
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+    ) -> Page[Dict[str, Any]]:
+        """
+        Página de ejercicios (activos e inactivos) con la forma de EjercicioOut,
+        ordenados por id.
+
+        Args:
+            db:     Sesión de PostgreSQL
+            limit:  Tamaño de página
+            cursor: Cursor de la página anterior (None = primera página)
+            skip:   Filas a saltar (compatibilidad; preferir cursor)
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
+        """
+        return await paginate_rows(
+            db, select(*EXERCISE_COLUMNS), [Ejercicio.id_ejercicio], limit,
+            cursor=cursor, skip=skip,
+        )
@@ -0,0 +1,241 @@
+"""
+Catálogo de ejercicios en memoria para el módulo de recomendación.
+
+El catálogo es pequeño y cambia poco, así que cada worker mantiene una instantánea
+inmutable y versionada de los ejercicios activos con índices precalculados:
+  - by_category:          categoría → ids de ejercicio (ordenados por id)
+  - by_contraindication:  contraindicación → ids de ejercicio (índice invertido)
+Cada ejercicio incluye su videoUrl, resuelto con un LEFT JOIN al cargar la instantánea:
+el mapa ejercicio → multimedia queda ligado a la versión del catálogo.
+
+Con ella, RecommendationService.generate_ml_routine filtra por ruta y lesiones con
+operaciones de conjuntos, sin ida y vuelta a PostgreSQL.
+
+Refresco:
+  - Tras crear / verificar ejercicios (endpoints del Fisio) → invalidate(); la
+    recarga la hace el siguiente acceso, fuera de la petición que escribió
+  - Por antigüedad (EXERCISE_CATALOG_TTL_SECONDS) para ver cambios de otros workers
+Las recargas de get_snapshot pasan por un asyncio.Lock: las peticiones concurrentes
+que encuentran la instantánea expirada esperan a una única consulta.
+
+Con EXERCISE_CATALOG_ENABLED=False (catálogos grandes o memoria acotada) se usa
+query_safe_exercises(): el mismo filtro resuelto en PostgreSQL, de modo que solo
+salen de la BD las filas que se devuelven.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import column, literal, select, table
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import String
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.ejercicio import Ejercicio
+from app.schemas.rutina import EjercicioEnRutinaOut
+
+# Tabla multimedia (sin modelo ORM): solo las columnas que usa el catálogo
+_multimedia = table(
+    "multimedia", column("id_ejercicio"), column("url_archivo"), column("fecha_subida"),
+)
+
+
+def _to_out(ej: Ejercicio, url_archivo: Optional[str]) -> EjercicioEnRutinaOut:
+    return EjercicioEnRutinaOut(
+        id_ejercicio=ej.id_ejercicio,
+        nombre_ejercicio=ej.nombre_ejercicio,
+        descripcion=ej.descripcion,
+        repeticiones=ej.repeticiones,
+        tiempo=ej.tiempo,
+        categoria=ej.categoria,
+        advertencias=ej.advertencias,
+        enfoque=ej.enfoque,
+        nivel_dificultad=ej.nivel_dificultad,
+        contraindicaciones=ej.contraindicaciones if isinstance(ej.contraindicaciones, list) else [],
+        videoUrl=url_archivo,
+        is_verified_by_physio=ej.is_verified_by_physio,
+    )
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Instantánea inmutable de los ejercicios activos y sus índices.
+    `digest` es la huella del contenido: igual en todos los workers que cargaron
+    el mismo catálogo, distinta en cuanto cambia un ejercicio (a diferencia de
+    `version`, que es un contador local del worker).
+    """
+    version: int
+    digest: str
+    loaded_at: float
+    exercises: Mapping[int, EjercicioEnRutinaOut]
+    by_category: Mapping[str, Tuple[int, ...]]
+    by_contraindication: Mapping[str, FrozenSet[int]]
+
+    @classmethod
+    def build(cls, version: int, exercises: Iterable[EjercicioEnRutinaOut]) -> "CatalogSnapshot":
+        by_id = {ej.id_ejercicio: ej for ej in sorted(exercises, key=lambda ej: ej.id_ejercicio)}
+        digest = hashlib.sha1()
+        for ej in by_id.values():
+            digest.update(ej.model_dump_json().encode())
+
+        by_category: Dict[str, List[int]] = {}
+        by_contraindication: Dict[str, set] = {}
+        for id_ejercicio, ej in by_id.items():
+            by_category.setdefault(ej.categoria, []).append(id_ejercicio)
+            for contraindicacion in ej.contraindicaciones or []:
+                by_contraindication.setdefault(contraindicacion, set()).add(id_ejercicio)
+
+        return cls(
+            version=version,
+            digest=digest.hexdigest(),
+            loaded_at=time.monotonic(),
+            exercises=by_id,
+            by_category={cat: tuple(ids) for cat, ids in by_category.items()},
+            by_contraindication={c: frozenset(ids) for c, ids in by_contraindication.items()},
+        )
+
+    def safe_exercises(
+        self,
+        categorias: Iterable[str],
+        lesiones: Iterable[str],
+        limit: Optional[int] = None,
+    ) -> List[EjercicioEnRutinaOut]:
+        """
+        Ejercicios de las categorías dadas sin contraindicaciones para las lesiones
+        del usuario, ordenados por id.
+
+        Args:
+            categorias: Categorías permitidas por la ruta (vacío = todas)
+            lesiones:   Lesiones del usuario
+            limit:      Máximo de ejercicios a retornar
+        """
+        categorias = list(categorias)
+        if categorias:
+            candidatos = set()
+            for categoria in categorias:
+                candidatos.update(self.by_category.get(categoria, ()))
+        else:
+            candidatos = set(self.exercises)
+
+        excluidos = set()
+        for lesion in lesiones:
+            excluidos |= self.by_contraindication.get(lesion, frozenset())
+
+        seguros = sorted(candidatos - excluidos)
+        if limit is not None:
+            seguros = seguros[:limit]
+        return [self.exercises[i] for i in seguros]
+
+
+class ExerciseCatalog:
+    """Contenedor de la instantánea vigente del catálogo (una por worker)."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._invalidations = 0
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _is_fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        return snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl_seconds
+
+    async def get_snapshot(self, db: AsyncSession) -> CatalogSnapshot:
+        """Retorna la instantánea vigente, cargándola si no existe o expiró."""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        async with self._refresh_lock:
+            # Otra petición pudo recargarla mientras esperábamos el lock
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+            return await self.refresh(db)
+
+    async def refresh(self, db: AsyncSession) -> CatalogSnapshot:
+        """
+        Carga los ejercicios activos (con su multimedia) y publica una nueva instantánea.
+        Si se invalida el catálogo mientras tanto, la instantánea se retorna pero no se
+        publica: puede no incluir la escritura que provocó la invalidación.
+        """
+        invalidations = self._invalidations
+        result = await db.execute(
+            select(Ejercicio, _multimedia.c.url_archivo)
+            .outerjoin(_multimedia, _multimedia.c.id_ejercicio == Ejercicio.id_ejercicio)
+            .where(Ejercicio.activo == True)
+            .order_by(Ejercicio.id_ejercicio, _multimedia.c.fecha_subida)
+        )
+        # Si un ejercicio tiene varios archivos, prevalece la última fila: la subida más
+        # reciente, el mismo archivo que elige query_safe_exercises
+        exercises = {ej.id_ejercicio: _to_out(ej, url_archivo) for ej, url_archivo in result.all()}
+        self._version += 1
+        snapshot = CatalogSnapshot.build(self._version, exercises.values())
+        if invalidations == self._invalidations:
+            self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Fuerza la recarga en el próximo acceso."""
+        self._invalidations += 1
+        self._snapshot = None
+
+    @staticmethod
+    async def query_safe_exercises(
+        db: AsyncSession,
+        categorias: Iterable[str],
+        lesiones: Iterable[str],
+        limit: int,
+    ) -> List[EjercicioEnRutinaOut]:
+        """
+        Variante en PostgreSQL de CatalogSnapshot.safe_exercises: filtro, orden y
+        LIMIT se aplican en la consulta.
+
+        Las contraindicaciones se excluyen con un anti-join sobre
+        `contraindicaciones ?| :lesiones`; la subconsulta positiva es la que puede
+        usar el índice GIN idx_ejercicios_contraindicaciones (un NOT directo no lo usa).
+        Las filas con contraindicaciones NULL no salen en la subconsulta (NULL ?| ...
+        es NULL), así que se conservan como ejercicios sin contraindicaciones, igual
+        que en la instantánea; un NOT directo las descartaría.
+
+        Args:
+            db:         Sesión de PostgreSQL
+            categorias: Categorías permitidas por la ruta (vacío = todas)
+            lesiones:   Lesiones del usuario
+            limit:      Máximo de ejercicios a retornar
+        """
+        categorias = list(categorias)
+        lesiones = list(lesiones)
+
+        # Multimedia más reciente del ejercicio (una fila como máximo, no altera el LIMIT)
+        video_url = (
+            select(_multimedia.c.url_archivo)
+            .where(_multimedia.c.id_ejercicio == Ejercicio.id_ejercicio)
+            .order_by(_multimedia.c.fecha_subida.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        query = select(Ejercicio, video_url).where(Ejercicio.activo == True)
+        if categorias:
+            query = query.where(Ejercicio.categoria.in_(categorias))
+        if lesiones:
+            contraindicados = select(Ejercicio.id_ejercicio).where(
+                Ejercicio.contraindicaciones.has_any(literal(lesiones, ARRAY(String)))
+            )
+            query = query.where(Ejercicio.id_ejercicio.not_in(contraindicados))
+
+        result = await db.execute(query.order_by(Ejercicio.id_ejercicio).limit(limit))
+        return [_to_out(ej, url_archivo) for ej, url_archivo in result.all()]
+
+
+# Instancia global (por worker)
+exercise_catalog = ExerciseCatalog(ttl_seconds=settings.EXERCISE_CATALOG_TTL_SECONDS)
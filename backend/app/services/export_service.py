@@ -0,0 +1,204 @@
+"""
+Exportación en streaming de tablas completas para el Admin (NDJSON o CSV).
+
+En lugar de paginar respuestas JSON, cada exportación recorre la fuente con un
+cursor de servidor y emite un fragmento de texto por lote:
+  - PostgreSQL: AsyncSession.stream() con yield_per=EXPORT_BATCH_SIZE (cursor de
+    servidor de asyncpg); se seleccionan columnas, no entidades ORM
+  - MongoDB:    cursor de Motor con batch_size=EXPORT_BATCH_SIZE
+
+La memoria usada es la de un lote, sin importar el tamaño de la tabla. La sesión
+de PostgreSQL es propia del generador (réplica si la hay), porque la respuesta
+sigue emitiéndose después de que termina el ciclo de la petición.
+
+Los routers envuelven los generadores en un StreamingResponse (ver admin.py).
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Sequence
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from sqlalchemy import Select, select
+
+from app.core.config import settings
+from app.db.postgresql import postgresql
+from app.models.auditoria import AuditoriaAdmin
+from app.models.historial_progreso import HistorialProgreso
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Formato → media type de la respuesta
+EXPORT_MEDIA_TYPES: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Columnas de los eventos clínicos en CSV (rutas con punto dentro del documento)
+PHYSIO_EVENT_FIELDS = (
+    "timestamp", "action", "actor.id", "actor.correo", "actor.id_rol",
+    "entity.type", "entity.id", "metadata",
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    return value
+
+
+def _lookup(document: Mapping[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(part)
+    return value
+
+
+def format_ndjson(rows: Iterable[Mapping[str, Any]]) -> str:
+    """Un objeto JSON por línea."""
+    return "".join(
+        json.dumps(dict(row), default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def format_csv(rows: Iterable[Mapping[str, Any]], columns: Sequence[str], header: bool = False) -> str:
+    """
+    Filas CSV (RFC 4180) con las columnas dadas; las rutas con punto se
+    resuelven dentro de documentos anidados.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_csv_value(_lookup(row, column)) for column in columns] for row in rows)
+    return buffer.getvalue()
+
+
+class ExportService:
+    """Generadores de exportación: cada uno produce fragmentos de texto listos para enviar."""
+
+    # ─── PostgreSQL ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    def users_query() -> Select:
+        """Usuarios sin credenciales ni perfil médico (cifrado)."""
+        return select(
+            User.id_usuario, User.nombre, User.correo, User.edad, User.peso,
+            User.estatura, User.nivel_fisico, User.tiempo_disponible,
+            User.objetivo_principal, User.fecha_registro, User.confirmado,
+            User.is_active, User.id_rol,
+        ).order_by(User.id_usuario)
+
+    @staticmethod
+    def progress_query() -> Select:
+        return select(
+            HistorialProgreso.id_historial, HistorialProgreso.id_usuario,
+            HistorialProgreso.id_rutina, HistorialProgreso.fecha,
+            HistorialProgreso.duracion_real, HistorialProgreso.estado,
+            HistorialProgreso.notas,
+        ).order_by(HistorialProgreso.id_historial)
+
+    @staticmethod
+    def audit_query() -> Select:
+        return select(
+            AuditoriaAdmin.id_auditoria, AuditoriaAdmin.id_admin, AuditoriaAdmin.accion,
+            AuditoriaAdmin.entidad_afectada, AuditoriaAdmin.fecha_accion,
+            AuditoriaAdmin.descripcion,
+        ).order_by(AuditoriaAdmin.id_auditoria)
+
+    @staticmethod
+    async def stream_query(
+        query: Select,
+        fmt: str,
+        batch_size: int = settings.EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[str]:
+        """
+        Recorre una consulta de columnas con un cursor de servidor y emite un
+        fragmento NDJSON / CSV por lote.
+
+        Args:
+            query:      select() de columnas (no entidades ORM)
+            fmt:        "ndjson" | "csv"
+            batch_size: Filas por lote (yield_per)
+        """
+        columns: List[str] = list(query.selected_columns.keys())
+        header = fmt == "csv"
+        rows = 0
+        async with postgresql.get_read_session() as session:
+            try:
+                result = await session.stream(query.execution_options(yield_per=batch_size))
+                async for partition in result.mappings().partitions():
+                    rows += len(partition)
+                    if fmt == "csv":
+                        yield format_csv(partition, columns, header=header)
+                        header = False
+                    else:
+                        yield format_ndjson(partition)
+            except Exception as e:
+                # Los headers ya se enviaron: la respuesta queda truncada
+                logger.error(f"Exportación interrumpida tras {rows} filas: {e}")
+                raise
+        if header:
+            yield format_csv((), columns, header=True)
+
+    # ─── MongoDB ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    async def stream_collection(
+        collection: AsyncIOMotorCollection,
+        fmt: str,
+        fields: Sequence[str],
+        batch_size: int = settings.EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[str]:
+        """
+        Recorre una colección en orden de inserción (_id, siempre indexado; evita
+        ordenar la colección completa en memoria) y emite un fragmento por lote
+        del cursor. En NDJSON se conserva el documento completo (sin _id); en CSV
+        se aplanan los campos dados.
+
+        Args:
+            collection: Colección de Motor
+            fmt:        "ndjson" | "csv"
+            fields:     Columnas del CSV (rutas con punto)
+            batch_size: Documentos por lote del cursor
+        """
+        cursor = collection.find({}, {"_id": 0}).sort("_id", 1).batch_size(batch_size)
+        header = fmt == "csv"
+        batch: List[dict] = []
+        try:
+            async for document in cursor:
+                batch.append(document)
+                if len(batch) < batch_size:
+                    continue
+                if fmt == "csv":
+                    yield format_csv(batch, fields, header=header)
+                    header = False
+                else:
+                    yield format_ndjson(batch)
+                batch = []
+        finally:
+            await cursor.close()
+
+        if fmt == "csv":
+            if batch or header:
+                yield format_csv(batch, fields, header=header)
+        elif batch:
+            yield format_ndjson(batch)
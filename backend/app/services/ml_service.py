@@ -1,55 +1,384 @@
+import asyncio
 import os
-import joblib
-import pandas as pd
-from typing import Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.ml.compiled_tree import CompiledCartModel
+from app.ml.lookup_table import RoutineLookupTable
+from app.ml.registry import ModelRegistry
+
+
+def _fallback_route(edad: int, tiene_lesion: int) -> str:
+    """Heurística segura para cuando el modelo no está disponible."""
+    if edad >= 65: return "Adulto Mayor"
+    if tiene_lesion == 1: return "Rehabilitación"
+    return "Híbrido"
+
+
+class InferenceQueueFullError(Exception):
+    """Se lanza cuando la cola de inferencia alcanza ML_MAX_QUEUE_DEPTH (el caller responde 503)."""
+
+
+class InferenceMicroBatcher:
+    """
+    Agrupa las inferencias concurrentes que llegan dentro de una ventana corta
+    en una sola llamada a MLService.predict_routine_paths_batch.
+
+    Bajo carga, el coste del pipeline escala con el número de lotes y no con
+    el número de requests. Con una sola petición en vuelo, la latencia extra
+    está acotada por la ventana (window_ms).
+
+    Cada lote se ejecuta en el pool de hilos acotado de MLService (ml_svc.executor),
+    de modo que la inferencia (y una posible carga en frío del modelo) nunca bloquea
+    el event loop.
+    Las peticiones que superan max_queue_depth se rechazan de inmediato.
+    """
+
+    def __init__(
+        self,
+        ml_svc: "MLService",
+        window_ms: float,
+        max_batch_size: int,
+        max_queue_depth: int,
+    ):
+        self.ml_svc = ml_svc
+        self.window = window_ms / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_queue_depth = max(1, max_queue_depth)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Peticiones aceptadas que aún no tienen respuesta (en ventana o en el pool)
+        self._in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._in_flight
+
+    async def predict(self, edad: int, nivel_fisico: str, objetivo_principal: str, tiene_lesion: int) -> str:
+        if self._in_flight >= self.max_queue_depth:
+            raise InferenceQueueFullError(
+                f"Cola de inferencia llena ({self._in_flight}/{self.max_queue_depth})"
+            )
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(({
+            "edad": edad,
+            "nivel_fisico": nivel_fisico,
+            "objetivo_principal": objetivo_principal,
+            "tiene_lesion": tiene_lesion,
+        }, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        self._in_flight += 1
+        try:
+            return await future
+        finally:
+            self._in_flight -= 1
+
+    def _flush(self) -> None:
+        """Envía el lote pendiente al pool de inferencia."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(
+            self.ml_svc.executor,
+            self.ml_svc.predict_routine_paths_batch,
+            [profile for profile, _ in batch],
+        )
+        task.add_done_callback(lambda t: self._resolve(batch, t))
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[Dict[str, Any], asyncio.Future]], task: asyncio.Future) -> None:
+        """Resuelve los futures de cada request con el resultado del lote."""
+        if task.cancelled() or task.exception() is not None:
+            error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), ruta in zip(batch, task.result()):
+            if not future.done():
+                future.set_result(ruta)
+
+
+class ModelBundle(NamedTuple):
+    """Artefactos de una versión del modelo. Se reemplaza completo en cada recarga."""
+    version: str
+    model: Optional[CompiledCartModel]
+    lookup_table: Optional[RoutineLookupTable]
+
 
 class MLService:
-    def __init__(self):
-        self.model = None
-        # La ruta del modelo asumimos que estará en app/ml/
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        # Versión activa; las inferencias toman una referencia al inicio y la usan completa,
+        # de modo que un cambio de versión nunca mezcla artefactos de dos modelos.
+        self._bundle: Optional[ModelBundle] = None
+        # True cuando el modelo está cargado y ya respondió una inferencia de calentamiento
+        self.is_ready = False
+        # Registro versionado (app/ml/registry); si está vacío se usan los artefactos
+        # incluidos en app/ml/ generados por app/ml/train.py — solo requieren NumPy
+        self.registry = registry or ModelRegistry(settings.ML_REGISTRY_DIR or None)
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        self.model_path = os.path.join(current_dir, "..", "ml", "cart_routine_model.pkl")
+        self.model_path = os.path.join(current_dir, "..", "ml", "cart_routine_model.npz")
+        self.lookup_path = os.path.join(current_dir, "..", "ml", "cart_routine_model_lookup.npz")
+        # Serializa las recargas (tarea watch_registry y activación desde el endpoint)
+        self._reload_lock = threading.RLock()
+        # Pool acotado dedicado a la inferencia (se crea al primer uso, ver executor)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.batcher = InferenceMicroBatcher(
+            self,
+            window_ms=settings.ML_BATCH_WINDOW_MS,
+            max_batch_size=settings.ML_BATCH_MAX_SIZE,
+            max_queue_depth=settings.ML_MAX_QUEUE_DEPTH,
+        )
 
-    def load_model(self):
-        if os.path.exists(self.model_path):
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Pool acotado dedicado a la inferencia: no compite con el pool por defecto de AnyIO.
+        Se crea al primer uso y de nuevo tras shutdown(), así que la instancia global
+        sirve a varios lifespans en el mismo proceso (tests, recarga del servidor).
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.ML_EXECUTOR_WORKERS,
+                thread_name_prefix="cart-inference",
+            )
+        return self._executor
+
+    @property
+    def model(self) -> Optional[CompiledCartModel]:
+        return self._bundle.model if self._bundle else None
+
+    @property
+    def lookup_table(self) -> Optional[RoutineLookupTable]:
+        return self._bundle.lookup_table if self._bundle else None
+
+    @property
+    def active_version(self) -> Optional[str]:
+        return self._bundle.version if self._bundle else None
+
+    def _resolve_artifacts(self) -> Tuple[str, str, str]:
+        """Versión activa del registro o, si no hay registro, los artefactos incluidos."""
+        version = self.registry.active_version()
+        if version:
+            paths = self.registry.artifact_paths(version)
+            return version, paths["compiled"], paths["lookup"]
+        return "bundled", self.model_path, self.lookup_path
+
+    def _load_bundle(self, version: str, model_path: str, lookup_path: str) -> ModelBundle:
+        model = None
+        lookup_table = None
+        if os.path.exists(model_path):
             try:
-                self.model = joblib.load(self.model_path)
-                print(f"Modelo CART cargado correctamente para inferencias.")
+                model = CompiledCartModel.load(model_path)
+                print(f"Modelo CART {version} cargado correctamente para inferencias.")
             except Exception as e:
                 print(f"Error cargando modelo CART: {e}")
         else:
-            print(f"Advertencia: Modelo no encontrado en {self.model_path}.")
-            
+            print(f"Advertencia: Modelo no encontrado en {model_path}.")
+
+        if os.path.exists(lookup_path):
+            try:
+                lookup_table = RoutineLookupTable.load(lookup_path)
+            except Exception as e:
+                print(f"Error cargando tabla de consulta CART: {e}")
+        return ModelBundle(version, model, lookup_table)
+
+    @staticmethod
+    def _warm_up_bundle(bundle: ModelBundle) -> bool:
+        """Inferencias sintéticas (tabla y árbol) sobre una versión antes de publicarla."""
+        if not bundle.model and not bundle.lookup_table:
+            return False
+
+        perfil = {
+            "edad": 30,
+            "nivel_fisico": "sedentario",
+            "objetivo_principal": "Salud/Movilidad",
+            "tiene_lesion": 0,
+        }
+        try:
+            MLService._predict_with(bundle, [perfil])
+            # Fuera de dominio → recorre también el árbol compilado
+            MLService._predict_with(bundle, [perfil, {**perfil, "edad": 120}])
+        except Exception as e:
+            print(f"Error en el calentamiento del modelo CART {bundle.version}: {e}")
+            return False
+        return True
+
+    def load_model(self):
+        version, model_path, lookup_path = self._resolve_artifacts()
+        self._bundle = self._load_bundle(version, model_path, lookup_path)
+
+    def warm_up(self) -> bool:
+        """
+        Carga los artefactos y ejecuta inferencias sintéticas (tabla y árbol)
+        para que la primera petición real no pague el arranque en frío.
+        Se llama desde el lifespan de la aplicación.
+
+        Returns:
+            True si el worker quedó listo para recibir tráfico de recomendaciones
+        """
+        self.is_ready = False
+        self.load_model()
+        self.is_ready = self._warm_up_bundle(self._bundle)
+        return self.is_ready
+
+    def reload_if_changed(self) -> bool:
+        """
+        Si la versión activa del registro cambió, carga y calienta la nueva versión
+        y la publica con una sola asignación. Las inferencias en curso terminan con
+        la versión anterior; ninguna petición se descarta.
+
+        Returns:
+            True si se cambió de versión
+        """
+        with self._reload_lock:
+            version, model_path, lookup_path = self._resolve_artifacts()
+            if version == self.active_version:
+                return False
+
+            bundle = self._load_bundle(version, model_path, lookup_path)
+            if not self._warm_up_bundle(bundle):
+                print(f"Versión {version} descartada: no superó el calentamiento.")
+                return False
+
+            self._bundle = bundle
+            self.is_ready = True
+            print(f"Modelo CART activo: {version}")
+            return True
+
+    def activate_version(self, version: str) -> bool:
+        """
+        Marca una versión del registro como activa y la carga en este worker.
+        Si no supera el calentamiento, el manifiesto vuelve a la versión activa
+        anterior para que el resto de workers no intente cargarla.
+
+        Returns:
+            True si la versión quedó activa en este worker
+        Raises:
+            ValueError: Si la versión no está registrada
+        """
+        with self._reload_lock:
+            previous = self.registry.active_version()
+            self.registry.activate(version)
+            self.reload_if_changed()
+            if self.active_version == version:
+                return True
+
+            print(f"Activación de la versión {version} revertida a {previous or 'bundled'}.")
+            if previous:
+                self.registry.activate(previous)
+            else:
+                self.registry.deactivate()
+            return False
+
+    async def watch_registry(self, interval_seconds: float) -> None:
+        """
+        Tarea de fondo (lifespan): sondea el manifiesto del registro y cambia
+        de versión en caliente, sin reiniciar el worker.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await loop.run_in_executor(self.executor, self.reload_if_changed)
+            except Exception as e:
+                print(f"Error recargando el modelo CART: {e}")
+
     def predict_routine_path(self, edad: int, nivel_fisico: str, objetivo_principal: str, tiene_lesion: int) -> str:
         """
-        Realiza la inferencia utilizando el pipeline de Scikit-Learn.
+        Resuelve la ruta con la tabla precomputada (O(1)); los perfiles fuera de
+        dominio se evalúan con el árbol CART compilado.
         Retorna una de las 4 rutas: 'Adulto Mayor', 'Rehabilitación', 'Fuerza/Joven', 'Híbrido'
         """
-        if not self.model:
+        return self.predict_routine_paths_batch([{
+            "edad": edad,
+            "nivel_fisico": nivel_fisico,
+            "objetivo_principal": objetivo_principal,
+            "tiene_lesion": tiene_lesion,
+        }])[0]
+
+    def predict_routine_paths_batch(self, profiles: Sequence[Mapping[str, Any]]) -> List[str]:
+        """
+        Inferencia vectorizada: los perfiles dentro del dominio se resuelven con la
+        tabla precomputada y el resto con un único recorrido del árbol compilado.
+
+        Args:
+            profiles: Perfiles con las claves edad, nivel_fisico, objetivo_principal y tiene_lesion
+        Returns:
+            Lista de rutas en el mismo orden que los perfiles recibidos
+        """
+        if not profiles:
+            return []
+
+        if not self.model and not self.lookup_table:
             self.load_model()
-            
-        if not self.model:
+
+        return self._predict_with(self._bundle, profiles)
+
+    @staticmethod
+    def _predict_with(bundle: ModelBundle, profiles: Sequence[Mapping[str, Any]]) -> List[str]:
+        rutas: List[Optional[str]] = [None] * len(profiles)
+        if bundle.lookup_table:
+            for i, p in enumerate(profiles):
+                rutas[i] = bundle.lookup_table.lookup(
+                    p["edad"], p["nivel_fisico"], p["objetivo_principal"], p["tiene_lesion"]
+                )
+
+        pendientes = [i for i, ruta in enumerate(rutas) if ruta is None]
+        if not pendientes:
+            return rutas
+
+        if not bundle.model:
             # Fallback seguro por si el modelo no está entrenado (Cold-Start en producción antes de correr script)
-            if edad >= 65: return "Adulto Mayor"
-            if tiene_lesion == 1: return "Rehabilitación"
-            return "Híbrido"
-            
-        # Preparar la data estructural para Scikit-Learn Pipeline
-        user_data = {
-            "edad": [edad],
-            "nivel_fisico": [nivel_fisico],
-            "objetivo_principal": [objetivo_principal],
-            "tiene_lesion": [tiene_lesion]
-        }
-        
-        df = pd.DataFrame(user_data)
-        
-        # Inferencia rapida (sub 10ms normalmente con CART)
+            for i in pendientes:
+                rutas[i] = _fallback_route(profiles[i]["edad"], profiles[i]["tiene_lesion"])
+            return rutas
+
+        # Un solo recorrido del árbol para los perfiles fuera de la tabla (microsegundos por perfil)
         try:
-            prediction = self.model.predict(df)
-            return prediction[0]
+            for i, ruta in zip(pendientes, bundle.model.predict([profiles[i] for i in pendientes])):
+                rutas[i] = ruta
         except Exception as e:
             print(f"Error de inferencia: {e}")
-            return "Híbrido" # Safe Default
+            for i in pendientes:
+                rutas[i] = "Híbrido" # Safe Default
+        return rutas
+
+    async def predict_routine_path_async(self, edad: int, nivel_fisico: str, objetivo_principal: str, tiene_lesion: int) -> str:
+        """
+        Inferencia desde handlers async: la petición se une al micro-lote en curso
+        y se resuelve junto con las demás peticiones concurrentes, fuera del event loop.
+
+        Raises:
+            InferenceQueueFullError: Si la cola de inferencia está saturada
+        """
+        return await self.batcher.predict(
+            edad=edad,
+            nivel_fisico=nivel_fisico,
+            objetivo_principal=objetivo_principal,
+            tiene_lesion=tiene_lesion,
+        )
+
+    def shutdown(self) -> None:
+        """Libera el pool de inferencia al apagar la aplicación (el próximo uso crea otro)."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
 ml_service = MLService()
@@ -13,13 +13,23 @@ Estructura de documento:
     "timestamp": ISODate,
     "metadata":  {}   # payload específico por acción
 }
+
+Escritura: los eventos se encolan en physio_events_writer (insert_many por lotes con
+reintentos, en segundo plano), así que los endpoints del Fisio no esperan a MongoDB.
+Entrega medible con physio_events_writer.stats() / GET /admin/metrics
+(submitted, written, dropped, failed, retries, queued).
+
+Lectura: consultas async con Motor; las variantes stream_* iteran el cursor sin
+materializar la lista completa.
 """
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from pymongo.database import Database
+from app.db.mongo_writer import physio_events_writer
 
 # Nombre de la colección MongoDB
 COLLECTION_NAME = "physio_events"
@@ -33,7 +43,6 @@ class PhysioAuditService:
 
     Uso (en un endpoint):
         await PhysioAuditService.log(
-            mongo_db=session_manager.mongo,
             action="ROUTINE_ML_VERIFIED",
             actor=current_physio,
             entity_type="rutinas",
@@ -52,7 +61,6 @@ class PhysioAuditService:
 
     @staticmethod
     async def log(
-        mongo_db: Database,
         action: str,
         actor_id: int,
         actor_correo: str,
@@ -60,15 +68,14 @@ class PhysioAuditService:
         entity_type: str,
         entity_id: int | None = None,
         metadata: dict[str, Any] | None = None,
-    ) -> None:
+    ) -> bool:
         """
-        Inserta un evento clínico en la colección 'physio_events' de MongoDB.
+        Encola un evento clínico para la colección 'physio_events' de MongoDB.
 
-        Esta operación es fire-and-forget — no bloquea ni hace rollback si falla.
-        El caller debe encapsularla en try/except si quiere manejar el fallo.
+        Esta operación es fire-and-forget — no espera a MongoDB ni hace rollback si falla.
+        La escritura real (con reintentos) la hace physio_events_writer en segundo plano.
 
         Args:
-            mongo_db:     Instancia de la base de datos MongoDB (session_manager.mongo)
             action:       Identificador del evento ("ROUTINE_ML_VERIFIED", etc.)
             actor_id:     ID del Fisioterapeuta/Admin que realiza la acción
             actor_correo: Correo del actor para identificación rápida
@@ -76,6 +83,8 @@ class PhysioAuditService:
             entity_type:  Tipo de entidad afectada ("rutinas", "ejercicios", "usuarios")
             entity_id:    ID de la entidad afectada (None si no aplica)
             metadata:     Diccionario con datos específicos del evento (opcional)
+        Returns:
+            True si el evento quedó encolado, False si la cola estaba llena (descartado)
         """
         document = {
             "action": action,
@@ -92,34 +101,28 @@ class PhysioAuditService:
             "metadata": metadata or {},
         }
 
-        collection = mongo_db[COLLECTION_NAME]
-        # Motor PyMongo en modo síncrono dentro de FastAPI async —
-        # pymongo soporta esto sin bloquear el event loop gracias al motor de I/O
-        collection.insert_one(document)
+        return physio_events_writer.submit(document)
 
     @staticmethod
     async def log_from_user(
-        mongo_db: Database,
         action: str,
-        actor,  # User ORM instance
+        actor,  # User ORM instance (o Principal)
         entity_type: str,
         entity_id: int | None = None,
         metadata: dict[str, Any] | None = None,
-    ) -> None:
+    ) -> bool:
         """
         Wrapper de conveniencia que extrae actor_id, actor_correo y actor_rol
         directamente del objeto User ORM.
 
         Args:
-            mongo_db:    Instancia de la base de datos MongoDB
             action:      Identificador del evento
             actor:       User ORM con atributos id_usuario, correo, id_rol
             entity_type: Tipo de entidad afectada
             entity_id:   ID de la entidad afectada
             metadata:    Metadata clínica adicional
         """
-        await PhysioAuditService.log(
-            mongo_db=mongo_db,
+        return await PhysioAuditService.log(
             action=action,
             actor_id=actor.id_usuario,
             actor_correo=actor.correo,
@@ -130,13 +133,35 @@ class PhysioAuditService:
         )
 
     @staticmethod
-    def get_events_by_actor(
-        mongo_db: Database,
+    async def stream_events_by_actor(
+        mongo_db: AsyncIOMotorDatabase,
+        actor_id: int,
+        limit: int = 50,
+    ) -> AsyncIterator[dict]:
+        """
+        Itera los últimos N eventos de un actor específico (timestamp descendente),
+        documento a documento desde el cursor de Motor.
+
+        Args:
+            mongo_db:  Instancia de la base de datos MongoDB (session_manager.mongo)
+            actor_id:  ID del Fisioterapeuta
+            limit:     Máximo de eventos a retornar
+        """
+        cursor = mongo_db[COLLECTION_NAME].find(
+            {"actor.id": actor_id},
+            {"_id": 0}  # excluir _id de ObjectId (no serializable por defecto)
+        ).sort("timestamp", -1).limit(limit)
+        async for document in cursor:
+            yield document
+
+    @staticmethod
+    async def get_events_by_actor(
+        mongo_db: AsyncIOMotorDatabase,
         actor_id: int,
         limit: int = 50,
     ) -> list[dict]:
         """
-        Consulta síncrona — retorna los últimos N eventos de un actor específico.
+        Retorna los últimos N eventos de un actor específico.
         Ordenados por timestamp descendente.
 
         Args:
@@ -146,16 +171,38 @@ class PhysioAuditService:
         Returns:
             Lista de documentos (sin _id para serialización JSON limpia)
         """
-        collection = mongo_db[COLLECTION_NAME]
-        cursor = collection.find(
-            {"actor.id": actor_id},
-            {"_id": 0}  # excluir _id de ObjectId (no serializable por defecto)
-        ).sort("timestamp", -1).limit(limit)
-        return list(cursor)
+        return [
+            document
+            async for document in PhysioAuditService.stream_events_by_actor(mongo_db, actor_id, limit)
+        ]
+
+    @staticmethod
+    async def stream_events_by_entity(
+        mongo_db: AsyncIOMotorDatabase,
+        entity_type: str,
+        entity_id: int,
+        batch_size: int = 100,
+    ) -> AsyncIterator[dict]:
+        """
+        Itera todos los eventos clínicos sobre una entidad (timestamp descendente)
+        en lotes de `batch_size` desde el servidor.
+
+        Args:
+            mongo_db:    Instancia de la base de datos MongoDB
+            entity_type: "rutinas" | "ejercicios" | "usuarios"
+            entity_id:   ID de la entidad
+            batch_size:  Documentos por lote del cursor
+        """
+        cursor = mongo_db[COLLECTION_NAME].find(
+            {"entity.type": entity_type, "entity.id": entity_id},
+            {"_id": 0}
+        ).sort("timestamp", -1).batch_size(batch_size)
+        async for document in cursor:
+            yield document
 
     @staticmethod
-    def get_events_by_entity(
-        mongo_db: Database,
+    async def get_events_by_entity(
+        mongo_db: AsyncIOMotorDatabase,
         entity_type: str,
         entity_id: int,
     ) -> list[dict]:
@@ -170,9 +217,7 @@ class PhysioAuditService:
         Returns:
             Lista de documentos ordenados por timestamp desc
         """
-        collection = mongo_db[COLLECTION_NAME]
-        cursor = collection.find(
-            {"entity.type": entity_type, "entity.id": entity_id},
-            {"_id": 0}
-        ).sort("timestamp", -1)
-        return list(cursor)
+        return [
+            document
+            async for document in PhysioAuditService.stream_events_by_entity(mongo_db, entity_type, entity_id)
+        ]
@@ -0,0 +1,43 @@
+"""
+Caché en proceso de la identidad del usuario autenticado (principal).
+
+get_current_user carga el User ORM completo, y esa consulta arrastra `rol` y
+`perfil_medico` por lazy="joined". Los endpoints que solo necesitan saber quién
+llama (id, rol, si está activo) usan get_current_principal: una instantánea
+inmutable cargada con un SELECT de columnas (sin JOINs) y guardada con un TTL corto.
+
+Invalidación explícita (UserService):
+  - update_user, deactivate_user, activate_user,
+    toggle_admin_status, delete_user        → invalidate(id_usuario)
+
+En otros workers, la desactivación de una cuenta se nota como mucho tras
+PRINCIPAL_CACHE_TTL_SECONDS (ver app/utils/ttl_cache.py).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.models.rol import ADMIN_ROL_ID
+from app.utils.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Identidad mínima del usuario autenticado."""
+    id_usuario: int
+    id_rol: Optional[int]
+    is_active: bool
+    correo: str
+
+    @property
+    def is_admin(self) -> bool:
+        return self.id_rol == ADMIN_ROL_ID
+
+
+# Instancia global (por worker)
+principal_cache: TTLCache[int, Principal] = TTLCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,85 @@
+"""
+Caché en proceso de las rutinas ML generadas por RecommendationService.
+
+La rutina de un usuario depende solo de sus campos de perfil (edad, nivel físico,
+objetivo, lesiones), de la versión del modelo y del catálogo de ejercicios.
+Cada entrada se guarda por id de usuario junto con la huella (fingerprint) de esos
+campos y de la huella de contenido del catálogo (CatalogSnapshot.digest); una
+huella distinta equivale a un fallo de caché.
+
+Invalidación explícita:
+  - UserService.update_user            → invalidate_user(id_usuario)
+  - Fisio crea / verifica un ejercicio → clear() (solo en el worker que atendió la escritura)
+
+En los demás workers, un cambio del catálogo deja de servirse en cuanto su
+instantánea se recarga (EXERCISE_CATALOG_TTL_SECONDS) y cambia el digest. Con
+EXERCISE_CATALOG_ENABLED=False no hay instantánea: la cota es
+RECOMMENDATION_CACHE_TTL_SECONDS.
+
+En otros workers, un cambio se nota como mucho tras RECOMMENDATION_CACHE_TTL_SECONDS
+(ver app/utils/ttl_cache.py).
+Se guardan y se entregan copias profundas: quien recibe la rutina puede modificarla
+sin alterar la entrada compartida.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.rutina import RutinaMLOut
+from app.utils.ttl_cache import TTLCache
+
+
+def profile_fingerprint(
+    edad: int,
+    nivel_fisico: str,
+    objetivo_principal: str,
+    lesiones: Iterable[str],
+    model_version: Optional[str],
+    catalog_digest: Optional[str] = None,
+) -> str:
+    """Huella estable de las entradas que determinan la rutina recomendada."""
+    payload = json.dumps(
+        [edad, nivel_fisico, objetivo_principal, sorted(lesiones), model_version, catalog_digest],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class RecommendationCache:
+    """id_usuario → (huella, RutinaMLOut) sobre una TTLCache."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._entries: TTLCache[int, Tuple[str, RutinaMLOut]] = TTLCache(max_entries, ttl_seconds)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: int, fingerprint: str) -> Optional[RutinaMLOut]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        cached_fingerprint, rutina = entry
+        if cached_fingerprint != fingerprint:
+            self._entries.invalidate(user_id)
+            return None
+        return rutina.model_copy(deep=True)
+
+    def set(self, user_id: int, fingerprint: str, rutina: RutinaMLOut) -> None:
+        self._entries.set(user_id, (fingerprint, rutina.model_copy(deep=True)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._entries.invalidate(user_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Instancia global (por worker)
+recommendation_cache = RecommendationCache(
+    max_entries=settings.RECOMMENDATION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RECOMMENDATION_CACHE_TTL_SECONDS,
+)
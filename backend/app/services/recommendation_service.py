@@ -4,7 +4,7 @@ Separa la lógica de negocio del router HTTP (recommendations.py).
 
 Responsabilidades:
   - Inferencia con modelo CART (MLService)
-  - Filtrado de ejercicios por ruta y contraindicaciones
+  - Filtrado de ejercicios por ruta y contraindicaciones (ExerciseCatalog en memoria)
   - Persistencia de rutinas ML en la BD
   - Validación de rutinas ML por el Fisioterapeuta
   - Creación de rutinas manuales por el Fisioterapeuta
@@ -12,16 +12,21 @@ Responsabilidades:
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
-from sqlalchemy import select, text
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.security import decrypt_values
 from app.models.ejercicio import Ejercicio
 from app.models.rutina import Rutina
 from app.models.user import User
-from app.schemas.rutina import RutinaCreateIn, RutinaMLDetalle, RutinaMLOut, EjercicioEnRutinaOut
+from app.schemas.rutina import RutinaCreateIn, RutinaMLDetalle, RutinaMLOut
+from app.services.exercise_catalog import exercise_catalog
 from app.services.ml_service import MLService
+from app.services.recommendation_cache import profile_fingerprint, recommendation_cache
+from app.utils.pagination import Page, paginate
 
 # Mapeo de rutas CART → categorías de ejercicios permitidas
 _RUTA_CATEGORIAS: dict[str, list[str]] = {
@@ -60,8 +65,9 @@ class RecommendationService:
             RutinaMLOut con los ejercicios filtrados y el badge correspondiente
         """
         medical_profile = user.perfil_medico
+        # Las lesiones se guardan cifradas; se descifran (con caché) para filtrar
         lesiones_usuario: list[str] = (
-            medical_profile.lesiones
+            decrypt_values(medical_profile.lesiones)
             if medical_profile and medical_profile.lesiones
             else []
         )
@@ -71,54 +77,44 @@ class RecommendationService:
         nivel_fisico = user.nivel_fisico or "sedentario"
         objetivo_principal = user.objetivo_principal or "Salud/Movilidad"
 
-        # 1. Inferencia CART
-        ruta_recomendada = ml_svc.predict_routine_path(
+        # 0. Caché por usuario + huella del perfil y del catálogo que sirve este worker
+        #    (la instantánea vigente está en memoria; solo consulta PostgreSQL si expiró)
+        catalog = await exercise_catalog.get_snapshot(db) if settings.EXERCISE_CATALOG_ENABLED else None
+        catalog_digest = catalog.digest if catalog else None
+        fingerprint = profile_fingerprint(
+            edad, nivel_fisico, objetivo_principal, lesiones_usuario, ml_svc.active_version, catalog_digest
+        )
+        cached = recommendation_cache.get(user.id_usuario, fingerprint)
+        if cached is not None:
+            return cached
+
+        # 1. Inferencia CART (micro-lote compartido con las peticiones concurrentes)
+        ruta_recomendada = await ml_svc.predict_routine_path_async(
             edad=edad,
             nivel_fisico=nivel_fisico,
             objetivo_principal=objetivo_principal,
             tiene_lesion=tiene_lesion,
         )
 
-        # 2. Filtro por categorías de la ruta
+        # 2-4. Filtro por categorías de la ruta y contraindicaciones (catálogo en memoria,
+        #      con la multimedia de cada ejercicio ya resuelta en la instantánea, o bien
+        #      resuelto en PostgreSQL si el catálogo está desactivado)
         categorias = _RUTA_CATEGORIAS.get(ruta_recomendada, [])
-        query = select(Ejercicio).where(Ejercicio.activo == True)
-        if categorias:
-            query = query.where(Ejercicio.categoria.in_(categorias))
-
-        result = await db.execute(query)
-        ejercicios: list[Ejercicio] = list(result.scalars().all())
-
-        # 3. Mapa de multimedia
-        multimedia_result = await db.execute(text(
-            "SELECT id_ejercicio, url_archivo FROM multimedia"
-        ))
-        multimedia_map: dict[int, str] = {
-            row["id_ejercicio"]: row["url_archivo"]
-            for row in multimedia_result.mappings().all()
-        }
-
-        # 4. Filtro por contraindicaciones
-        ejercicios_seguros: list[EjercicioEnRutinaOut] = []
-        for ej in ejercicios:
-            if isinstance(ej.contraindicaciones, list):
-                if any(l in ej.contraindicaciones for l in lesiones_usuario):
-                    continue
-            ejercicios_seguros.append(EjercicioEnRutinaOut(
-                id_ejercicio=ej.id_ejercicio,
-                nombre_ejercicio=ej.nombre_ejercicio,
-                descripcion=ej.descripcion,
-                repeticiones=ej.repeticiones,
-                tiempo=ej.tiempo,
-                categoria=ej.categoria,
-                advertencias=ej.advertencias,
-                enfoque=ej.enfoque,
-                nivel_dificultad=ej.nivel_dificultad,
-                contraindicaciones=ej.contraindicaciones or [],
-                videoUrl=multimedia_map.get(ej.id_ejercicio),
-                is_verified_by_physio=ej.is_verified_by_physio,
-            ))
+        if catalog is not None:
+            ejercicios_habilitados = catalog.safe_exercises(
+                categorias=categorias,
+                lesiones=lesiones_usuario,
+                limit=_ML_EJERCICIO_LIMIT,
+            )
+        else:
+            ejercicios_habilitados = await exercise_catalog.query_safe_exercises(
+                db,
+                categorias=categorias,
+                lesiones=lesiones_usuario,
+                limit=_ML_EJERCICIO_LIMIT,
+            )
 
-        return RutinaMLOut(
+        rutina_ml = RutinaMLOut(
             ruta_ml=ruta_recomendada,
             usuario_id=user.id_usuario,
             inference_features={
@@ -131,9 +127,15 @@ class RecommendationService:
                 descripcion=f"Rutina ML: {ruta_recomendada}",
                 is_machine_learning_generated=True,
                 is_verified_by_physio=False,
-                ejercicios_habilitados=ejercicios_seguros[:_ML_EJERCICIO_LIMIT],
+                ejercicios_habilitados=ejercicios_habilitados,
             ),
         )
+        # Huella con la versión del modelo que respondió (puede haberse cargado en esta llamada)
+        fingerprint = profile_fingerprint(
+            edad, nivel_fisico, objetivo_principal, lesiones_usuario, ml_svc.active_version, catalog_digest
+        )
+        recommendation_cache.set(user.id_usuario, fingerprint, rutina_ml)
+        return rutina_ml
 
     # ──────────────────────────────────────────────────────────────────────────
     # Rutinas ML pendientes de verificación (para el dashboard del Fisio)
@@ -143,22 +145,24 @@ class RecommendationService:
         db: AsyncSession,
         skip: int = 0,
         limit: int = 20,
-    ) -> list[Rutina]:
+        cursor: Optional[str] = None,
+    ) -> Page[Rutina]:
         """
-        Retorna rutinas generadas por ML que aún no han sido verificadas.
-        Ordenadas por fecha de creación descendente.
+        Retorna una página de rutinas generadas por ML que aún no han sido verificadas.
+        Ordenadas por fecha de creación descendente (keyset sobre fecha_creacion, id_rutina;
+        índice parcial idx_rutinas_pendientes_fecha).
+
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
         """
-        result = await db.execute(
-            select(Rutina)
-            .where(
-                Rutina.is_machine_learning_generated == True,
-                Rutina.is_verified_by_physio == False,
-            )
-            .order_by(Rutina.fecha_creacion.desc())
-            .offset(skip)
-            .limit(limit)
+        query = select(Rutina).where(
+            Rutina.is_machine_learning_generated == True,
+            Rutina.is_verified_by_physio == False,
+        )
+        return await paginate(
+            db, query, [Rutina.fecha_creacion, Rutina.id_rutina], limit,
+            cursor=cursor, skip=skip, descending=True,
         )
-        return list(result.scalars().all())
 
     # ──────────────────────────────────────────────────────────────────────────
     # Verificación de rutina ML por el Fisioterapeuta
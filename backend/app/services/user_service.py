@@ -4,13 +4,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
-from app.core.security import get_password_hash, verify_password, encrypt_value
+from app.core.security import (
+    decrypt_batch,
+    decryption_cache,
+    encrypt_values,
+    get_password_hash,
+    verify_password,
+)
 from app.models.user import User
 from app.models.medical_profile import MedicalProfile
+from app.models.rol import ADMIN_ROL_ID
 from app.schemas.user import UserCreate, UserUpdate, UserChangePassword, UserResponse, AdminCreate
+from app.services.principal_cache import Principal, principal_cache
+from app.services.recommendation_cache import recommendation_cache
+from app.utils.pagination import Page, paginate
 
-# ID del rol Administrador (mirrors seed.sql: id_rol=3)
-ADMIN_ROL_ID = 3
+# Campos del perfil médico cifrados elemento a elemento
+MEDICAL_ENCRYPTED_FIELDS = ("condiciones_fisicas", "lesiones", "limitaciones")
 
 
 class UserService:
@@ -39,6 +49,45 @@ class UserService:
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_principal(
+        session: AsyncSession,
+        user_id: int
+    ) -> Optional[Principal]:
+        """
+        Obtiene la identidad mínima de un usuario (id, rol, estado, correo).
+
+        Consulta solo columnas de `usuarios`, sin los JOINs de rol y perfil médico,
+        y la guarda en la caché de principals.
+
+        Args:
+            session: Sesión de base de datos
+            user_id: ID del usuario
+
+        Returns:
+            Principal si el usuario existe, None en caso contrario
+        """
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+
+        result = await session.execute(
+            select(User.id_usuario, User.id_rol, User.is_active, User.correo)
+            .where(User.id_usuario == user_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        principal = Principal(
+            id_usuario=row.id_usuario,
+            id_rol=row.id_rol,
+            is_active=bool(row.is_active),
+            correo=row.correo,
+        )
+        principal_cache.set(principal.id_usuario, principal)
+        return principal
+
     @staticmethod
     async def get_user_by_email(
         session: AsyncSession,
@@ -63,23 +112,47 @@ class UserService:
     async def get_all_users(
         session: AsyncSession,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[User]:
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Page[User]:
         """
-        Obtiene una lista paginada de todos los usuarios.
+        Obtiene una página de usuarios ordenada por id_usuario (paginación por keyset).
 
         Args:
             session: Sesión de base de datos
-            skip: Número de registros a saltar
+            skip: Número de registros a saltar (compatibilidad; preferir cursor)
             limit: Número máximo de registros a devolver
+            cursor: Cursor de la página anterior (None = primera página)
 
         Returns:
-            Lista de usuarios
+            Página de usuarios y cursor de la siguiente
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
         """
-        result = await session.execute(
-            select(User).offset(skip).limit(limit)
+        page = await paginate(
+            session, select(User), [User.id_usuario], limit, cursor=cursor, skip=skip,
+        )
+        UserService.decrypt_medical_profiles(page.items)
+        return page
+
+    @staticmethod
+    def decrypt_medical_profiles(users: List[User]) -> None:
+        """
+        Descifra en una sola pasada los campos médicos de todos los usuarios de un listado.
+
+        Calienta decryption_cache con todos los valores de la página, de modo que la
+        serialización (MedicalProfileResponse) solo hace búsquedas en la caché.
+
+        Args:
+            users: Usuarios con perfil_medico ya cargado (lazy="joined")
+        """
+        decrypt_batch(
+            value
+            for user in users
+            if user.perfil_medico is not None
+            for field in MEDICAL_ENCRYPTED_FIELDS
+            for value in (getattr(user.perfil_medico, field) or [])
         )
-        return result.scalars().all()
 
     @staticmethod
     async def create_user(
@@ -251,7 +324,7 @@ class UserService:
         if 'contrasena' in update_data:
             update_data['contrasena_hash'] = await get_password_hash(update_data.pop('contrasena'))
 
-        # Gestionar Perfil Médico
+        # Gestionar Perfil Médico (dict de model_dump: solo los campos enviados)
         medical_profile_data = None
         if 'perfil_medico' in update_data:
             medical_profile_data = update_data.pop('perfil_medico')
@@ -272,18 +345,19 @@ class UserService:
                 result = await session.execute(stmt)
                 existing_profile = result.scalar_one_or_none()
 
-                # Preparar datos encriptados
+                # Preparar datos encriptados (un token Fernet por elemento de la lista)
                 mp_values = {}
-                if medical_profile_data.condiciones_fisicas is not None:
-                    mp_values['condiciones_fisicas'] = encrypt_value(medical_profile_data.condiciones_fisicas)
-                if medical_profile_data.lesiones is not None:
-                    mp_values['lesiones'] = encrypt_value(medical_profile_data.lesiones)
-                if medical_profile_data.limitaciones is not None:
-                    mp_values['limitaciones'] = encrypt_value(medical_profile_data.limitaciones)
+                for field in MEDICAL_ENCRYPTED_FIELDS:
+                    values = medical_profile_data.get(field)
+                    if values is not None:
+                        mp_values[field] = encrypt_values(values)
                 
                 if existing_profile:
                     # Actualizar
                     if mp_values:
+                        # Los valores reemplazados ya no deben servirse desde la caché de descifrado
+                        for field in mp_values:
+                            decryption_cache.evict(getattr(existing_profile, field) or [])
                         await session.execute(
                             update(MedicalProfile)
                             .where(MedicalProfile.id_perfil_medico == existing_profile.id_perfil_medico)
@@ -299,6 +373,9 @@ class UserService:
 
             await session.commit()
 
+            # El perfil cambió: la rutina ML cacheada y la identidad cacheada ya no son válidas
+            recommendation_cache.invalidate_user(user_id)
+            principal_cache.invalidate(user_id)
 
             # Recargar el usuario actualizado
             updated_user = await UserService.get_user_by_id(session, user_id)
@@ -355,12 +432,15 @@ class UserService:
                     detail="La contraseña actual es incorrecta"
                 )
 
+        # Hash fuera del try: la saturación del pool de bcrypt debe llegar como 503, no 500
+        nueva_contrasena_hash = await get_password_hash(password_data.nueva_contrasena)
+
         # Actualizar contraseña
         try:
             await session.execute(
                 update(User)
                 .where(User.id_usuario == user_id)
-                .values(contrasena_hash=await get_password_hash(password_data.nueva_contrasena))
+                .values(contrasena_hash=nueva_contrasena_hash)
             )
             await session.commit()
             return True
@@ -420,6 +500,7 @@ class UserService:
                 .values(is_active=False)
             )
             await session.commit()
+            principal_cache.invalidate(user_id)
             return True
 
         except Exception as e:
@@ -470,6 +551,7 @@ class UserService:
                 .values(is_active=True)
             )
             await session.commit()
+            principal_cache.invalidate(user_id)
             return True
 
         except Exception as e:
@@ -525,6 +607,8 @@ class UserService:
                 delete(User).where(User.id_usuario == user_id)
             )
             await session.commit()
+            principal_cache.invalidate(user_id)
+            recommendation_cache.invalidate_user(user_id)
             return True
 
         except Exception as e:
@@ -586,6 +670,7 @@ class UserService:
                 .values(id_rol=nuevo_rol)
             )
             await session.commit()
+            principal_cache.invalidate(user_id)
             return True
 
         except Exception as e:
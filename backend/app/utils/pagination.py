@@ -0,0 +1,203 @@
+"""
+Paginación por keyset (cursor) para los listados de PostgreSQL.
+
+En lugar de OFFSET (PostgreSQL recorre y descarta todas las filas saltadas), cada
+página continúa a partir de la clave de orden de la última fila devuelta:
+
+    WHERE (fecha_creacion, id_rutina) < (:fecha, :id)
+    ORDER BY fecha_creacion DESC, id_rutina DESC
+    LIMIT :limit
+
+Con un índice sobre las mismas columnas (y en el mismo sentido), cualquier página
+cuesta lo mismo que la primera.
+
+El cursor es opaco para el cliente: JSON en base64 url-safe con los valores de la
+clave. Los endpoints lo reciben en el parámetro `cursor` y devuelven el de la
+página siguiente en el header X-Next-Cursor (ausente en la última página).
+
+Las columnas de la clave deben ser NOT NULL y la última debe ser única (la PK).
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, TypeVar
+
+from fastapi import Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+# Header de respuesta con el cursor de la página siguiente
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Cursor mal formado o que no corresponde a la clave del listado."""
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    """Una página de resultados y el cursor de la siguiente (None si es la última)."""
+    items: List[T]
+    next_cursor: Optional[str]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(key: InstrumentedAttribute, value: Any) -> Any:
+    python_type = key.type.python_type
+    if python_type is datetime:
+        value = datetime.fromisoformat(value)
+    elif python_type is date:
+        value = date.fromisoformat(value)
+    # El valor llega a la consulta tal cual: un tipo distinto al de la columna
+    # (p. ej. texto para una clave entera) fallaría en PostgreSQL con un 500
+    if not isinstance(value, python_type) or (isinstance(value, bool) and python_type is not bool):
+        raise InvalidCursorError(f"Valor de cursor inválido para {key.key}")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Codifica los valores de la clave de orden de una fila como cursor opaco.
+
+    Args:
+        values: Valores de las columnas de la clave, en orden
+    Returns:
+        Cursor en base64 url-safe sin relleno
+    """
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> List[Any]:
+    """
+    Decodifica un cursor generado por encode_cursor para las columnas dadas.
+
+    Args:
+        cursor: Cursor recibido del cliente
+        keys:   Columnas de la clave de orden del listado
+    Returns:
+        Valores de la clave, convertidos al tipo de cada columna
+    Raises:
+        InvalidCursorError: Si el cursor no es válido para esta clave
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("Cursor de paginación inválido") from e
+
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursorError("Cursor de paginación inválido")
+    try:
+        return [_decode_value(key, value) for key, value in zip(keys, values)]
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError("Cursor de paginación inválido") from e
+
+
+def _keyset_query(
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    limit: int,
+    cursor: Optional[str],
+    skip: int,
+    descending: bool,
+) -> Select:
+    if cursor:
+        after = tuple_(*decode_cursor(cursor, keys))
+        query = query.where(tuple_(*keys) < after if descending else tuple_(*keys) > after)
+    query = query.order_by(*(key.desc() if descending else key.asc() for key in keys))
+    if skip:
+        query = query.offset(skip)
+    # Una fila de más para saber si hay página siguiente sin un COUNT
+    return query.limit(limit + 1)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False,
+) -> Page:
+    """
+    Ejecuta una consulta ORM paginada por keyset sobre `keys`.
+
+    `skip` se mantiene por compatibilidad con los clientes que paginan por offset;
+    combinado con un cursor, salta filas a partir de él.
+
+    Args:
+        db:         Sesión de PostgreSQL
+        query:      select() de la entidad, con sus filtros (sin ORDER BY ni LIMIT)
+        keys:       Columnas de la clave de orden; la última debe ser única
+        limit:      Tamaño de página
+        cursor:     Cursor de la página anterior (None = primera página)
+        skip:       Filas a saltar (OFFSET, solo compatibilidad)
+        descending: Orden descendente por la clave
+    Returns:
+        Page con las entidades y el cursor de la página siguiente
+    Raises:
+        InvalidCursorError: Si el cursor no es válido para esta clave
+    """
+    result = await db.execute(_keyset_query(query, keys, limit, cursor, skip, descending))
+    items = list(result.scalars().unique().all())
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        if items:  # limit=0: no hay última fila de la que continuar
+            next_cursor = encode_cursor([getattr(items[-1], key.key) for key in keys])
+    return Page(items=items, next_cursor=next_cursor)
+
+
+async def paginate_rows(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False,
+) -> Page[Dict[str, Any]]:
+    """
+    Variante de paginate para consultas de columnas: retorna cada fila como dict
+    (etiqueta → valor) sin construir entidades ORM. Las columnas de `keys` deben
+    estar entre las seleccionadas, con su nombre.
+
+    Args:
+        db, query, keys, limit, cursor, skip, descending: como en paginate
+        (query selecciona columnas en lugar de una entidad)
+    Returns:
+        Page con las filas como dict y el cursor de la página siguiente
+    Raises:
+        InvalidCursorError: Si el cursor no es válido para esta clave
+    """
+    result = await db.execute(_keyset_query(query, keys, limit, cursor, skip, descending))
+    columns = list(result.keys())
+    items = [dict(zip(columns, row)) for row in result.all()]
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        if items:  # limit=0: no hay última fila de la que continuar
+            next_cursor = encode_cursor([items[-1][key.key] for key in keys])
+    return Page(items=items, next_cursor=next_cursor)
+
+
+def set_next_cursor_header(response: Response, page: Page) -> None:
+    """Publica el cursor de la página siguiente en X-Next-Cursor (si la hay)."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
@@ -0,0 +1,73 @@
+"""
+Caché en proceso acotada (LRU) con expiración opcional, segura entre hilos.
+
+Base común de las cachés por worker de la aplicación:
+  - principal_cache       (app/services/principal_cache.py)
+  - recommendation_cache  (app/services/recommendation_cache.py)
+  - decryption_cache      (app/core/security.py)
+
+Cada worker tiene su propia copia: una invalidación explícita solo limpia la caché
+del worker que la ejecuta, y el TTL acota cuánto tardan los demás en ver el cambio.
+El lock protege el OrderedDict frente al threadpool de Starlette (endpoints síncronos)
+y a los executors; las operaciones son O(1) y nunca esperan E/S con el lock tomado.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """LRU con TTL: clave → (expiración, valor). ttl_seconds=None = sin expiración."""
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and (self.ttl_seconds is None or self.ttl_seconds > 0)
+
+    def get(self, key: K) -> Optional[V]:
+        """Retorna el valor vigente de `key` (y lo marca como usado) o None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        """Guarda `value`, descartando las entradas menos usadas por encima de max_entries."""
+        if not self.enabled:
+            return
+        expires_at = float("inf") if self.ttl_seconds is None else time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
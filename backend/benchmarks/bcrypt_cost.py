@@ -0,0 +1,55 @@
+"""
+Benchmark del coste bcrypt: hashes por segundo y por núcleo para cada número de rondas.
+
+Sirve para elegir BCRYPT_ROUNDS y dimensionar PASSWORD_HASH_WORKERS / la capa de login
+con números del hardware real. bcrypt libera el GIL, así que la capacidad de un worker
+es aproximadamente hashes_por_segundo_por_núcleo × núcleos dedicados.
+
+Uso (desde backend/):
+    python -m benchmarks.bcrypt_cost
+    python -m benchmarks.bcrypt_cost --min-rounds 10 --max-rounds 14 --seconds 3
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from passlib.hash import bcrypt
+
+PASSWORD = "benchmark-password-123"
+
+
+def measure(rounds: int, seconds: float) -> tuple[int, float]:
+    """Hashea en un solo hilo durante ~seconds; retorna (hashes, segundos transcurridos)."""
+    hasher = bcrypt.using(rounds=rounds)
+    hasher.hash(PASSWORD)  # calentamiento
+
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds or count == 0:
+        hasher.hash(PASSWORD)
+        count += 1
+        elapsed = time.perf_counter() - start
+    return count, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=14)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duración de la medición por coste")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"Núcleos disponibles: {cores}")
+    print(f"{'rondas':>6}  {'ms/hash':>9}  {'hashes/s/núcleo':>16}  {'hashes/s (todos)':>17}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        count, elapsed = measure(rounds, args.seconds)
+        per_core = count / elapsed
+        print(f"{rounds:>6}  {1000 * elapsed / count:>9.1f}  {per_core:>16.1f}  {per_core * cores:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
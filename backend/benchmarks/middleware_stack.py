@@ -0,0 +1,160 @@
+"""
+Benchmark del stack de middlewares de create_app: peticiones por segundo a través de
+SecurityHeaders + TrustedHost + CORS + LogRequests, comparando las versiones
+BaseHTTPMiddleware anteriores ("legacy") con las actuales en ASGI puro.
+
+Las peticiones se inyectan directamente en la aplicación ASGI (sin red ni servidor),
+así que la diferencia medida es el coste propio de los middlewares. Los logs de acceso
+solo se encolan (analytics_writer no se arranca y no hace falta MongoDB).
+
+Uso (desde backend/):
+    python -m benchmarks.middleware_stack
+    python -m benchmarks.middleware_stack --requests 20000 --concurrency 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+import app.middleware.logging as logging_middleware
+import app.middleware.security as security_middleware
+from app.db.mongo_writer import analytics_writer
+
+BENCH_PATH = "/api/v1/_bench"
+
+
+# ─── Versiones anteriores (BaseHTTPMiddleware), solo para comparar ────────────
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        for name, value in security_middleware.SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+class LegacyLogRequestsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        if request.url.path not in logging_middleware.SKIP_PATHS:
+            analytics_writer.submit({
+                "timestamp": datetime.utcnow(),
+                "method": request.method,
+                "path": request.url.path,
+                "query_params": str(request.query_params),
+                "client_host": request.client.host if request.client else None,
+                "user_agent": request.headers.get("user-agent"),
+                "status_code": response.status_code,
+                "process_time_ms": round((time.time() - start_time) * 1000, 2),
+                "error": None,
+            })
+        return response
+
+
+@contextmanager
+def legacy_middlewares():
+    """Sustituye temporalmente los middlewares que importa create_app por los anteriores"""
+    originals = (security_middleware.SecurityHeadersMiddleware, logging_middleware.LogRequestsMiddleware)
+    security_middleware.SecurityHeadersMiddleware = LegacySecurityHeadersMiddleware
+    logging_middleware.LogRequestsMiddleware = LegacyLogRequestsMiddleware
+    try:
+        yield
+    finally:
+        security_middleware.SecurityHeadersMiddleware, logging_middleware.LogRequestsMiddleware = originals
+
+
+def build_app(legacy: bool):
+    from app.main import create_app
+
+    if legacy:
+        with legacy_middlewares():
+            application = create_app()
+    else:
+        application = create_app()
+
+    @application.get(BENCH_PATH)
+    async def bench():
+        return {"ok": True}
+
+    return application
+
+
+# ─── Cliente ASGI mínimo ──────────────────────────────────────────────────────
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": BENCH_PATH,
+    "raw_path": BENCH_PATH.encode(),
+    "query_string": b"",
+    "root_path": "",
+    "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+
+async def one_request(application) -> int:
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await application(dict(SCOPE), receive, send)
+    return status
+
+
+async def run(application, total: int, concurrency: int) -> float:
+    # Calentamiento
+    for _ in range(200):
+        assert await one_request(application) == 200
+
+    per_worker = total // concurrency
+
+    async def worker():
+        for _ in range(per_worker):
+            await one_request(application)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    # Vaciar la cola de logs (el writer no está arrancado en el benchmark)
+    while analytics_writer.queue_size:
+        analytics_writer._queue.get_nowait()
+    return per_worker * concurrency / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {}
+    for label, legacy in (("BaseHTTPMiddleware (antes)", True), ("ASGI puro (ahora)", False)):
+        application = build_app(legacy)
+        results[label] = asyncio.run(run(application, args.requests, args.concurrency))
+        print(f"{label:<28} {results[label]:>10.0f} req/s")
+
+    before, after = results.values()
+    print(f"{'Mejora':<28} {after / before:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
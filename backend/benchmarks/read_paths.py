@@ -0,0 +1,141 @@
+"""
+Benchmark de los listados del catálogo: CPU por fila listada en GET /routines/ y
+GET /physio/exercises, comparando el camino anterior (entidades ORM + validación
+Pydantic from_attributes + JSONResponse) con la ruta rápida de CatalogReadService
+(columnas + badge en SQL + ORJSONResponse).
+
+La base de datos es SQLite en memoria con el mismo esquema (tablas rutinas y
+ejercicios), así que no hace falta PostgreSQL: el coste del driver es parecido en
+ambos caminos y lo que se mide es la materialización y la serialización de cada fila.
+El tiempo reportado es CPU del proceso (time.process_time).
+
+Uso (desde backend/):
+    python -m benchmarks.read_paths
+    python -m benchmarks.read_paths --rows 20000 --page-size 100
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, timedelta
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from app.models.ejercicio import Ejercicio
+from app.models.rutina import Rutina
+from app.models.user import User  # noqa: F401  (destino de las FK en los metadatos)
+from app.schemas.ejercicio import EjercicioOut
+from app.schemas.rutina import RutinaPublicOut
+from app.services.catalog_read_service import EXERCISE_COLUMNS, ROUTINE_COLUMNS
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+def build_engine(rows: int):
+    engine = create_engine("sqlite://")
+    Rutina.__table__.create(engine)
+    Ejercicio.__table__.create(engine)
+    start = date(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Rutina), [
+            {
+                "id_rutina": i,
+                "nombre_rutina": f"Rutina {i}",
+                "descripcion": "Rutina de prueba para el benchmark de lectura",
+                "nivel": "intermedio",
+                "duracion_estimada": 30,
+                "categoria": "fuerza",
+                "fecha_creacion": start + timedelta(days=i % 700),
+                "is_machine_learning_generated": i % 2 == 0,
+                "is_verified_by_physio": i % 3 == 0,
+            }
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Ejercicio), [
+            {
+                "id_ejercicio": i,
+                "nombre_ejercicio": f"Ejercicio {i}",
+                "descripcion": "Ejercicio de prueba para el benchmark de lectura",
+                "repeticiones": 12,
+                "categoria": "core",
+                "enfoque": "estabilidad",
+                "nivel_dificultad": "bajo",
+                "contraindicaciones": ["lumbar", "hombro"],
+                "is_verified_by_physio": i % 2 == 0,
+            }
+            for i in range(1, rows + 1)
+        ])
+    return engine
+
+
+def orm_pydantic_page(engine, entity, order_by, schema) -> Callable[[int], bytes]:
+    """Camino anterior: entidades ORM → validación from_attributes → JSONResponse (como FastAPI)."""
+    adapter = TypeAdapter(List[schema])
+
+    def page(page_size: int) -> bytes:
+        with Session(engine) as session:
+            items = session.scalars(select(entity).order_by(*order_by).limit(page_size)).all()
+            value = adapter.validate_python(items, from_attributes=True)
+            return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+    return page
+
+
+def raw_rows_page(engine, columns, order_by) -> Callable[[int], bytes]:
+    """Ruta rápida: columnas (badge en SQL) → dict → ORJSONResponse."""
+    def page(page_size: int) -> bytes:
+        with Session(engine) as session:
+            result = session.execute(select(*columns).order_by(*order_by).limit(page_size))
+            keys = list(result.keys())
+            return ORJSONResponse([dict(zip(keys, row)) for row in result.all()]).body
+
+    return page
+
+
+def cpu_per_row(page: Callable[[int], bytes], rows: int, page_size: int) -> float:
+    """Microsegundos de CPU por fila listada, sirviendo `rows` filas en páginas de `page_size`."""
+    page(page_size)  # calentamiento (compilación de la consulta en caché)
+    pages = max(rows // page_size, 1)
+    start = time.process_time()
+    for _ in range(pages):
+        page(page_size)
+    return (time.process_time() - start) / (pages * page_size) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Filas listadas por caso")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    engine = build_engine(args.page_size)
+    routine_order = (Rutina.fecha_creacion.desc(), Rutina.id_rutina.desc())
+    cases = {
+        "GET /routines/": (
+            orm_pydantic_page(engine, Rutina, routine_order, RutinaPublicOut),
+            raw_rows_page(engine, ROUTINE_COLUMNS, routine_order),
+        ),
+        "GET /physio/exercises": (
+            orm_pydantic_page(engine, Ejercicio, (Ejercicio.id_ejercicio,), EjercicioOut),
+            raw_rows_page(engine, EXERCISE_COLUMNS, (Ejercicio.id_ejercicio,)),
+        ),
+    }
+
+    print(f"{'Endpoint':<24} {'ORM+Pydantic':>14} {'Filas+orjson':>14} {'Mejora':>8}")
+    for label, (before_page, after_page) in cases.items():
+        before = cpu_per_row(before_page, args.rows, args.page_size)
+        after = cpu_per_row(after_page, args.rows, args.page_size)
+        print(f"{label:<24} {before:>11.1f} µs {after:>11.1f} µs {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
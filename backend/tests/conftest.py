@@ -1,8 +1,152 @@
 import pytest
 from httpx import AsyncClient, ASGITransport
 from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from unittest.mock import patch
 from app.main import app
+from app.db.postgresql import Base, postgresql
 from app.db.session import SessionManager, get_session
+from app.models import historial_progreso, medical_profile  # noqa: F401  (tables in Base.metadata)
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+# multimedia has no ORM model; same columns as db/postgresql/init.sql
+MULTIMEDIA_DDL = """
+CREATE TABLE multimedia (
+  id_multimedia VARCHAR(100) PRIMARY KEY,
+  id_ejercicio INTEGER,
+  tipo VARCHAR(50),
+  url_archivo TEXT,
+  metadatos JSON,
+  fecha_subida DATE
+)
+"""
+
+
+@pytest.fixture
+async def sqlite_engine():
+    """
+    In-memory async SQLite engine (aiosqlite) with every ORM table plus multimedia,
+    for tests where the generated SQL matters and not just the call chain.
+    """
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(MULTIMEDIA_DDL))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def sqlite_session(sqlite_engine):
+    """AsyncSession bound to sqlite_engine."""
+    async with AsyncSession(sqlite_engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture
+async def sqlite_nodes(tmp_path):
+    """
+    File-backed SQLite engines installed as postgresql's primary ("primary") and
+    read replicas ("replica-a", "replica-b"). Each has a one-row table node whose
+    name tells which engine served a query; pools are real queues, so
+    pool.checkedout() reflects the connections in use.
+    """
+    engines = {}
+    for name in ("primary", "replica-a", "replica-b"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db", poolclass=AsyncAdaptedQueuePool)
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE node (name TEXT)"))
+            await conn.execute(text("INSERT INTO node VALUES (:name)"), {"name": name})
+        engines[name] = engine
+
+    replicas = tuple(
+        (engines[name], postgresql._create_session_factory(engines[name]))
+        for name in ("replica-a", "replica-b")
+    )
+    with patch.object(postgresql, "_async_session_factory", postgresql._create_session_factory(engines["primary"])), \
+         patch.object(postgresql, "_replicas", replicas):
+        yield engines
+    for engine in engines.values():
+        await engine.dispose()
+
+
+def _lookup(document, path):
+    for part in path.split("."):
+        if not isinstance(document, dict):
+            return None
+        document = document.get(part)
+    return document
+
+
+class FakeMotorCursor:
+    """
+    In-memory Motor cursor: sort() and limit() act on the documents,
+    batch_size() records the size, and it iterates asynchronously without
+    the excluded fields (projection applies after sorting, as in MongoDB).
+    """
+
+    def __init__(self, documents, excluded=()):
+        self.documents = list(documents)
+        self.excluded = excluded
+        self.batch = None
+        self.close = AsyncMock()
+
+    def sort(self, key, direction=1):
+        self.documents.sort(key=lambda document: _lookup(document, key), reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.documents = self.documents[:n]
+        return self
+
+    def batch_size(self, n):
+        self.batch = n
+        return self
+
+    def __aiter__(self):
+        self._it = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            document = next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+        return {k: v for k, v in document.items() if k not in self.excluded}
+
+
+class FakeMotorCollection:
+    """In-memory Motor collection: find() applies equality filters on dotted paths and field exclusions."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.cursors = []
+
+    def find(self, filter=None, projection=None):
+        excluded = [field for field, include in (projection or {}).items() if not include]
+        matches = [
+            document for document in self.documents
+            if all(_lookup(document, path) == value for path, value in (filter or {}).items())
+        ]
+        cursor = FakeMotorCursor(matches, excluded)
+        self.cursors.append(cursor)
+        return cursor
+
+
+@pytest.fixture
+def motor_collection():
+    """Factory for in-memory Motor collections (FakeMotorCollection)."""
+    return FakeMotorCollection
+
 
 @pytest.fixture
 def mock_session_manager():
@@ -13,6 +157,8 @@ def mock_session_manager():
     mock_manager = MagicMock(spec=SessionManager)
     # mock pg_session as an AsyncMock since it's used in await calls or passed to async functions
     mock_manager.pg_session = AsyncMock() 
+    # Without replicas the read-only session is the primary session
+    mock_manager.pg_read_session = mock_manager.pg_session
     return mock_manager
 
 @pytest.fixture
@@ -0,0 +1,71 @@
+import json
+from datetime import date, datetime
+
+import orjson
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.models.ejercicio import Ejercicio
+from app.models.rutina import Rutina
+from app.models.user import User  # noqa: F401  (FK target in the metadata)
+from app.schemas.ejercicio import EjercicioOut
+from app.schemas.rutina import RutinaPublicOut
+from app.services.catalog_read_service import EXERCISE_COLUMNS, ROUTINE_COLUMNS
+
+
+@pytest.fixture
+def db():
+    """In-memory SQLite stand-in with the rutinas and ejercicios tables."""
+    engine = create_engine("sqlite://")
+    Rutina.__table__.create(engine)
+    Ejercicio.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_routine_rows_match_pydantic_serialization(db):
+    """
+    The column + CASE fast path produces the same JSON as validating ORM
+    entities through RutinaPublicOut, for every flag combination.
+    """
+    flags = [(False, False), (True, False), (False, True), (True, True), (None, None)]
+    for i, (ml, verified) in enumerate(flags, start=1):
+        db.add(Rutina(
+            id_rutina=i, nombre_rutina=f"Rutina {i}", fecha_creacion=date(2026, 3, i),
+            is_machine_learning_generated=ml, is_verified_by_physio=verified,
+            verified_at=datetime(2026, 3, i, 10, 30, 15, 250) if verified else None,
+        ))
+    db.commit()
+
+    result = db.execute(select(*ROUTINE_COLUMNS).order_by(Rutina.id_rutina))
+    columns = list(result.keys())
+    fast = orjson.loads(orjson.dumps([dict(zip(columns, row)) for row in result.all()]))
+
+    expected = []
+    for rutina in db.scalars(select(Rutina).order_by(Rutina.id_rutina)):
+        rutina.is_machine_learning_generated = bool(rutina.is_machine_learning_generated)
+        rutina.is_verified_by_physio = bool(rutina.is_verified_by_physio)
+        expected.append(json.loads(RutinaPublicOut.model_validate(rutina).model_dump_json()))
+
+    assert fast == expected
+    assert [r["verification_badge"] for r in fast] == [
+        "ml_generated", "ml_generated", "physio_verified", "ml_verified", "ml_generated",
+    ]
+
+
+def test_exercise_rows_match_pydantic_serialization(db):
+    """
+    Exercise rows carry exactly the EjercicioOut fields and values.
+    """
+    db.add(Ejercicio(
+        id_ejercicio=1, nombre_ejercicio="Plancha", descripcion="Core", categoria="core",
+        contraindicaciones=["lumbar"], is_verified_by_physio=True,
+    ))
+    db.commit()
+
+    result = db.execute(select(*EXERCISE_COLUMNS))
+    fast = orjson.loads(orjson.dumps([dict(zip(result.keys(), row)) for row in result.all()]))
+    expected = json.loads(EjercicioOut.model_validate(db.get(Ejercicio, 1)).model_dump_json())
+
+    assert fast == [expected]
@@ -0,0 +1,30 @@
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.metrics import metrics
+from app.db.postgresql import InstrumentedAsyncPool
+
+
+@pytest.mark.asyncio
+async def test_pool_records_checkout_time_and_timeouts():
+    """
+    Every checkout is timed once, and a checkout that exhausts
+    pool_timeout is counted before the error propagates.
+    """
+    pool = InstrumentedAsyncPool(creator=MagicMock, pool_size=1, max_overflow=0, timeout=0.01)
+    checkouts_before = metrics.histogram("db_pool_checkout_seconds").count
+    timeouts_before = metrics.counter("db_pool_timeouts_total").value
+
+    def exhaust_pool():
+        held = pool.connect()
+        with pytest.raises(PoolTimeoutError):
+            pool.connect()
+        assert pool.checkedout() == 1
+        held.close()
+
+    await greenlet_spawn(exhaust_pool)
+
+    assert metrics.histogram("db_pool_checkout_seconds").count == checkouts_before + 2
+    assert metrics.counter("db_pool_timeouts_total").value == timeouts_before + 1
@@ -0,0 +1,39 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.security import create_access_token
+from app.services.principal_cache import Principal
+
+
+def auth_header(user_id, id_rol):
+    token = create_access_token({"sub": str(user_id), "id_rol": id_rol})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_claims_fast_path_decodes_token_once(async_client):
+    """
+    An admin route on the claims-only path verifies the JWT a single time
+    and authorizes from the cached principal, without loading the ORM user.
+    """
+    from app.api import deps
+
+    principal = Principal(id_usuario=3, id_rol=3, is_active=True, correo="admin@example.com")
+    with patch("app.api.deps.UserService.get_principal", new_callable=AsyncMock, return_value=principal), \
+         patch("app.api.deps.UserService.get_user_by_id", new_callable=AsyncMock) as mock_get_user, \
+         patch("app.api.deps.jwt.decode", wraps=deps.jwt.decode) as mock_decode:
+        response = await async_client.get("/api/v1/admin/ml/model", headers=auth_header(3, 3))
+
+    assert response.status_code == 200
+    mock_decode.assert_called_once()
+    mock_get_user.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_claims_fast_path_rejects_role_without_db(async_client):
+    """A token whose id_rol claim lacks the role is rejected before any query."""
+    with patch("app.api.deps.UserService.get_principal", new_callable=AsyncMock) as mock_principal:
+        response = await async_client.get("/api/v1/admin/ml/model", headers=auth_header(5, 1))
+
+    assert response.status_code == 403
+    mock_principal.assert_not_called()
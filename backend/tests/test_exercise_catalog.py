@@ -0,0 +1,190 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+
+from sqlalchemy import case, exists, func, literal, null, select
+from sqlalchemy.dialects.postgresql.operators import HAS_ANY
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import BinaryExpression
+
+from app.schemas.rutina import EjercicioEnRutinaOut
+from app.services.exercise_catalog import CatalogSnapshot, ExerciseCatalog
+
+
+@compiles(BinaryExpression, "sqlite")
+def _has_any_on_sqlite(element, compiler, **kw):
+    """
+    JSONB `?|` on SQLite: true when the JSON array shares an element with the
+    bound list, and NULL (as in PostgreSQL) when the column is NULL.
+    """
+    if element.operator is not HAS_ANY:
+        return compiler.visit_binary(element, **kw)
+    elements = func.json_each(element.left).table_valued("value")
+    match = exists(
+        select(1).select_from(elements)
+        .where(elements.c.value.in_([literal(v) for v in element.right.value]))
+    )
+    return compiler.process(case((element.left.is_(None), null()), else_=match), **kw)
+
+
+def make_exercise(id_ejercicio, categoria, contraindicaciones=()):
+    return EjercicioEnRutinaOut(
+        id_ejercicio=id_ejercicio,
+        nombre_ejercicio=f"Ejercicio {id_ejercicio}",
+        categoria=categoria,
+        contraindicaciones=list(contraindicaciones),
+    )
+
+
+def test_safe_exercises_filters_by_category_and_contraindication():
+    """
+    The snapshot must return, ordered by id, only exercises of the route's
+    categories that carry none of the user's injuries as contraindication.
+    """
+    snapshot = CatalogSnapshot.build(1, [
+        make_exercise(4, "core", ["rodilla"]),
+        make_exercise(1, "core"),
+        make_exercise(3, "cardio", ["espalda"]),
+        make_exercise(2, "pecho"),
+        make_exercise(5, "cardio", ["hombro", "rodilla"]),
+    ])
+
+    safe = snapshot.safe_exercises(["core", "cardio"], ["rodilla"])
+    assert [ej.id_ejercicio for ej in safe] == [1, 3]
+
+    assert [ej.id_ejercicio for ej in snapshot.safe_exercises([], [])] == [1, 2, 3, 4, 5]
+    assert [ej.id_ejercicio for ej in snapshot.safe_exercises(["core", "cardio"], [], limit=2)] == [1, 3]
+    assert snapshot.by_contraindication["rodilla"] == frozenset({4, 5})
+
+
+@pytest.mark.asyncio
+async def test_query_safe_exercises_filters_and_limits_in_sql():
+    """
+    The database path must push the contraindication filter, ordering
+    and LIMIT into a single PostgreSQL query.
+    """
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+
+    await ExerciseCatalog.query_safe_exercises(db, ["core"], ["rodilla"], limit=15)
+
+    sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "contraindicaciones ?|" in sql
+    assert "NOT IN" in sql
+    assert "LIMIT" in sql.rsplit("ORDER BY ejercicios.id_ejercicio", 1)[-1]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_expired_reads_share_one_refresh():
+    """
+    Requests that find the snapshot missing at the same time must wait for
+    a single catalog query instead of each reloading it.
+    """
+    import asyncio
+
+    catalog = ExerciseCatalog(ttl_seconds=60)
+
+    async def slow_execute(query):
+        await asyncio.sleep(0.01)
+        result = MagicMock()
+        result.all.return_value = []
+        return result
+
+    db = AsyncMock()
+    db.execute.side_effect = slow_execute
+
+    snapshots = await asyncio.gather(*(catalog.get_snapshot(db) for _ in range(5)))
+
+    assert db.execute.await_count == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_during_refresh_discards_the_stale_snapshot():
+    """A refresh that overlaps an invalidation must not be published as current."""
+    catalog = ExerciseCatalog(ttl_seconds=60)
+
+    async def execute_then_invalidate(query):
+        catalog.invalidate()
+        result = MagicMock()
+        result.all.return_value = []
+        return result
+
+    db = AsyncMock()
+    db.execute.side_effect = execute_then_invalidate
+
+    await catalog.refresh(db)
+    db.execute.side_effect = None
+    db.execute.return_value = MagicMock(all=MagicMock(return_value=[]))
+    await catalog.get_snapshot(db)
+
+    assert db.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_keeps_newest_video_per_exercise(sqlite_session):
+    """
+    With several multimedia rows per exercise, the snapshot keeps the most
+    recently uploaded file regardless of insertion order, as query_safe_exercises does.
+    """
+    from datetime import date
+
+    from sqlalchemy import insert
+
+    from app.models.ejercicio import Ejercicio
+    from app.services.exercise_catalog import _multimedia
+
+    sqlite_session.add_all([
+        Ejercicio(id_ejercicio=1, nombre_ejercicio="Plancha", descripcion="Core", categoria="core", activo=True),
+        Ejercicio(id_ejercicio=2, nombre_ejercicio="Puente", descripcion="Glúteo", categoria="core", activo=True),
+    ])
+    await sqlite_session.execute(insert(_multimedia), [
+        {"id_ejercicio": 1, "url_archivo": "nuevo.mp4", "fecha_subida": date(2026, 5, 1)},
+        {"id_ejercicio": 1, "url_archivo": "viejo.mp4", "fecha_subida": date(2026, 1, 1)},
+        {"id_ejercicio": 2, "url_archivo": "viejo-2.mp4", "fecha_subida": date(2025, 1, 1)},
+        {"id_ejercicio": 2, "url_archivo": "nuevo-2.mp4", "fecha_subida": date(2025, 6, 1)},
+    ])
+    await sqlite_session.commit()
+
+    snapshot = await ExerciseCatalog(ttl_seconds=60).refresh(sqlite_session)
+
+    assert snapshot.exercises[1].videoUrl == "nuevo.mp4"
+    assert snapshot.exercises[2].videoUrl == "nuevo-2.mp4"
+
+
+@pytest.mark.asyncio
+async def test_query_safe_exercises_keeps_null_contraindications(sqlite_session):
+    """
+    Against a real engine, the anti-join drops only active exercises that list
+    one of the injuries: NULL, JSON null and empty contraindications are kept,
+    matching what the in-memory snapshot returns for the same rows.
+    """
+    from app.models.ejercicio import Ejercicio
+
+    rows = [
+        (1, "core", null()),
+        (2, "core", ["rodilla"]),
+        (3, "core", ["hombro"]),
+        (4, "core", []),
+        (5, "cardio", ["espalda", "rodilla"]),
+        (6, "cardio", None),
+        (7, "pecho", None),
+    ]
+    for id_ejercicio, categoria, contraindicaciones in rows:
+        sqlite_session.add(Ejercicio(
+            id_ejercicio=id_ejercicio, nombre_ejercicio=f"Ejercicio {id_ejercicio}",
+            descripcion="-", categoria=categoria, contraindicaciones=contraindicaciones,
+        ))
+    sqlite_session.add(Ejercicio(
+        id_ejercicio=8, nombre_ejercicio="Inactivo", descripcion="-", categoria="core", activo=False,
+    ))
+    await sqlite_session.commit()
+
+    safe = await ExerciseCatalog.query_safe_exercises(
+        sqlite_session, ["core", "cardio"], ["rodilla", "espalda"], limit=10,
+    )
+    snapshot = await ExerciseCatalog(ttl_seconds=60).refresh(sqlite_session)
+
+    assert [ej.id_ejercicio for ej in safe] == [1, 3, 4, 6]
+    assert safe[0].contraindicaciones == []
+    assert safe == snapshot.safe_exercises(["core", "cardio"], ["rodilla", "espalda"])
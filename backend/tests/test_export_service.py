@@ -0,0 +1,119 @@
+import json
+import pytest
+from datetime import date, datetime
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.postgresql import postgresql
+from app.models.user import User
+from app.services.export_service import PHYSIO_EVENT_FIELDS, ExportService
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.fixture
+def read_from_sqlite(sqlite_engine):
+    """Routes postgresql.get_read_session (no replicas → primary) to sqlite_engine."""
+    with patch.object(postgresql, "_async_session_factory", postgresql._create_session_factory(sqlite_engine)), \
+         patch.object(postgresql, "_replicas", ()):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_stream_query_emits_one_chunk_per_server_side_batch(sqlite_engine, read_from_sqlite):
+    """
+    Rows are fetched with yield_per and written one chunk per partition,
+    with a single CSV header; an empty table still yields the header.
+    """
+    query = ExportService.users_query()
+    columns = list(query.selected_columns.keys())
+    header = ",".join(columns) + "\r\n"
+
+    assert await collect(ExportService.stream_query(query, "csv")) == [header]
+
+    async with AsyncSession(sqlite_engine) as session:
+        session.add_all([
+            User(id_usuario=i, nombre=nombre, correo=f"user{i}@example.com", contrasena_hash="x",
+                 fecha_registro=date(2026, 1, i))
+            for i, nombre in [(3, "Eva"), (1, "Ana"), (2, "Luis, Jr."), (5, "Sara"), (4, "Hugo")]
+        ])
+        await session.commit()
+
+    chunks = await collect(ExportService.stream_query(query, "csv", batch_size=2))
+
+    assert len(chunks) == 3
+    assert chunks[0].startswith(header)
+    assert all(not chunk.startswith("id_usuario") for chunk in chunks[1:])
+    rows = "".join(chunks).splitlines()[1:]
+    assert [row.split(",")[0] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert rows[1].startswith('2,"Luis, Jr.",user2@example.com,')
+    assert "2026-01-02" in rows[1]
+
+    lines = "".join(await collect(ExportService.stream_query(query, "ndjson", batch_size=4))).splitlines()
+    assert [json.loads(line)["id_usuario"] for line in lines] == [1, 2, 3, 4, 5]
+    assert "contrasena_hash" not in lines[0]
+
+
+@pytest.mark.asyncio
+async def test_stream_collection_ndjson_and_flattened_csv(motor_collection):
+    """
+    Documents stream in _id order without _id; NDJSON keeps whole documents
+    per line and CSV flattens nested actor/entity paths and serializes metadata as JSON.
+    """
+    documents = [
+        {
+            "_id": 10 - i,
+            "action": "EXERCISE_VERIFIED",
+            "actor": {"id": i, "correo": f"fisio{i}@example.com", "id_rol": 2},
+            "entity": {"type": "ejercicios", "id": 10 + i},
+            "timestamp": datetime(2026, 1, 1, 12, i),
+            "metadata": {"nombre": "Plancha"},
+        }
+        for i in range(3)
+    ]
+
+    collection = motor_collection(documents)
+    chunks = await collect(ExportService.stream_collection(collection, "ndjson", PHYSIO_EVENT_FIELDS, batch_size=2))
+    lines = "".join(chunks).splitlines()
+    assert len(chunks) == 2
+    assert [json.loads(line)["actor"]["id"] for line in lines] == [2, 1, 0]
+    assert all("_id" not in json.loads(line) for line in lines)
+    assert collection.cursors[-1].batch == 2
+    collection.cursors[-1].close.assert_awaited_once()
+
+    csv_text = "".join(await collect(ExportService.stream_collection(collection, "csv", PHYSIO_EVENT_FIELDS, batch_size=2)))
+    rows = csv_text.splitlines()
+    assert rows[0] == ",".join(PHYSIO_EVENT_FIELDS)
+    assert rows[3] == '2026-01-01T12:00:00,EXERCISE_VERIFIED,0,fisio0@example.com,2,ejercicios,10,"{""nombre"": ""Plancha""}"'
+    assert len(rows) == 4
+
+
+@pytest.mark.asyncio
+async def test_export_endpoint_reads_format_query_parameter(async_client):
+    """
+    The handler argument is export_format, but clients still send ?format=;
+    unknown formats are rejected by validation.
+    """
+    from unittest.mock import AsyncMock
+
+    from app.services.principal_cache import Principal
+    from tests.test_deps import auth_header
+
+    async def fake_stream(query, fmt):
+        yield f"{fmt}\r\n"
+
+    principal = Principal(id_usuario=3, id_rol=3, is_active=True, correo="admin@example.com")
+    with patch("app.api.deps.UserService.get_principal", new_callable=AsyncMock, return_value=principal), \
+         patch("app.api.v1.admin.ExportService.stream_query", side_effect=fake_stream):
+        csv_response = await async_client.get("/api/v1/admin/export/users?format=csv", headers=auth_header(3, 3))
+        default_response = await async_client.get("/api/v1/admin/export/users", headers=auth_header(3, 3))
+        invalid_response = await async_client.get("/api/v1/admin/export/users?format=xml", headers=auth_header(3, 3))
+
+    assert csv_response.status_code == 200
+    assert csv_response.text == "csv\r\n"
+    assert csv_response.headers["content-disposition"].endswith('.csv"')
+    assert default_response.text == "ndjson\r\n"
+    assert invalid_response.status_code == 422
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.mark.asyncio
+async def test_health_not_ready_until_model_warm(async_client):
+    """
+    /health must report 503 until the CART model has been warmed up,
+    so the load balancer keeps traffic away from cold workers.
+    """
+    with patch("app.main.ml_service.is_ready", False):
+        response = await async_client.get("/health")
+
+    assert response.status_code == 503
+    assert response.json()["ml_model_ready"] is False
+
+
+@pytest.mark.asyncio
+async def test_health_ready_after_warm_up(async_client):
+    """
+    After warm_up() the worker is reported as ready.
+    """
+    from app.main import ml_service
+
+    assert ml_service.warm_up() is True
+    response = await async_client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+    assert response.json()["ml_model_ready"] is True
+
+
+@pytest.mark.asyncio
+async def test_lifespan_waits_for_registry_watcher_to_stop():
+    """
+    Shutdown must await the cancelled registry watcher, so its cleanup finishes
+    before the writers and the database connections are closed.
+    """
+    from app.main import app, lifespan
+
+    watcher_finished = asyncio.Event()
+
+    async def fake_watch_registry(interval_seconds):
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            # Cleanup that spans several loop iterations
+            for _ in range(3):
+                await asyncio.sleep(0)
+            watcher_finished.set()
+            raise
+
+    with patch("app.main.settings.ML_REGISTRY_POLL_SECONDS", 1), \
+         patch("app.main.postgresql", MagicMock(close=AsyncMock())), \
+         patch("app.main.mongodb", MagicMock(connect=AsyncMock(), create_indexes=AsyncMock(), disconnect=AsyncMock())), \
+         patch("app.main.analytics_writer", MagicMock(stop=AsyncMock())), \
+         patch("app.main.physio_events_writer", MagicMock(stop=AsyncMock())), \
+         patch("app.main.ml_service.warm_up", return_value=True), \
+         patch("app.main.ml_service.watch_registry", fake_watch_registry), \
+         patch("app.main.ml_service.shutdown"), \
+         patch("app.main.password_hasher.shutdown"):
+        async with lifespan(app):
+            await asyncio.sleep(0)
+        assert watcher_finished.is_set()
+
+    assert not [t for t in asyncio.all_tasks() if t.get_name() == "ml-registry-watcher"]
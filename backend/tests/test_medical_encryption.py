@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.core import security
+from app.core.security import decryption_cache, encrypt_values
+from app.schemas.medical_profile import MedicalProfileResponse
+from app.services.user_service import UserService
+
+
+def test_profile_fields_are_encrypted_per_element_and_decrypted_on_read():
+    """
+    Each list element is stored as its own Fernet token, and the response
+    schema returns plaintext (legacy unencrypted values pass through).
+    """
+    decryption_cache.clear()
+    lesiones = encrypt_values(["rodilla", "hombro"])
+
+    assert lesiones[0] != "rodilla"
+    profile = MedicalProfileResponse.model_validate(SimpleNamespace(
+        id_perfil_medico=1,
+        id_usuario=1,
+        condiciones_fisicas=["asma"],
+        lesiones=lesiones,
+        limitaciones=None,
+    ))
+    assert profile.lesiones == ["rodilla", "hombro"]
+    assert profile.condiciones_fisicas == ["asma"]
+    assert profile.limitaciones == []
+
+
+def test_batch_decrypt_runs_fernet_once_per_distinct_value():
+    """
+    Listing users decrypts every distinct ciphertext once; serialisation
+    afterwards is served from the cache, and eviction forces a new decrypt.
+    """
+    decryption_cache.clear()
+    shared = encrypt_values(["rodilla"])
+    users = [
+        SimpleNamespace(perfil_medico=SimpleNamespace(
+            condiciones_fisicas=[], lesiones=shared, limitaciones=encrypt_values([f"limite {i}"]),
+        ))
+        for i in range(3)
+    ] + [SimpleNamespace(perfil_medico=None)]
+
+    with patch.object(security.cipher_suite, "decrypt", wraps=security.cipher_suite.decrypt) as mock_decrypt:
+        UserService.decrypt_medical_profiles(users)
+        assert mock_decrypt.call_count == 4
+
+        assert security.decrypt_values(shared) == ["rodilla"]
+        assert mock_decrypt.call_count == 4
+
+        decryption_cache.evict(shared)
+        assert security.decrypt_values(shared) == ["rodilla"]
+        assert mock_decrypt.call_count == 5
+
+
+async def test_update_user_encrypts_profile_and_invalidates_caches(sqlite_session):
+    """
+    Updating perfil_medico stores per-element ciphertext for the fields sent,
+    leaves the others untouched, evicts the replaced ciphertext and drops the
+    cached routine and principal of the user.
+    """
+    from sqlalchemy import select
+
+    from app.models.medical_profile import MedicalProfile
+    from app.models.user import User
+    from app.schemas.medical_profile import MedicalProfileUpdate
+    from app.schemas.user import UserUpdate
+
+    old_lesiones = encrypt_values(["rodilla"])
+    condiciones = encrypt_values(["asma"])
+    sqlite_session.add_all([
+        User(id_usuario=1, nombre="Ana Ruiz", correo="ana@example.com", contrasena_hash="x"),
+        User(id_usuario=2, nombre="Luis Gil", correo="luis@example.com", contrasena_hash="x"),
+        MedicalProfile(id_usuario=1, lesiones=old_lesiones, condiciones_fisicas=condiciones),
+    ])
+    await sqlite_session.commit()
+
+    def payload(nombre, correo):
+        return UserUpdate(
+            nombre=nombre, correo=correo,
+            perfil_medico=MedicalProfileUpdate(lesiones=["hombro", "espalda"]),
+        )
+
+    with patch("app.services.user_service.decryption_cache.evict") as mock_evict, \
+         patch("app.services.user_service.recommendation_cache.invalidate_user") as mock_routine, \
+         patch("app.services.user_service.principal_cache.invalidate") as mock_principal:
+        updated = await UserService.update_user(sqlite_session, 1, payload("Ana Ruiz", "ana@example.com"))
+        await UserService.update_user(sqlite_session, 2, payload("Luis Gil", "luis@example.com"))
+
+    assert updated.id_usuario == 1
+    rows = {
+        row.id_usuario: row
+        for row in await sqlite_session.execute(select(
+            MedicalProfile.id_usuario, MedicalProfile.lesiones, MedicalProfile.condiciones_fisicas,
+        ))
+    }
+    for id_usuario in (1, 2):
+        assert "hombro" not in rows[id_usuario].lesiones
+        assert security.decrypt_values(rows[id_usuario].lesiones) == ["hombro", "espalda"]
+    assert rows[1].condiciones_fisicas == condiciones
+
+    mock_evict.assert_called_once_with(old_lesiones)
+    assert [c.args for c in mock_routine.call_args_list] == [(1,), (2,)]
+    assert [c.args for c in mock_principal.call_args_list] == [(1,), (2,)]
+
+
+def test_decryption_cache_is_thread_safe():
+    """
+    Sync endpoints validate profiles in Starlette's threadpool: concurrent
+    get/set/evict on a small cache must never corrupt the LRU order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.core.security import DecryptionCache
+
+    cache = DecryptionCache(max_entries=8)
+
+    def hammer(worker):
+        for i in range(2000):
+            value = f"token-{(worker + i) % 32}"
+            cache.set(value, value.upper())
+            cache.get(f"token-{i % 32}")
+            if i % 7 == 0:
+                cache.evict([value])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for future in [pool.submit(hammer, worker) for worker in range(8)]:
+            future.result()
+
+    assert len(cache) <= 8
@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import patch
+
+from app.middleware.security import SECURITY_HEADERS
+
+
+@pytest.mark.asyncio
+async def test_security_headers_and_access_log(async_client):
+    """
+    The pure ASGI stack adds the security headers to the response
+    and queues one access-log entry with the final status code.
+    """
+    with patch("app.middleware.logging.analytics_writer.submit") as mock_submit:
+        response = await async_client.get("/api/v1/auth/verify?x=1", headers={"user-agent": "pytest"})
+
+    assert response.status_code == 401
+    for name, value in SECURITY_HEADERS.items():
+        assert response.headers[name] == value
+
+    mock_submit.assert_called_once()
+    entry = mock_submit.call_args.args[0]
+    assert entry["path"] == "/api/v1/auth/verify"
+    assert entry["query_params"] == "x=1"
+    assert entry["status_code"] == 401
+    assert entry["user_agent"] == "pytest"
+
+
+@pytest.mark.asyncio
+async def test_health_checks_are_not_logged(async_client):
+    """Health and docs paths skip the access log entirely."""
+    with patch("app.middleware.logging.analytics_writer.submit") as mock_submit:
+        await async_client.get("/health")
+
+    mock_submit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_access_log_records_authenticated_user_id(async_client):
+    """The user id set while validating the JWT is written as userId."""
+    from unittest.mock import AsyncMock
+    from app.core.security import create_access_token
+    from app.services.principal_cache import Principal
+
+    token = create_access_token({"sub": "3", "id_rol": 3})
+    principal = Principal(id_usuario=3, id_rol=3, is_active=True, correo="admin@example.com")
+    with patch("app.api.deps.UserService.get_principal", new_callable=AsyncMock, return_value=principal), \
+         patch("app.middleware.logging.analytics_writer.submit") as mock_submit:
+        response = await async_client.get("/api/v1/admin/ml/model", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert mock_submit.call_args.args[0]["userId"] == 3
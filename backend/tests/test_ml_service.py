@@ -0,0 +1,237 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from app.services.ml_service import InferenceQueueFullError, MLService
+
+PROFILES = [
+    {"edad": 70, "nivel_fisico": "sedentario", "objetivo_principal": "Salud/Movilidad", "tiene_lesion": 0},
+    {"edad": 25, "nivel_fisico": "moderado", "objetivo_principal": "Fuerza/Hipertrofia", "tiene_lesion": 0},
+    {"edad": 40, "nivel_fisico": "ligero", "objetivo_principal": "Rehabilitación", "tiene_lesion": 1},
+    {"edad": 30, "nivel_fisico": "intenso", "objetivo_principal": "Resistencia/Deporte", "tiene_lesion": 0},
+]
+
+
+def test_batch_matches_single_predictions():
+    """
+    The batch API must return the same routes, in the same order,
+    as scoring each profile individually.
+    """
+    svc = MLService()
+    batch = svc.predict_routine_paths_batch(PROFILES)
+    single = [svc.predict_routine_path(**p) for p in PROFILES]
+
+    assert batch == single
+    assert svc.predict_routine_paths_batch([]) == []
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_merges_concurrent_requests():
+    """
+    Concurrent async predictions inside the batching window
+    must be resolved with a single batch call.
+    """
+    svc = MLService()
+    expected = svc.predict_routine_paths_batch(PROFILES)
+
+    with patch.object(svc, "predict_routine_paths_batch", wraps=svc.predict_routine_paths_batch) as mock_batch:
+        results = await asyncio.gather(*(svc.predict_routine_path_async(**p) for p in PROFILES))
+
+    assert results == expected
+    mock_batch.assert_called_once()
+
+
+def test_compiled_tree_matches_sklearn_pipeline():
+    """
+    The compiled NumPy tree must reproduce the sklearn pipeline predictions,
+    including unknown categories (OneHotEncoder handle_unknown='ignore').
+    """
+    import itertools
+    import joblib
+    import pandas as pd
+
+    svc = MLService()
+    svc.load_model()
+    pipeline = joblib.load(svc.model_path.replace(".npz", ".pkl"))
+
+    profiles = [
+        {"edad": e, "nivel_fisico": n, "objetivo_principal": o, "tiene_lesion": l}
+        for e, n, o, l in itertools.product(
+            range(0, 81, 5),
+            ["sedentario", "ligero", "moderado", "intenso", "desconocido"],
+            ["Salud/Movilidad", "Rehabilitación", "Fuerza/Hipertrofia", "Resistencia/Deporte"],
+            [0, 1],
+        )
+    ]
+    expected = list(pipeline.predict(pd.DataFrame(profiles)))
+
+    assert svc.model.predict(profiles) == expected
+    assert [svc.model.predict_one(p) for p in profiles] == expected
+
+
+def test_lookup_table_covers_domain_and_falls_back():
+    """
+    Every in-domain profile must be answered by the lookup table with the
+    same route as the compiled tree; out-of-domain values fall back to the tree.
+    """
+    import itertools
+
+    svc = MLService()
+    svc.load_model()
+    table = svc.lookup_table
+
+    domain = itertools.product(
+        range(table.edad_min, table.edad_max + 1),
+        table._niveles, table._objetivos, (0, 1),
+    )
+    for edad, nivel, objetivo, lesion in domain:
+        profile = {"edad": edad, "nivel_fisico": nivel, "objetivo_principal": objetivo, "tiene_lesion": lesion}
+        assert table.lookup(**profile) == svc.model.predict_one(profile), profile
+
+    out_of_domain = {"edad": 95, "nivel_fisico": "sedentario", "objetivo_principal": "Salud/Movilidad", "tiene_lesion": 0}
+    assert table.lookup(**out_of_domain) is None
+    assert table.lookup(40, "desconocido", "Salud/Movilidad", 0) is None
+    assert svc.predict_routine_path(**out_of_domain) == svc.model.predict_one(out_of_domain)
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_sheds_load_when_queue_is_full():
+    """
+    Requests beyond ML_MAX_QUEUE_DEPTH are rejected immediately
+    instead of queueing without bound.
+    """
+    svc = MLService()
+    svc.batcher.max_queue_depth = 2
+
+    results = await asyncio.gather(
+        *(svc.predict_routine_path_async(**p) for p in PROFILES),
+        return_exceptions=True,
+    )
+
+    assert [isinstance(r, InferenceQueueFullError) for r in results] == [False, False, True, True]
+    assert svc.batcher.queue_depth == 0
+    svc.shutdown()
+
+
+def test_registry_hot_swap_to_new_version(tmp_path):
+    """
+    Activating a new registry version swaps the served model in place
+    and reports the active version.
+    """
+    import shutil
+    from app.ml.registry import ModelRegistry
+
+    bundled = MLService()
+    registry = ModelRegistry(str(tmp_path))
+    svc = MLService(registry=registry)
+
+    assert svc.warm_up() is True
+    assert svc.active_version == "bundled"
+
+    version = registry.next_version()
+    paths = registry.artifact_paths(version)
+    (tmp_path / version).mkdir()
+    shutil.copy(bundled.model_path, paths["compiled"])
+    shutil.copy(bundled.lookup_path, paths["lookup"])
+    registry.register(version, {"accuracy": 1.0})
+
+    assert svc.reload_if_changed() is True
+    assert svc.active_version == "v1"
+    assert svc.reload_if_changed() is False
+    assert svc.predict_routine_path(**PROFILES[0]) == bundled.predict_routine_path(**PROFILES[0])
+    assert registry.read_manifest()["versions"]["v1"]["metrics"] == {"accuracy": 1.0}
+
+
+def _register_copy_of_bundled(registry, bundled, corrupt=False):
+    """Writes the bundled artifacts as the next registry version (optionally corrupted)."""
+    import os
+    import shutil
+
+    version = registry.next_version()
+    paths = registry.artifact_paths(version)
+    os.makedirs(registry.version_dir(version))
+    if corrupt:
+        for path in (paths["compiled"], paths["lookup"]):
+            with open(path, "wb") as f:
+                f.write(b"not a model")
+    else:
+        shutil.copy(bundled.model_path, paths["compiled"])
+        shutil.copy(bundled.lookup_path, paths["lookup"])
+    registry.register(version, {"accuracy": 1.0}, activate=False)
+    return version
+
+
+def test_failed_activation_rolls_back_manifest(tmp_path):
+    """
+    A version that fails warm-up is not served, and the manifest goes
+    back to the previously active version so other workers ignore it.
+    """
+    from app.ml.registry import ModelRegistry
+
+    bundled = MLService()
+    registry = ModelRegistry(str(tmp_path))
+    svc = MLService(registry=registry)
+    good = _register_copy_of_bundled(registry, bundled)
+    bad = _register_copy_of_bundled(registry, bundled, corrupt=True)
+
+    assert svc.warm_up() is True
+    assert svc.activate_version(good) is True
+    assert svc.activate_version(bad) is False
+    assert svc.active_version == good
+    assert registry.active_version() == good
+    assert svc.reload_if_changed() is False
+
+    with pytest.raises(ValueError):
+        svc.activate_version("v99")
+
+
+def test_failed_first_activation_clears_manifest(tmp_path):
+    """With no previous registry version, a failed activation leaves the registry inactive."""
+    from app.ml.registry import ModelRegistry
+
+    registry = ModelRegistry(str(tmp_path))
+    svc = MLService(registry=registry)
+    bad = _register_copy_of_bundled(registry, MLService(), corrupt=True)
+
+    assert svc.warm_up() is True
+    assert svc.activate_version(bad) is False
+    assert registry.active_version() is None
+    assert svc.active_version == "bundled"
+
+
+@pytest.mark.asyncio
+async def test_activate_endpoint_rejects_failed_warm_up(async_client, mock_session_manager):
+    """
+    POST /admin/ml/model/{version}/activate answers 409 for a version that
+    fails warm-up and writes no audit row.
+    """
+    from unittest.mock import AsyncMock
+
+    from app.services.principal_cache import Principal
+    from tests.test_deps import auth_header
+
+    principal = Principal(id_usuario=3, id_rol=3, is_active=True, correo="admin@example.com")
+    with patch("app.api.deps.UserService.get_principal", new_callable=AsyncMock, return_value=principal), \
+         patch("app.api.v1.admin.ml_service.activate_version", return_value=False), \
+         patch("app.api.v1.admin.AuditService.log_action", new_callable=AsyncMock) as mock_log:
+        response = await async_client.post("/api/v1/admin/ml/model/v2/activate", headers=auth_header(3, 3))
+
+    assert response.status_code == 409
+    mock_log.assert_not_called()
+    mock_session_manager.pg_session.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_executor_is_recreated_after_shutdown():
+    """
+    shutdown() at the end of one lifespan must not leave the service
+    with a dead pool: the next inference gets a fresh executor.
+    """
+    svc = MLService()
+    first = await svc.predict_routine_path_async(**PROFILES[0])
+    old_executor = svc.executor
+
+    svc.shutdown()
+    assert await svc.predict_routine_path_async(**PROFILES[0]) == first
+    assert svc.executor is not old_executor
+    svc.shutdown()
@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from pymongo.errors import OperationFailure
+
+from app.db.mongodb import MongoDBManager, declared_indexes
+
+
+def test_declared_indexes_match_query_shapes():
+    """physio_events is indexed for actor and entity lookups; analytics has a TTL."""
+    indexes = {
+        name: [dict(index.document["key"]) for index in models]
+        for name, models in declared_indexes().items()
+    }
+    assert {"actor.id": 1, "timestamp": -1} in indexes["physio_events"]
+    assert {"entity.type": 1, "entity.id": 1, "timestamp": -1} in indexes["physio_events"]
+
+    ttl = [i.document for i in declared_indexes()["analytics"] if "expireAfterSeconds" in i.document]
+    assert len(ttl) == 1 and ttl[0]["expireAfterSeconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_changed_ttl_is_applied_with_collmod():
+    """An existing TTL index with another expiry is updated instead of failing startup."""
+    collection = MagicMock()
+
+    async def create_indexes(models):
+        if "expireAfterSeconds" in models[0].document:
+            raise OperationFailure("conflict", code=85)
+
+    collection.create_indexes = AsyncMock(side_effect=create_indexes)
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+    db.command = AsyncMock()
+
+    manager = MongoDBManager()
+    with patch.object(MongoDBManager, "db", new=db):
+        await manager.create_indexes()
+
+    command = db.command.await_args.args[0]
+    assert command["collMod"] == "analytics"
+    assert command["index"]["keyPattern"] == {"timestamp": 1}
@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.db.mongo_writer import BufferedMongoWriter
+
+
+def mock_collection():
+    collection = MagicMock()
+    collection.insert_many = AsyncMock()
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_drops_overflow_and_flushes_on_stop():
+    """
+    Documents are written with insert_many in size-bounded batches, overflow
+    beyond the queue limit is counted as dropped, and stop() flushes the rest.
+    """
+    collection = mock_collection()
+    writer = BufferedMongoWriter("test_logs", max_queue=5, batch_size=2, flush_interval=60)
+
+    with patch("app.db.mongo_writer.mongodb.get_collection", new_callable=AsyncMock, return_value=collection):
+        accepted = [writer.submit({"n": i}) for i in range(6)]
+        assert accepted == [True] * 5 + [False]
+        assert writer.dropped == 1
+
+        writer.start()
+        await asyncio.sleep(0.05)
+        await writer.stop()
+
+    written = [doc["n"] for call in collection.insert_many.await_args_list for doc in call.args[0]]
+    assert written == [0, 1, 2, 3, 4]
+    assert all(len(call.args[0]) <= 2 for call in collection.insert_many.await_args_list)
+    assert writer.queue_size == 0
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_partial_batch_after_interval():
+    """A partial batch is written once flush_interval elapses, without waiting to fill up."""
+    collection = mock_collection()
+    writer = BufferedMongoWriter("test_logs", max_queue=100, batch_size=50, flush_interval=0.01)
+
+    with patch("app.db.mongo_writer.mongodb.get_collection", new_callable=AsyncMock, return_value=collection):
+        writer.start()
+        writer.submit({"n": 1})
+        await asyncio.sleep(0.1)
+        collection.insert_many.assert_awaited_once()
+        await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_writer_retries_only_documents_not_yet_inserted():
+    """
+    After a partial bulk failure, the retry resends only the failed documents;
+    duplicate-key errors from an earlier attempt count as delivered.
+    """
+    from pymongo.errors import BulkWriteError
+
+    collection = mock_collection()
+    collection.insert_many.side_effect = [
+        BulkWriteError({"writeErrors": [{"index": 1, "code": 6}], "nInserted": 2}),
+        None,
+    ]
+    writer = BufferedMongoWriter("test_retry", max_queue=10, batch_size=10, flush_interval=60, max_retries=2, retry_backoff=0)
+
+    with patch("app.db.mongo_writer.mongodb.get_collection", new_callable=AsyncMock, return_value=collection):
+        for i in range(3):
+            writer.submit({"n": i})
+        await writer.flush()
+
+    assert [doc["n"] for doc in collection.insert_many.await_args_list[1].args[0]] == [1]
+    stats = writer.stats()
+    assert stats["written"] == 3 and stats["failed"] == 0 and stats["retries"] == 1
+
+
+def run_lifespans(writer, collection, cycles=2):
+    """Runs `cycles` start → submit → stop rounds, each on its own event loop."""
+    async def lifespan(cycle):
+        writer.start()
+        writer.submit({"cycle": cycle})
+        await asyncio.sleep(0.05)
+        await writer.stop()
+
+    with patch("app.db.mongo_writer.mongodb.get_collection", new_callable=AsyncMock, return_value=collection), \
+         patch("app.db.mongo_writer.logger.error") as mock_error:
+        for cycle in range(cycles):
+            asyncio.run(lifespan(cycle))
+    return mock_error
+
+
+@pytest.mark.parametrize("writer_name", ["analytics_writer", "physio_events_writer"])
+def test_global_writer_survives_consecutive_lifespans(writer_name):
+    """
+    The global writer is built at import time: each lifespan (a new event loop)
+    must get a working queue, so documents from the second one are written too.
+    """
+    from app.db import mongo_writer
+
+    writer = getattr(mongo_writer, writer_name)
+    collection = mock_collection()
+    mock_error = run_lifespans(writer, collection)
+
+    # Other tests may have left access logs queued in the global writer
+    written = [
+        doc["cycle"] for call in collection.insert_many.await_args_list
+        for doc in call.args[0] if "cycle" in doc
+    ]
+    assert written == [0, 1]
+    mock_error.assert_not_called()
+
+
+def test_writer_task_failure_is_logged():
+    """A background task that dies is reported instead of silently dropping documents."""
+    writer = BufferedMongoWriter("test_crash", max_queue=10, batch_size=10, flush_interval=60)
+
+    async def lifespan():
+        with patch.object(writer, "_collect", side_effect=RuntimeError("boom")), \
+             patch("app.db.mongo_writer.logger.error") as mock_error:
+            writer.start()
+            await asyncio.sleep(0.01)
+        writer._task = None
+        return mock_error
+
+    mock_error = asyncio.run(lifespan())
+    mock_error.assert_called_once()
+    assert "boom" in mock_error.call_args.args[0]
@@ -0,0 +1,123 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.rutina import Rutina
+from app.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor, paginate, paginate_rows
+
+KEYS = [Rutina.fecha_creacion, Rutina.id_rutina]
+
+# Two routines share each creation date, so the id breaks the ties
+DATES = {1: date(2026, 3, 1), 2: date(2026, 3, 2), 3: date(2026, 3, 2), 4: date(2026, 3, 3), 5: date(2026, 3, 3)}
+
+
+@pytest.fixture
+async def routines(sqlite_session):
+    sqlite_session.add_all([
+        Rutina(id_rutina=i, nombre_rutina=f"Rutina {i}", fecha_creacion=fecha, is_verified_by_physio=True)
+        for i, fecha in DATES.items()
+    ])
+    await sqlite_session.commit()
+    return sqlite_session
+
+
+def test_cursor_round_trip_and_rejects_tampering():
+    """
+    Cursors decode back to typed key values; malformed or
+    mismatched cursors raise InvalidCursorError.
+    """
+    cursor = encode_cursor([date(2026, 3, 1), 42])
+    assert decode_cursor(cursor, KEYS) == [date(2026, 3, 1), 42]
+
+    bad_cursors = (
+        "not-base64!",
+        encode_cursor([42]),
+        encode_cursor(["yesterday", 42]),
+        encode_cursor([date(2026, 3, 1), "42"]),
+        encode_cursor([date(2026, 3, 1), True]),
+        encode_cursor([date(2026, 3, 1), None]),
+        encode_cursor([20260301, 42]),
+    )
+    for bad in bad_cursors:
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(bad, KEYS)
+
+
+@pytest.mark.asyncio
+async def test_paginate_seeks_past_cursor_instead_of_offset(routines):
+    """
+    A cursor becomes a row-value comparison on the sort key (no OFFSET);
+    following the cursors visits every row once, in key order, across ties.
+    """
+    with patch.object(routines, "execute", wraps=routines.execute) as mock_execute:
+        page = await paginate(routines, select(Rutina), KEYS, limit=2, descending=True)
+        ids = [r.id_rutina for r in page.items]
+        while page.next_cursor:
+            page = await paginate(routines, select(Rutina), KEYS, limit=2, cursor=page.next_cursor, descending=True)
+            ids += [r.id_rutina for r in page.items]
+
+    assert ids == [5, 4, 3, 2, 1]
+    assert mock_execute.await_count == 3
+    sql = str(mock_execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "(rutinas.fecha_creacion, rutinas.id_rutina) < (" in sql
+    assert "ORDER BY rutinas.fecha_creacion DESC, rutinas.id_rutina DESC" in sql
+    assert "OFFSET" not in sql
+
+    ascending = await paginate_rows(
+        routines, select(Rutina.id_rutina, Rutina.fecha_creacion), KEYS, limit=3,
+        cursor=encode_cursor([date(2026, 3, 2), 2]),
+    )
+    assert [row["id_rutina"] for row in ascending.items] == [3, 4, 5]
+    assert ascending.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_routines_listing_sets_next_cursor_header(async_client, mock_session_manager, routines):
+    """
+    GET /routines/ publishes the next-page cursor in X-Next-Cursor
+    and answers 400 to an invalid cursor.
+    """
+    mock_session_manager.pg_read_session = routines
+
+    response = await async_client.get("/api/v1/routines/?limit=1")
+    assert response.status_code == 200
+    assert response.json() == [{
+        "id_rutina": 5, "nombre_rutina": "Rutina 5", "descripcion": None, "nivel": None,
+        "duracion_estimada": None, "categoria": None, "creado_por": None,
+        "fecha_creacion": "2026-03-03", "is_machine_learning_generated": False,
+        "is_verified_by_physio": True, "verified_by": None, "verified_at": None,
+        "verification_badge": "physio_verified",
+    }]
+    assert decode_cursor(response.headers["X-Next-Cursor"], KEYS) == [date(2026, 3, 3), 5]
+
+    response = await async_client.get(
+        "/api/v1/routines/", params={"limit": 10, "cursor": response.headers["X-Next-Cursor"]},
+    )
+    assert [r["id_rutina"] for r in response.json()] == [4, 3, 2, 1]
+    assert "X-Next-Cursor" not in response.headers
+
+    for cursor in ("garbage", encode_cursor(["2026-03-01", "x"])):
+        response = await async_client.get("/api/v1/routines/", params={"cursor": cursor})
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_zero_limit_returns_empty_page_and_listings_reject_it(async_client, mock_session_manager, routines):
+    """
+    paginate / paginate_rows with limit=0 return an empty last page instead of
+    failing on the missing last row; the listings reject out-of-range limits with 422.
+    """
+    page = await paginate(routines, select(Rutina), KEYS, limit=0, descending=True)
+    rows = await paginate_rows(routines, select(Rutina.id_rutina, Rutina.fecha_creacion), KEYS, limit=0)
+    assert (page.items, page.next_cursor) == ([], None)
+    assert (rows.items, rows.next_cursor) == ([], None)
+
+    mock_session_manager.pg_read_session = routines
+    for limit in (0, -1, 10_000):
+        response = await async_client.get("/api/v1/routines/", params={"limit": limit})
+        assert response.status_code == 422
+    response = await async_client.get("/api/v1/routines/", params={"skip": -1})
+    assert response.status_code == 422
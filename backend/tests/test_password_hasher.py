@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.metrics import metrics
+from app.core.security import PasswordHasherBusyError, PasswordHasherPool
+
+
+@pytest.mark.asyncio
+async def test_pool_sheds_load_and_records_metrics():
+    """
+    Hashes beyond max_pending are rejected immediately, while admitted
+    ones record queue wait and hash time.
+    """
+    pool = PasswordHasherPool(workers=1, max_pending=2)
+    release = threading.Event()
+
+    def slow_hash(value):
+        release.wait(timeout=5)
+        return value.upper()
+
+    hashed_before = metrics.histogram("password_hash_seconds").count
+    rejected_before = metrics.counter("password_hash_rejected_total").value
+
+    tasks = [asyncio.create_task(pool.run(slow_hash, v)) for v in ("a", "b", "c")]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert results[:2] == ["A", "B"]
+    assert isinstance(results[2], PasswordHasherBusyError)
+    assert pool.pending == 0
+    assert metrics.histogram("password_hash_seconds").count == hashed_before + 2
+    assert metrics.counter("password_hash_rejected_total").value == rejected_before + 1
+    pool.shutdown()
+
+    # A later lifespan in the same process gets a fresh pool
+    assert await pool.run(str.upper, "d") == "D"
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_login_returns_503_when_hasher_is_saturated(async_client):
+    """A saturated hashing pool surfaces as 503 with Retry-After, not as a 500."""
+    with patch(
+        "app.api.v1.auth.AuthService.authenticate_user",
+        new_callable=AsyncMock,
+        side_effect=PasswordHasherBusyError("busy"),
+    ):
+        response = await async_client.post(
+            "/api/v1/auth/login",
+            json={"correo": "test@example.com", "contrasena": "password123"},
+        )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_password_when_cost_changes():
+    """
+    A hash made with a different bcrypt cost still verifies, and login
+    persists a new hash at the configured cost.
+    """
+    from types import SimpleNamespace
+    from passlib.context import CryptContext
+    from app.services.auth_service import AuthService
+
+    old_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    new_context = CryptContext(
+        schemes=["bcrypt"], bcrypt__rounds=5, bcrypt__min_rounds=5, bcrypt__max_rounds=5,
+    )
+    user = SimpleNamespace(id_usuario=1, is_active=True, contrasena_hash=old_context.hash("secreto123"))
+    session = AsyncMock()
+
+    with patch("app.core.security.pwd_context", new_context), \
+         patch("app.services.auth_service.UserService.get_user_by_email", new_callable=AsyncMock, return_value=user):
+        assert await AuthService.authenticate_user(session, "a@example.com", "secreto123") is user
+        session.execute.assert_awaited_once()
+        session.commit.assert_awaited_once()
+
+        user.contrasena_hash = new_context.hash("secreto123")
+        session.reset_mock()
+        assert await AuthService.authenticate_user(session, "a@example.com", "secreto123") is user
+        session.execute.assert_not_awaited()
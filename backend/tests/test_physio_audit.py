@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from app.services.physio_audit_service import COLLECTION_NAME, PhysioAuditService
+
+
+@pytest.mark.asyncio
+async def test_log_enqueues_without_touching_mongo():
+    """Logging an event only enqueues it on the write-behind buffer."""
+    actor = MagicMock(id_usuario=4, correo="fisio@example.com", id_rol=2)
+    with patch("app.services.physio_audit_service.physio_events_writer.submit", return_value=True) as mock_submit:
+        accepted = await PhysioAuditService.log_from_user(
+            action=PhysioAuditService.EXERCISE_VERIFIED,
+            actor=actor,
+            entity_type="ejercicios",
+            entity_id=9,
+        )
+
+    assert accepted is True
+    document = mock_submit.call_args.args[0]
+    assert document["actor"] == {"id": 4, "correo": "fisio@example.com", "id_rol": 2}
+    assert document["entity"] == {"type": "ejercicios", "id": 9}
+
+
+@pytest.mark.asyncio
+async def test_readers_stream_from_async_cursor(motor_collection):
+    """
+    Readers iterate the Motor cursor asynchronously, returning the actor's
+    (or entity's) newest events first, without _id, up to the limit.
+    """
+    events = [
+        {"_id": i, "action": action, "actor": {"id": actor}, "entity": {"type": "ejercicios", "id": entity},
+         "timestamp": datetime(2026, 1, day)}
+        for i, (action, actor, entity, day) in enumerate([
+            ("A", 4, 9, 1), ("B", 5, 9, 2), ("C", 4, 7, 3), ("D", 4, 9, 4),
+        ])
+    ]
+    mongo_db = {COLLECTION_NAME: motor_collection(events)}
+
+    by_actor = await PhysioAuditService.get_events_by_actor(mongo_db, actor_id=4, limit=2)
+    by_entity = [
+        event async for event in PhysioAuditService.stream_events_by_entity(mongo_db, "ejercicios", 9, batch_size=10)
+    ]
+
+    assert [event["action"] for event in by_actor] == ["D", "C"]
+    assert all("_id" not in event for event in by_actor)
+    assert [event["action"] for event in by_entity] == ["D", "B", "A"]
+    assert mongo_db[COLLECTION_NAME].cursors[-1].batch == 10
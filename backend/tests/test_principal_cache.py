@@ -0,0 +1,48 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.principal_cache import principal_cache
+from app.services.user_service import UserService
+
+
+def make_session(row):
+    session = AsyncMock()
+    result = MagicMock()
+    result.one_or_none.return_value = row
+    session.execute.return_value = result
+    return session
+
+
+@pytest.mark.asyncio
+async def test_principal_is_cached_until_invalidated():
+    """
+    The identity lookup hits the database once per user, without joins,
+    and invalidation forces a fresh read.
+    """
+    principal_cache.clear()
+    row = SimpleNamespace(id_usuario=7, id_rol=1, is_active=True, correo="a@example.com")
+    session = make_session(row)
+
+    first = await UserService.get_principal(session, 7)
+    second = await UserService.get_principal(session, 7)
+
+    assert first is second
+    assert first.is_active and not first.is_admin
+    assert session.execute.await_count == 1
+    assert "JOIN" not in str(session.execute.await_args.args[0])
+
+    principal_cache.invalidate(7)
+    await UserService.get_principal(session, 7)
+    assert session.execute.await_count == 2
+    principal_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_missing_user_is_not_cached():
+    """An unknown user id returns None and leaves the cache empty."""
+    principal_cache.clear()
+    session = make_session(None)
+
+    assert await UserService.get_principal(session, 99) is None
+    assert len(principal_cache) == 0
@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import patch
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.postgresql import postgresql
+from app.db.session import SessionManager
+
+
+async def node_name(session):
+    return (await session.execute(text("SELECT name FROM node ORDER BY rowid LIMIT 1"))).scalar_one()
+
+
+async def read_session_name():
+    async with postgresql.create_read_session() as session:
+        return await node_name(session)
+
+
+@pytest.mark.asyncio
+async def test_round_robin_alternates_between_replicas(sqlite_nodes):
+    """
+    With round_robin routing, consecutive read sessions
+    are spread evenly over the configured replicas.
+    """
+    with patch.object(settings, "DB_REPLICA_ROUTING", "round_robin"):
+        names = [await read_session_name() for _ in range(4)]
+
+    assert sorted(names) == ["replica-a", "replica-a", "replica-b", "replica-b"]
+    assert names[0] != names[1] and names[1] != names[2]
+
+
+@pytest.mark.asyncio
+async def test_least_connections_picks_least_busy_replica(sqlite_nodes):
+    """
+    With least_connections routing, the replica with fewer
+    checked-out connections always wins.
+    """
+    with patch.object(settings, "DB_REPLICA_ROUTING", "least_connections"):
+        async with sqlite_nodes["replica-a"].connect():
+            assert {await read_session_name() for _ in range(4)} == {"replica-b"}
+        async with sqlite_nodes["replica-b"].connect():
+            assert {await read_session_name() for _ in range(4)} == {"replica-a"}
+
+
+@pytest.mark.asyncio
+async def test_read_session_is_lazy_and_writes_stay_on_primary(sqlite_nodes):
+    """
+    SessionManager only opens a replica session when pg_read_session is used,
+    returns its connection on cleanup, and never routes pg_session to a replica.
+    Without replicas, reads fall back to the primary session.
+    """
+    replica_pools = [sqlite_nodes[name].pool for name in ("replica-a", "replica-b")]
+    manager = SessionManager()
+
+    await manager.pg_session.execute(text("INSERT INTO node VALUES ('written')"))
+    await manager.pg_session.commit()
+    assert await node_name(manager.pg_session) == "primary"
+    assert sum(pool.checkedout() for pool in replica_pools) == 0
+
+    read_session = manager.pg_read_session
+    assert read_session is not manager.pg_session
+    assert manager.pg_read_session is read_session
+    assert await node_name(read_session) in {"replica-a", "replica-b"}
+    assert sum(pool.checkedout() for pool in replica_pools) == 1
+
+    await manager.close_pg_sessions()
+    assert sum(pool.checkedout() for pool in replica_pools) == 0
+    assert sqlite_nodes["primary"].pool.checkedout() == 0
+    async with sqlite_nodes["primary"].connect() as conn:
+        assert (await conn.execute(text("SELECT count(*) FROM node"))).scalar_one() == 2
+    for name in ("replica-a", "replica-b"):
+        async with sqlite_nodes[name].connect() as conn:
+            assert (await conn.execute(text("SELECT count(*) FROM node"))).scalar_one() == 1
+
+    with patch.object(postgresql, "_replicas", ()):
+        assert manager.pg_read_session is manager.pg_session
+        assert await node_name(manager.pg_read_session) == "primary"
+    await manager.close_pg_sessions()
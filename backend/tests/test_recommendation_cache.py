@@ -0,0 +1,132 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.ml_service import MLService
+from app.services.recommendation_cache import RecommendationCache, recommendation_cache
+from app.schemas.rutina import RutinaMLDetalle, RutinaMLOut
+from app.services.recommendation_service import RecommendationService
+
+
+def make_user(**overrides):
+    data = {
+        "id_usuario": 1,
+        "edad": 30,
+        "nivel_fisico": "ligero",
+        "objetivo_principal": "Salud/Movilidad",
+        "perfil_medico": None,
+    }
+    data.update(overrides)
+    return SimpleNamespace(**data)
+
+
+def make_rutina(ruta_ml):
+    return RutinaMLOut(
+        ruta_ml=ruta_ml,
+        usuario_id=1,
+        inference_features={"edad": 30},
+        rutina_generada=RutinaMLDetalle(descripcion=ruta_ml, ejercicios_habilitados=[]),
+    )
+
+
+def test_cache_fingerprint_ttl_and_lru():
+    """
+    Entries miss on a different fingerprint or after the TTL,
+    and the least recently used user is evicted first.
+    """
+    cache = RecommendationCache(max_entries=2, ttl_seconds=60)
+    cache.set(1, "a", make_rutina("rutina-1"))
+    cache.set(2, "b", make_rutina("rutina-2"))
+
+    assert cache.get(1, "a") == make_rutina("rutina-1")
+    cache.set(3, "c", make_rutina("rutina-3"))  # evicts user 2 (least recently used)
+    assert cache.get(2, "b") is None
+    assert cache.get(1, "other") is None
+
+    with patch("app.utils.ttl_cache.time.monotonic", return_value=10**9):
+        assert cache.get(3, "c") is None
+
+
+def test_cache_hands_out_independent_copies():
+    """Mutating a stored or returned routine must not alter the cached entry."""
+    cache = RecommendationCache(max_entries=2, ttl_seconds=60)
+    rutina = make_rutina("rutina-1")
+    cache.set(1, "a", rutina)
+    rutina.inference_features["edad"] = 99
+
+    hit = cache.get(1, "a")
+    hit.ruta_ml = "otra"
+    hit.inference_features["edad"] = 50
+    hit.rutina_generada.descripcion = "otra"
+
+    assert cache.get(1, "a") == make_rutina("rutina-1")
+
+
+@pytest.mark.asyncio
+async def test_repeat_recommendation_is_a_cache_hit():
+    """
+    A second call for the same profile must not touch the database or the model,
+    and invalidate_user forces a recomputation.
+    """
+    recommendation_cache.clear()
+    db = AsyncMock()
+    db.execute.return_value = MagicMock()
+    ml_svc = MLService()
+    user = make_user()
+
+    first = await RecommendationService.generate_ml_routine(db=db, user=user, ml_svc=ml_svc)
+    calls = db.execute.await_count
+    second = await RecommendationService.generate_ml_routine(db=db, user=user, ml_svc=ml_svc)
+
+    assert second == first
+    assert second is not first
+    assert db.execute.await_count == calls
+
+    recommendation_cache.invalidate_user(user.id_usuario)
+    third = await RecommendationService.generate_ml_routine(db=db, user=user, ml_svc=ml_svc)
+    assert third is not first
+    assert third == first
+    ml_svc.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_catalog_change_from_another_worker_misses_after_snapshot_reload():
+    """
+    Physio writes only clear the cache of the worker that handled them. Elsewhere,
+    the cached routine must stop being served once the worker's catalog snapshot
+    reloads with different content, and survive a reload of an unchanged catalog.
+    """
+    from app.models.ejercicio import Ejercicio
+    from app.services.exercise_catalog import exercise_catalog
+
+    def catalog_db(contraindicaciones):
+        result = MagicMock()
+        result.all.return_value = [(
+            Ejercicio(
+                id_ejercicio=1, nombre_ejercicio="Plancha", descripcion="Core", categoria="core",
+                contraindicaciones=contraindicaciones, is_verified_by_physio=True,
+            ),
+            None,
+        )]
+        return AsyncMock(execute=AsyncMock(return_value=result))
+
+    recommendation_cache.clear()
+    ml_svc = MLService()
+    user = make_user()
+    generate = RecommendationService.generate_ml_routine
+
+    with patch.object(ml_svc, "predict_routine_path_async", wraps=ml_svc.predict_routine_path_async) as mock_predict:
+        await exercise_catalog.refresh(catalog_db([]))
+        await generate(db=AsyncMock(), user=user, ml_svc=ml_svc)
+
+        await exercise_catalog.refresh(catalog_db([]))  # TTL reload, same content
+        await generate(db=AsyncMock(), user=user, ml_svc=ml_svc)
+        assert mock_predict.await_count == 1
+
+        await exercise_catalog.refresh(catalog_db(["rodilla"]))  # changed by another worker
+        await generate(db=AsyncMock(), user=user, ml_svc=ml_svc)
+        assert mock_predict.await_count == 2
+
+    exercise_catalog.invalidate()
+    recommendation_cache.clear()
+    ml_svc.shutdown()
@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.metrics import metrics
+from app.db.postgresql import postgresql
+from app.db.session import get_session_manager
+
+
+def counters():
+    return (
+        metrics.counter("db_session_requests_total").value,
+        metrics.counter("db_session_requests_unused_total").value,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pg_session_is_created_on_first_access_and_closed_on_teardown():
+    """
+    A request that never touches pg_session creates no session and is counted
+    as unused; one that queries gets a session that is closed on teardown.
+    """
+    session = AsyncMock()
+    session.info = {}
+
+    with patch.object(postgresql, "create_session", return_value=session) as create_session:
+        total_before, unused_before = counters()
+        async for manager in get_session_manager():
+            assert not manager.has_pg_session()
+        create_session.assert_not_called()
+        assert counters() == (total_before + 1, unused_before + 1)
+
+        async for manager in get_session_manager():
+            assert manager.pg_session is manager.pg_session
+            session.info["connection_used"] = True  # set by the after_begin listener
+        create_session.assert_called_once()
+        session.close.assert_awaited_once()
+        assert counters() == (total_before + 2, unused_before + 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_request_rolls_back_lazy_session():
+    """
+    An exception raised by the handler rolls back the
+    lazily created session before closing it.
+    """
+    session = AsyncMock()
+    session.info = {}
+
+    with patch.object(postgresql, "create_session", return_value=session):
+        dependency = get_session_manager()
+        manager = await dependency.__anext__()
+        manager.pg_session
+        with pytest.raises(ValueError):
+            await dependency.athrow(ValueError("boom"))
+
+    session.rollback.assert_awaited_once()
+    session.close.assert_awaited_once()
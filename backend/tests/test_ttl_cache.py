@@ -0,0 +1,28 @@
+from unittest.mock import patch
+
+from app.utils.ttl_cache import TTLCache
+
+
+def test_lru_eviction_expiry_and_disabled_caches():
+    """
+    Entries are evicted least-recently-used first, expire after the TTL
+    (never without one), and a zero-sized or zero-TTL cache stores nothing.
+    """
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b" (least recently used)
+    assert cache.get("b") is None
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    forever = TTLCache(max_entries=2)
+    forever.set("k", "v")
+    with patch("app.utils.ttl_cache.time.monotonic", return_value=10**9):
+        assert cache.get("c") is None
+        assert forever.get("k") == "v"
+
+    for disabled in (TTLCache(max_entries=0), TTLCache(max_entries=5, ttl_seconds=0)):
+        disabled.set("k", "v")
+        assert len(disabled) == 0
@@ -65,7 +65,7 @@ CREATE TABLE rutinas (
   duracion_estimada INTEGER,
   categoria VARCHAR(100),
   creado_por INTEGER REFERENCES usuarios(id_usuario) ON DELETE SET NULL,
-  fecha_creacion DATE DEFAULT CURRENT_DATE,
+  fecha_creacion DATE NOT NULL DEFAULT CURRENT_DATE,
   -- Flags de ML y verificación clínica
   is_machine_learning_generated BOOLEAN DEFAULT FALSE,
   is_verified_by_physio BOOLEAN DEFAULT FALSE,
@@ -154,10 +154,18 @@ CREATE INDEX idx_usuarios_correo ON usuarios (correo);
 CREATE INDEX idx_usuarios_rol ON usuarios (id_rol);
 CREATE INDEX idx_resenas_rutina ON resenas (id_rutina);
 CREATE INDEX idx_resenas_usuario ON resenas (id_usuario);
+-- Multimedia por ejercicio (LEFT JOIN del catálogo de recomendación y de /exercises)
+CREATE INDEX idx_multimedia_ejercicio ON multimedia (id_ejercicio);
 -- Índices de verificación clínica
 CREATE INDEX idx_rutinas_ml_flag ON rutinas (is_machine_learning_generated);
 CREATE INDEX idx_rutinas_verified ON rutinas (is_verified_by_physio);
 CREATE INDEX idx_ejercicios_verified ON ejercicios (is_verified_by_physio);
+-- Contraindicaciones (operador ?| del filtro de recomendación en PostgreSQL)
+CREATE INDEX idx_ejercicios_contraindicaciones ON ejercicios USING GIN (contraindicaciones);
+-- Paginación por keyset (app/utils/pagination.py); usuarios y ejercicios usan su PK
+CREATE INDEX idx_rutinas_fecha_id ON rutinas (fecha_creacion DESC, id_rutina DESC);
+CREATE INDEX idx_rutinas_pendientes_fecha ON rutinas (fecha_creacion DESC, id_rutina DESC)
+  WHERE is_machine_learning_generated AND NOT is_verified_by_physio;
 
 -- Comentarios
 COMMENT ON TABLE roles IS 'Roles del sistema (admin, usuario, etc.)';